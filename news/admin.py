@@ -1,11 +1,125 @@
+from django import forms
 from django.contrib import admin
-from .models import KeywordSearch, NewsArticle, UserProfile
+from django.contrib.admin.helpers import ActionForm
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
+from .models import KeywordSearch, NewsArticle, ProfileSample, UserProfile
+from .dbrouting import primary_pinned, use_replica
+from .profiles import invalidate_profiles
 import logging
 
 logger = logging.getLogger(__name__)
-admin.site.register(KeywordSearch)
-admin.site.register(NewsArticle)
 
+# Above this many rows, unfiltered changelists show an estimated total instead of running COUNT(*).
+APPROXIMATE_COUNT_THRESHOLD = 100_000
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator that avoids a full-table COUNT(*) on unfiltered changelists.
+
+    The estimate comes from PostgreSQL's planner statistics, or from the primary key range on other
+    databases. Filtered querysets, and tables below APPROXIMATE_COUNT_THRESHOLD, are counted exactly.
+    The estimate is read from the database the changelist queryset uses (e.g. the read replica).
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self._estimate(self.object_list)
+            if estimate is not None and estimate > APPROXIMATE_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def _estimate(queryset):
+        model = queryset.model
+        connection = connections[queryset.db]
+        try:
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [model._meta.db_table])
+                    row = cursor.fetchone()
+                return row[0] if row else None
+            bounds = model._default_manager.using(queryset.db).aggregate(lo=Min('pk'), hi=Max('pk'))
+            if bounds['lo'] is None:
+                return 0
+            return bounds['hi'] - bounds['lo'] + 1
+        except Exception as e:
+            logger.warning(f"Row estimate failed for {model.__name__}: {e}")
+            return None
+
+
+class ReplicaChangeListMixin:
+    """
+    Serves GET changelists from the read replica (see news.dbrouting), outside the sticky-primary
+    window. Action POSTs and edit pages use the primary.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'GET' or primary_pinned(request):
+            return super().changelist_view(request, extra_context)
+        with use_replica():
+            response = super().changelist_view(request, extra_context)
+            # Template responses query while rendering, so render while still routed to the replica
+            return response.render() if hasattr(response, 'render') else response
+
+
+@admin.register(KeywordSearch)
+class KeywordSearchAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    """
+    Admin customization for KeywordSearch model.
+
+    - Joins the user in the changelist query instead of one query per row.
+    - Skips the unfiltered COUNT(*) and estimates the total on large tables.
+    - Bulk action to purge the articles of the selected keywords with one DELETE.
+    - Changelist reads go to the read replica when one is configured.
+    """
+    list_display = ['keyword', 'user', 'searched_at', 'last_refreshed']
+    list_select_related = ['user']
+    list_filter = ['searched_at']
+    raw_id_fields = ['user']
+    show_full_result_count = False
+    paginator = ApproximateCountPaginator
+    actions = ['purge_articles']
+
+    @admin.action(description="Delete all articles of the selected keywords")
+    def purge_articles(self, request, queryset):
+        try:
+            deleted, _ = NewsArticle.objects.filter(keyword_search__in=queryset).delete()
+            self.message_user(request, f"Deleted {deleted} articles.")
+        except Exception as e:
+            logger.error(f"Error purging articles: {e}")
+            self.message_user(request, "An error occurred while purging articles.", level='error')
+
+
+@admin.register(NewsArticle)
+class NewsArticleAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    """
+    Admin customization for NewsArticle model.
+
+    - Joins keyword search and user (used by KeywordSearch.__str__) in the changelist query.
+    - Filters only on indexed columns.
+    - Skips the unfiltered COUNT(*) and estimates the total on large tables.
+    - Changelist reads go to the read replica when one is configured.
+    """
+    list_display = ['title', 'keyword_search', 'source_name', 'language', 'published_at']
+    list_select_related = ['keyword_search__user']
+    list_filter = ['language', 'published_at']
+    raw_id_fields = ['keyword_search']
+    show_full_result_count = False
+    paginator = ApproximateCountPaginator
+
+
+class UserProfileActionForm(ActionForm):
+    keyword_quota = forms.IntegerField(
+        required=False, min_value=0, label="Keyword quota",
+        help_text="Used by the \"Set keyword quota\" action.",
+    )
 
 
 @admin.register(UserProfile)
@@ -14,9 +128,43 @@ class UserProfileAdmin(admin.ModelAdmin):
     Admin customization for UserProfile model.
 
     - Displays user, keyword quota, and block status.
+    - Bulk actions to set quota and block/unblock, each run as a single UPDATE that also drops
+      the affected cached profiles.
     - Handles errors during save and delete operations.
     """
     list_display = ['user', 'keyword_quota', 'is_blocked']
+    list_select_related = ['user']
+    list_filter = ['is_blocked']
+    raw_id_fields = ['user']
+    show_full_result_count = False
+    action_form = UserProfileActionForm
+    actions = ['set_keyword_quota', 'block_users', 'unblock_users']
+
+    def _bulk_update(self, request, queryset, description, **values):
+        try:
+            user_ids = list(queryset.values_list('user_id', flat=True))
+            updated = queryset.update(**values)
+            invalidate_profiles(user_ids)
+            self.message_user(request, f"{description} for {updated} profiles.")
+        except Exception as e:
+            logger.error(f"Error in bulk UserProfile update: {e}")
+            self.message_user(request, "An error occurred while updating the user profiles.", level='error')
+
+    @admin.action(description="Set keyword quota")
+    def set_keyword_quota(self, request, queryset):
+        quota = request.POST.get('keyword_quota')
+        if not quota or not quota.isdigit():
+            self.message_user(request, "Enter a keyword quota to apply.", level='error')
+            return
+        self._bulk_update(request, queryset, f"Keyword quota set to {quota}", keyword_quota=int(quota))
+
+    @admin.action(description="Block selected users")
+    def block_users(self, request, queryset):
+        self._bulk_update(request, queryset, "Blocked", is_blocked=True)
+
+    @admin.action(description="Unblock selected users")
+    def unblock_users(self, request, queryset):
+        self._bulk_update(request, queryset, "Unblocked", is_blocked=False)
 
     def save_model(self, request, obj, form, change):
         """
@@ -37,3 +185,44 @@ class UserProfileAdmin(admin.ModelAdmin):
         except Exception as e:
             logger.error(f"Error deleting UserProfile: {e}")
             self.message_user(request, "An error occurred while deleting the user profile.", level='error')
+
+
+@admin.register(ProfileSample)
+class ProfileSampleAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for samples recorded by the profiler (news.profiling).
+
+    - Lists the slowest work first, filterable by kind.
+    - The detail page shows each slow statement with its query plan and the call profile.
+    """
+    list_display = ['created_at', 'kind', 'name', 'method', 'status_code', 'duration_ms', 'query_count', 'query_ms', 'slow_query_count']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['name']
+    ordering = ['-duration_ms']
+    show_full_result_count = False
+    paginator = ApproximateCountPaginator
+    fields = ['created_at', 'kind', 'name', 'method', 'status_code', 'duration_ms', 'query_count', 'query_ms', 'slow_query_details', 'call_profile_text']
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Slow queries")
+    def slow_query_count(self, obj):
+        return len(obj.slow_queries)
+
+    @admin.display(description="Slow queries")
+    def slow_query_details(self, obj):
+        if not obj.slow_queries:
+            return "-"
+        return format_html_join(
+            '', '<p><strong>{} ms</strong> ({})</p><pre>{}</pre><pre>{}</pre>',
+            ((q['ms'], q['alias'], q['sql'], q.get('plan') or '') for q in obj.slow_queries),
+        )
+
+    @admin.display(description="Call profile")
+    def call_profile_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.call_profile) if obj.call_profile else "-"
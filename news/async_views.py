@@ -0,0 +1,182 @@
+"""
+Async versions of the search and refresh views.
+
+These mirror `views.search_news` and `views.refresh_news` but await the News API through the
+pooled `httpx.AsyncClient` in `news.newsapi` and use Django's async ORM, so a single ASGI
+worker can keep many slow upstream calls in flight at once. Article writes still go through
+the batched, transactional helpers in `news.utils` via `sync_to_async`.
+
+Enable them with NEWS_ASYNC_VIEWS=1 and serve `news_project.asgi:application`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .forms import KeywordSearchForm
+from .listings import article_rows
+from .models import KeywordSearch, UserProfile
+from .newsapi import BudgetExhaustedError, CircuitOpenError, NewsAPIError, afetch_articles
+from .profiles import get_profile
+from .utils import refresh_due, save_articles, store_search
+from .views import BUDGET_NOTICES, REFRESH_BUDGET_NOTICES, UNAVAILABLE_NOTICE, render_stored_results
+from .warming import get_warm
+
+logger = logging.getLogger(__name__)
+
+# Templates read `request.user` through the auth context processor, which is a sync lookup.
+arender = sync_to_async(render)
+
+
+@login_required
+async def search_news(request):
+    """
+    Async keyword search; same behaviour and templates as `views.search_news`.
+
+    Args:
+        request (HttpRequest): Django request object.
+
+    Returns:
+        HttpResponse: Rendered form, confirmation page, or redirect to search history.
+    """
+    try:
+        user = await request.auser()
+        remaining_quota = None
+
+        # 1. Profile, quota, and block check
+        if not (user.is_superuser or user.is_staff):
+            try:
+                profile = await sync_to_async(get_profile)(user)
+            except UserProfile.DoesNotExist:
+                messages.error(request, "Your user profile was not found.")
+                return redirect('search_history')
+
+            if profile.is_blocked:
+                messages.error(request, "You are currently blocked from searching.")
+                return redirect('search_history')
+
+            search_count = await KeywordSearch.objects.filter(user=user).acount()
+            if search_count >= profile.keyword_quota:
+                messages.error(request, f"Keyword quota reached ({profile.keyword_quota}).")
+                return redirect('search_history')
+
+            remaining_quota = profile.keyword_quota - search_count
+
+        if request.method == 'POST':
+            form = KeywordSearchForm(request.POST)
+            if form.is_valid():
+                keyword = form.cleaned_data['keyword'].strip()
+                force_refresh = request.GET.get("force_refresh") == "1"
+
+                #  2. Check recent search (within 15 minutes)
+                recent = await KeywordSearch.objects.filter(
+                    user=user,
+                    keyword__iexact=keyword,
+                    searched_at__gte=timezone.now() - timedelta(minutes=15)
+                ).afirst()
+
+                if recent and not force_refresh:
+                    articles = await sync_to_async(list)(article_rows(recent.articles.all()))
+                    return await arender(request, 'news/confirm_refresh.html', {
+                        'keyword': keyword,
+                        'recent_search_time': recent.searched_at,
+                        'articles': articles,
+                        'form': form,
+                        'remaining_quota': remaining_quota
+                    })
+
+                #  3. Use the pre-warmed response for trending keywords (unless the user asked for a
+                #     refresh), otherwise call News API without blocking the event loop (serve stored
+                #     results if the budget is used up or the API is down or returns an error)
+                try:
+                    warm = None if force_refresh else await sync_to_async(get_warm)(keyword)
+                    data = warm or await afetch_articles(keyword)
+                    if data.get('status') != 'ok':
+                        raise NewsAPIError(f"News API error for '{keyword}': {data.get('message', data)}")
+                except BudgetExhaustedError as e:
+                    logger.warning(f"Serving stored results for '{keyword}': {e}")
+                    return await sync_to_async(render_stored_results)(
+                        request, keyword, BUDGET_NOTICES[e.reservation.reason], remaining_quota,
+                    )
+                except NewsAPIError as e:
+                    logger.error(f"News API request failed, serving stored results for '{keyword}': {e}")
+                    return await sync_to_async(render_stored_results)(request, keyword, UNAVAILABLE_NOTICE, remaining_quota)
+
+                #  4. Save the KeywordSearch and its articles in short batched transactions
+                await sync_to_async(store_search)(user, keyword, data.get('articles', []))
+
+                messages.success(request, "News articles fetched successfully.")
+                return redirect('search_history')
+        else:
+            form = KeywordSearchForm()
+
+        return await arender(request, 'news/search.html', {
+            'form': form,
+            'remaining_quota': remaining_quota,
+        })
+
+    except Exception as e:
+        logger.error(f"Unhandled exception in async search_news: {e}")
+        messages.error(request, "An unexpected error occurred.")
+        return redirect('search_history')
+
+
+@login_required
+async def refresh_news(request, keyword_id):
+    """
+    Async keyword refresh; same behaviour as `views.refresh_news`.
+
+    Args:
+        request (HttpRequest): The request object containing session and user data.
+        keyword_id (int): The ID of the KeywordSearch instance to be refreshed.
+
+    Returns:
+        HttpResponseRedirect: Redirects to the search history page with a success or error message.
+    """
+    try:
+        user = await request.auser()
+        search = await KeywordSearch.objects.filter(pk=keyword_id, user=user).afirst()
+        if search is None:
+            messages.error(request, "Failed to refresh articles.")
+            return redirect('search_history')
+
+        #  Step 1: Prevent refresh within 15 minutes
+        if not refresh_due(search):
+            messages.warning(request, "Please wait 15 minutes before refreshing this keyword again.")
+            return redirect('search_history')
+
+        #  Step 2: Get latest published article to avoid duplicates
+        latest_article = await search.articles.order_by('-published_at').afirst()
+        from_date = latest_article.published_at if latest_article else None
+
+        #  Step 3: Call News API without blocking the event loop
+        try:
+            data = await afetch_articles(search.keyword, from_date=from_date, sortBy='publishedAt')
+        except BudgetExhaustedError as e:
+            logger.warning(f"Refresh of '{search.keyword}' not possible: {e}")
+            messages.warning(request, REFRESH_BUDGET_NOTICES[e.reservation.reason])
+            return redirect('search_history')
+        except CircuitOpenError as e:
+            logger.warning(f"Refresh of '{search.keyword}' skipped: {e}")
+            messages.warning(request, "The news service is not responding right now; saved results may be stale.")
+            return redirect('search_history')
+        if data.get('status') != 'ok':
+            raise NewsAPIError(f"News API error for '{search.keyword}': {data.get('message', data)}")
+
+        await sync_to_async(save_articles)(search, data.get('articles', []), skip_existing=True)
+
+        #  Step 4: Update last refreshed timestamp
+        search.last_refreshed = timezone.now()
+        await search.asave()
+
+        messages.success(request, "News refreshed successfully.")
+        return redirect('search_history')
+
+    except Exception as e:
+        logger.error(f"Error in async refresh_news: {e}")
+        messages.error(request, "Failed to refresh articles.")
+        return redirect('search_history')
@@ -0,0 +1,204 @@
+"""
+Shared NewsAPI request budget.
+
+Every call to the News API first reserves one request here. Two limits apply across all web and
+Celery processes:
+
+    - a daily allotment (NEWS_API_DAILY_BUDGET, reset at UTC midnight). Background work may only
+      use the part not reserved for interactive searches (NEWS_API_INTERACTIVE_RESERVE), and
+      interactive searches stop at NEWS_API_DEGRADE_AT of the allotment so the app switches to
+      stored results before the provider starts rejecting requests;
+    - a token bucket (NEWS_API_RATE_PER_SECOND, NEWS_API_BURST) smoothing request bursts.
+
+State lives in Redis and is updated atomically by a Lua script. Without Redis an in-process
+stand-in with the same rules is used, which only accounts for the current process.
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+KEY_PREFIX = 'news:budget:'
+UNLIMITED = 10 ** 15
+
+Reservation = namedtuple('Reservation', ['allowed', 'reason', 'retry_after'])
+
+_RESERVE_SCRIPT = """
+local used = tonumber(redis.call('hget', KEYS[1], 'total') or '0')
+if used >= tonumber(ARGV[1]) then
+    return {0, 'budget', '0'}
+end
+local rate = tonumber(ARGV[3])
+if rate > 0 then
+    local burst = tonumber(ARGV[4])
+    local now = tonumber(ARGV[5])
+    local bucket = redis.call('hmget', KEYS[2], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        redis.call('hset', KEYS[2], 'tokens', tostring(tokens), 'ts', tostring(now))
+        return {0, 'rate', tostring((1 - tokens) / rate)}
+    end
+    redis.call('hset', KEYS[2], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+    redis.call('expire', KEYS[2], 3600)
+end
+redis.call('hincrby', KEYS[1], 'total', 1)
+redis.call('hincrby', KEYS[1], ARGV[2], 1)
+redis.call('expire', KEYS[1], ARGV[6])
+return {1, 'ok', '0'}
+"""
+
+
+def _today():
+    return datetime.now(dt_timezone.utc).date()
+
+
+def _limit_for(kind):
+    budget = settings.NEWS_API_DAILY_BUDGET
+    if not budget:
+        return UNLIMITED
+    if kind == BACKGROUND:
+        return int(budget * (1 - settings.NEWS_API_INTERACTIVE_RESERVE))
+    return int(budget * settings.NEWS_API_DEGRADE_AT)
+
+
+class _LocalBudget:
+    """In-process stand-in used when Redis is unavailable."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.day = None
+        self.counts = {}
+        self.tokens = None
+        self.ts = None
+
+    def reserve(self, kind, limit, rate, burst, now):
+        with self._lock:
+            if self.day != _today():
+                self.day, self.counts = _today(), {}
+            if self.counts.get('total', 0) >= limit:
+                return Reservation(False, 'budget', 0.0)
+            if rate > 0:
+                tokens = burst if self.tokens is None else self.tokens
+                tokens = min(burst, tokens + max(0.0, now - (self.ts or now)) * rate)
+                self.ts = now
+                if tokens < 1:
+                    self.tokens = tokens
+                    return Reservation(False, 'rate', (1 - tokens) / rate)
+                self.tokens = tokens - 1
+            self.counts['total'] = self.counts.get('total', 0) + 1
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            return Reservation(True, 'ok', 0.0)
+
+    def usage(self):
+        with self._lock:
+            return dict(self.counts) if self.day == _today() else {}
+
+
+_local = _LocalBudget()
+
+
+def _try_reserve(kind):
+    limit = _limit_for(kind)
+    rate = settings.NEWS_API_RATE_PER_SECOND
+    burst = settings.NEWS_API_BURST
+    now = time.time()
+    client = get_redis()
+    if client is not None:
+        try:
+            allowed, reason, retry_after = client.eval(
+                _RESERVE_SCRIPT, 2,
+                f"{KEY_PREFIX}{_today().isoformat()}", f"{KEY_PREFIX}bucket",
+                limit, kind, rate, burst, now, 2 * 86400,
+            )
+            return Reservation(bool(allowed), reason.decode(), float(retry_after))
+        except redis.RedisError as e:
+            logger.warning(f"Redis error reserving API budget, using local budget: {e}")
+    return _local.reserve(kind, limit, rate, burst, now)
+
+
+def reserve(kind=INTERACTIVE, max_wait=0.0):
+    """
+    Reserves one News API request.
+
+    Args:
+        kind (str): INTERACTIVE for user-facing searches, BACKGROUND for scheduled or bulk work.
+        max_wait (float): Seconds to wait for the rate limiter before giving up.
+
+    Returns:
+        Reservation: `allowed`, `reason` ('ok', 'budget' or 'rate') and `retry_after` seconds.
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        reservation = _try_reserve(kind)
+        if reservation.allowed or reservation.reason != 'rate':
+            return reservation
+        if time.monotonic() + reservation.retry_after > deadline:
+            return reservation
+        time.sleep(reservation.retry_after)
+
+
+def usage():
+    """
+    Returns today's request counts: `total`, `interactive` and `background`.
+    """
+    counts = None
+    client = get_redis()
+    if client is not None:
+        try:
+            raw = client.hgetall(f"{KEY_PREFIX}{_today().isoformat()}")
+            counts = {k.decode(): int(v) for k, v in raw.items()}
+        except redis.RedisError as e:
+            logger.warning(f"Redis error reading API budget: {e}")
+    if counts is None:
+        counts = _local.usage()
+    return {key: counts.get(key, 0) for key in ('total', INTERACTIVE, BACKGROUND)}
+
+
+def status():
+    """
+    Summarizes today's budget consumption and projects when it will run out.
+
+    The projection extrapolates today's average request rate; it is None when no budget is
+    configured or nothing has been used yet.
+
+    Returns:
+        dict: Budget, usage per kind, remaining requests, degrade flags and projected exhaustion.
+    """
+    budget = settings.NEWS_API_DAILY_BUDGET
+    counts = usage()
+    now = datetime.now(dt_timezone.utc)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    hours = max((now - day_start).total_seconds() / 3600, 1 / 60)
+    per_hour = counts['total'] / hours
+
+    projected = None
+    if budget and per_hour > 0:
+        remaining = max(0, budget - counts['total'])
+        projected = (now + timedelta(hours=remaining / per_hour)).isoformat()
+
+    return {
+        'date': day_start.date().isoformat(),
+        'daily_budget': budget or None,
+        'used': counts['total'],
+        'used_interactive': counts[INTERACTIVE],
+        'used_background': counts[BACKGROUND],
+        'remaining': max(0, budget - counts['total']) if budget else None,
+        'requests_per_hour': round(per_hour, 2),
+        'background_paused': bool(budget) and counts['total'] >= _limit_for(BACKGROUND),
+        'serving_stored_results': bool(budget) and counts['total'] >= _limit_for(INTERACTIVE),
+        'projected_exhaustion': projected,
+    }
@@ -0,0 +1,164 @@
+"""
+Circuit breaker for the News API, shared by all web and Celery processes.
+
+    - closed: requests flow normally. Failures (errors, 5xx/429 responses and calls slower than
+      NEWS_BREAKER_SLOW_SECONDS) are counted; any healthy response resets the count.
+    - open: after NEWS_BREAKER_FAILURE_THRESHOLD consecutive failures every request fails fast
+      for NEWS_BREAKER_RESET_SECONDS.
+    - half-open: once that time has passed a single trial request is let through (guarded by a
+      short Redis lease so only one worker probes). Success closes the breaker, failure re-opens it.
+
+State lives in a Redis hash; without Redis an in-process stand-in with the same rules is used.
+"""
+
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name (str): Breaker name; Redis keys are prefixed with `news:breaker:<name>`.
+    """
+
+    def __init__(self, name):
+        self.key = f"news:breaker:{name}"
+        self.probe_key = f"{self.key}:probe"
+        self._lock = threading.Lock()
+        self._local = {'state': CLOSED, 'failures': 0, 'opened_at': 0.0, 'probe_until': 0.0}
+
+    def _probe_ttl(self):
+        return settings.NEWS_API_TIMEOUT + 1
+
+    # --- state access (Redis, falling back to the local stand-in) ---
+
+    def _read(self):
+        client = get_redis()
+        if client is not None:
+            try:
+                raw = client.hgetall(self.key)
+                return {
+                    'state': raw.get(b'state', CLOSED.encode()).decode(),
+                    'failures': int(raw.get(b'failures', 0)),
+                    'opened_at': float(raw.get(b'opened_at', 0)),
+                }
+            except redis.RedisError as e:
+                logger.warning(f"Redis error reading {self.key}, using local breaker: {e}")
+        with self._lock:
+            return dict(self._local)
+
+    def _claim_probe(self):
+        client = get_redis()
+        if client is not None:
+            try:
+                return bool(client.set(self.probe_key, 1, nx=True, px=int(self._probe_ttl() * 1000)))
+            except redis.RedisError as e:
+                logger.warning(f"Redis error claiming {self.probe_key}: {e}")
+        with self._lock:
+            now = time.monotonic()
+            if self._local['probe_until'] > now:
+                return False
+            self._local['probe_until'] = now + self._probe_ttl()
+            return True
+
+    def _open(self):
+        now = time.time()
+        client = get_redis()
+        if client is not None:
+            try:
+                client.pipeline().hset(self.key, mapping={'state': OPEN, 'opened_at': now}).delete(self.probe_key).execute()
+            except redis.RedisError as e:
+                logger.warning(f"Redis error opening {self.key}: {e}")
+        with self._lock:
+            self._local.update(state=OPEN, opened_at=now, probe_until=0.0)
+        logger.error(f"Circuit {self.key} opened; failing fast for {settings.NEWS_BREAKER_RESET_SECONDS}s")
+
+    # --- public API ---
+
+    def state(self):
+        """
+        Returns the current state (CLOSED, OPEN or HALF_OPEN).
+        """
+        current = self._read()
+        if current['state'] == OPEN and time.time() - current['opened_at'] >= settings.NEWS_BREAKER_RESET_SECONDS:
+            return HALF_OPEN
+        return current['state']
+
+    def allow_request(self):
+        """
+        Returns True if a request may be sent now; in half-open state only one caller gets True.
+        """
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            return self._claim_probe()
+        return False
+
+    def record_success(self, latency):
+        """
+        Records a completed request; a response slower than NEWS_BREAKER_SLOW_SECONDS counts as a failure.
+        """
+        if latency > settings.NEWS_BREAKER_SLOW_SECONDS:
+            self.record_failure()
+            return
+        current = self._read()
+        if current['state'] == CLOSED and current['failures'] == 0:
+            return
+        client = get_redis()
+        if client is not None:
+            try:
+                client.pipeline().delete(self.key).delete(self.probe_key).execute()
+            except redis.RedisError as e:
+                logger.warning(f"Redis error closing {self.key}: {e}")
+        with self._lock:
+            self._local.update(state=CLOSED, failures=0, opened_at=0.0, probe_until=0.0)
+        if current['state'] != CLOSED:
+            logger.info(f"Circuit {self.key} closed")
+
+    def reset(self):
+        """
+        Closes the breaker and clears its failure count (e.g. before a benchmark run).
+        """
+        client = get_redis()
+        if client is not None:
+            try:
+                client.pipeline().delete(self.key).delete(self.probe_key).execute()
+            except redis.RedisError as e:
+                logger.warning(f"Redis error resetting {self.key}: {e}")
+        with self._lock:
+            self._local.update(state=CLOSED, failures=0, opened_at=0.0, probe_until=0.0)
+
+    def record_failure(self):
+        """
+        Records a failed request and opens the breaker when the threshold is reached or a trial fails.
+        """
+        state = self.state()
+        failures = None
+        client = get_redis()
+        if client is not None:
+            try:
+                failures = client.hincrby(self.key, 'failures', 1)
+            except redis.RedisError as e:
+                logger.warning(f"Redis error recording failure on {self.key}: {e}")
+        with self._lock:
+            self._local['failures'] += 1
+            if failures is None:
+                failures = self._local['failures']
+        if state == HALF_OPEN or (state == CLOSED and failures >= settings.NEWS_BREAKER_FAILURE_THRESHOLD):
+            self._open()
+
+
+newsapi_breaker = CircuitBreaker('newsapi')
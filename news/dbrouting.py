@@ -0,0 +1,140 @@
+"""
+Primary/replica database routing.
+
+When NEWS_DB_REPLICA_NAME is set, a `replica` database alias is configured next to `default`
+(the primary). Routing is opt-in: reads go to the replica only inside code marked read-only with
+`read_only` (a decorator for views and plain functions) or `use_replica` (a context manager). Every
+write, and every read elsewhere, uses the primary, so ingestion keeps the primary to itself while
+history pages, exports and admin listings read from the replica.
+
+Read-your-writes: StickyPrimaryMiddleware notes when a request writes to the database (or is a
+POST, whose writes may happen on pool threads) and sets a short-lived cookie. For the next
+NEWS_DB_STICKY_SECONDS, `read_only` views serve that browser from the primary, so e.g. the history
+page right after a search shows the new articles even if the replica lags behind.
+
+Without a replica everything here is a no-op. Locally, `python manage.py sync_replica --every 5`
+copies the primary SQLite file into the replica file to stand in for replication.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest
+
+REPLICA = 'replica'
+STICKY_COOKIE = 'news_primary_until'
+
+# Models whose writes do not need read-your-writes (written on almost every request).
+UNTRACKED_WRITES = {'sessions.Session', 'news.ProfileSample'}
+
+_read_alias = ContextVar('news_read_alias', default=None)
+_request_writes = ContextVar('news_request_writes', default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """
+    Routes ORM reads in the block to the replica (if one is configured).
+    """
+    token = _read_alias.set(REPLICA if replica_configured() else None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def primary_pinned(request):
+    """
+    Returns True if the request falls in the sticky-primary window after one of its browser's writes.
+    """
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_primary(response):
+    """
+    Starts the sticky-primary window on `response`.
+
+    The middleware does this for requests that write; call it for writes made on the request's
+    behalf elsewhere, e.g. by a Celery task.
+    """
+    if replica_configured():
+        response.set_cookie(
+            STICKY_COOKIE, str(time.time() + settings.NEWS_DB_STICKY_SECONDS),
+            max_age=settings.NEWS_DB_STICKY_SECONDS, httponly=True, samesite='Lax',
+        )
+    return response
+
+
+def read_only(func):
+    """
+    Marks a view or function as read-only, so its ORM reads use the replica.
+
+    Views (first argument an HttpRequest) stay on the primary during the sticky-primary window.
+    Querysets evaluated after the function returns (e.g. in a streaming response) are not covered;
+    pin them with `.using(router.db_for_read(Model))` inside the function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if args and isinstance(args[0], HttpRequest) and primary_pinned(args[0]):
+            return func(*args, **kwargs)
+        with use_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router: writes and migrations go to the primary, reads to the replica only inside
+    `use_replica` / `read_only`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None and model._meta.label not in UNTRACKED_WRITES:
+            writes['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary through replication (or sync_replica).
+        return db != REPLICA
+
+
+class StickyPrimaryMiddleware:
+    """
+    Starts a sticky-primary window for the browser after a request that wrote to the database.
+
+    Removed at startup when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = {'wrote': False}
+        token = _request_writes.set(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_writes.reset(token)
+        if writes['wrote'] or request.method == 'POST':
+            pin_primary(response)
+        return response
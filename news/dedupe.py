@@ -0,0 +1,138 @@
+"""
+Near-duplicate detection for syndicated news articles.
+
+NewsAPI often returns the same story from many outlets with small title changes. Each article
+gets a 64-bit SimHash of its normalized title and description; two articles whose hashes differ
+in at most NEWS_DEDUPE_MAX_DISTANCE bits belong to the same story cluster.
+
+Articles are short (20-30 tokens), so every changed word flips several unigram and bigram
+features: a one-word headline edit, a punctuation change or an extra sentence moves the hash by
+roughly 3-8 bits. The default threshold of 10 bits covers those edits; unrelated stories, even
+on the same keyword, differ in about half of the 64 bits and rarely come closer than 15.
+
+Lookups use an LSH index that splits every hash into `max_distance + 1` bands. By the pigeonhole
+principle two hashes within the distance threshold agree exactly on at least one band, so only
+articles sharing a band are compared instead of scanning every stored hash. With 11 bands of
+6 bits a lookup compares about a sixth of the stored hashes, which is cheap at the size of a
+keyword search.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+HASH_BITS = 64
+_MASK = (1 << HASH_BITS) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# "Headline text - Reuters" / "Headline text | BBC News": drop the outlet suffix.
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,60}$")
+
+
+def normalize(text):
+    """
+    Lowercases text, strips a trailing " - Outlet" suffix and returns its word tokens.
+    """
+    text = _SOURCE_SUFFIX_RE.sub('', (text or '').strip())
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _features(tokens):
+    # Unigrams plus bigrams: short headlines have too few tokens for longer shingles.
+    yield from tokens
+    yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+def _hash64(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+
+
+def simhash(title, description=None):
+    """
+    Computes the SimHash of an article.
+
+    Returns:
+        int: Signed 64-bit hash (fits a BigIntegerField), or None if the article has no words.
+    """
+    tokens = normalize(title) + normalize(description)
+    if not tokens:
+        return None
+
+    weights = [0] * HASH_BITS
+    for feature in _features(tokens):
+        h = _hash64(feature)
+        for bit in range(HASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def hamming_distance(a, b):
+    return bin((a ^ b) & _MASK).count('1')
+
+
+class SimHashIndex:
+    """
+    Banded LSH index mapping SimHashes to story cluster ids.
+
+    Args:
+        max_distance (int): Largest Hamming distance still treated as the same story.
+    """
+
+    def __init__(self, max_distance=10):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-HASH_BITS // self.bands)
+        self._buckets = defaultdict(list)
+
+    def _keys(self, value):
+        value &= _MASK
+        band_mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield band, (value >> (band * self.band_bits)) & band_mask
+
+    def add(self, value, cluster):
+        entry = (value, cluster)
+        for key in self._keys(value):
+            self._buckets[key].append(entry)
+
+    def find(self, value):
+        """
+        Returns the cluster id of a stored hash within `max_distance` of `value`, or None.
+        """
+        best = None
+        for key in self._keys(value):
+            for candidate, cluster in self._buckets.get(key, ()):
+                distance = hamming_distance(value, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, cluster)
+                    if distance == 0:
+                        return cluster
+        return best[1] if best else None
+
+
+def collapse_clusters(articles):
+    """
+    Keeps the first article of every story cluster, preserving order.
+
+    Each returned article gets a `cluster_size` attribute with the number of articles in its
+    cluster among `articles`. Articles without a cluster are always kept.
+
+    Returns:
+        list: Representative articles.
+    """
+    representatives = {}
+    ordered = []
+    for article in articles:
+        cluster = article.story_cluster
+        if cluster is None:
+            article.cluster_size = 1
+            ordered.append(article)
+        elif cluster in representatives:
+            representatives[cluster].cluster_size += 1
+        else:
+            article.cluster_size = 1
+            representatives[cluster] = article
+            ordered.append(article)
+    return ordered
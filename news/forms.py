@@ -1,4 +1,7 @@
+import re
+
 from django import forms
+from django.conf import settings
 
 class KeywordSearchForm(forms.Form):
     """
@@ -8,3 +11,39 @@ class KeywordSearchForm(forms.Form):
             keyword (CharField): The keyword to search news for.
         """
     keyword = forms.CharField(label='Enter Keyword', max_length=255)
+
+
+class BatchKeywordSearchForm(forms.Form):
+    """
+        Form to capture several search keywords in one submission.
+
+        Fields:
+            keywords (CharField): Keywords separated by new lines or commas; cleaned to a
+                de-duplicated list.
+            force_refresh (BooleanField): Also fetch keywords searched within the last 15 minutes.
+        """
+    keywords = forms.CharField(
+        label='Enter Keywords (one per line or comma-separated)',
+        widget=forms.Textarea(attrs={'rows': 8}),
+    )
+    force_refresh = forms.BooleanField(
+        label='Fetch again keywords searched in the last 15 minutes', required=False,
+    )
+
+    def clean_keywords(self):
+        keywords, seen = [], set()
+        for part in re.split(r'[\r\n,]+', self.cleaned_data['keywords']):
+            keyword = part.strip()
+            if not keyword or keyword.lower() in seen:
+                continue
+            if len(keyword) > 255:
+                raise forms.ValidationError(f"Keyword '{keyword[:30]}...' is longer than 255 characters.")
+            seen.add(keyword.lower())
+            keywords.append(keyword)
+        if not keywords:
+            raise forms.ValidationError("Enter at least one keyword.")
+        if len(keywords) > settings.NEWS_BATCH_MAX_KEYWORDS:
+            raise forms.ValidationError(
+                f"At most {settings.NEWS_BATCH_MAX_KEYWORDS} keywords can be searched at once."
+            )
+        return keywords
@@ -0,0 +1,122 @@
+"""
+Incremental parser for JSON objects that wrap one large array, such as News API responses:
+
+    {"status": "ok", "totalResults": 1234, "articles": [{...}, {...}, ...]}
+
+`iter_array_items` yields the array elements one at a time while the body is still arriving,
+keeping only the unparsed tail of the text in memory. The other top-level members are collected
+and returned when the object ends. Only the standard library `json` decoder is used: each element
+is decoded with `raw_decode` once enough text has arrived.
+"""
+
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class _Buffer:
+    """Text buffer over an iterable of byte chunks that drops what has already been parsed."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        if self.eof:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        for chunk in self._chunks:
+            piece = self._utf8.decode(chunk)
+            if piece:
+                self.text += piece
+                return True
+        self.text += self._utf8.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at end of input)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of JSON stream")
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more input until it is available."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # A number cut off by a chunk boundary ("12" of "123", "1.5" of "1.5e3") still decodes,
+            # so it is only accepted once the character after it is known.
+            if (
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                and (end == len(self.text) or self.text[end] in '.eE')
+                and not self.eof and self.more()
+            ):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks, key):
+    """
+    Yields the elements of the array stored under `key` in a top-level JSON object.
+
+    Args:
+        chunks (iterable[bytes]): UTF-8 encoded body, in pieces of any size.
+        key (str): Name of the top-level member holding the array.
+
+    Returns:
+        dict: The object's other top-level members (via StopIteration, i.e. `meta = yield from ...`).
+
+    Raises:
+        ValueError: If the input is not a JSON object or ends early.
+    """
+    buf = _Buffer(chunks)
+    meta = {}
+    buf.expect('{')
+    if buf.peek() == '}':
+        return meta
+    while True:
+        name = buf.value()
+        buf.expect(':')
+        if name == key and buf.peek() == '[':
+            buf.pos += 1
+            if buf.peek() == ']':
+                buf.pos += 1
+            else:
+                while True:
+                    yield buf.value()
+                    separator = buf.peek()
+                    buf.pos += 1
+                    if separator == ']':
+                        break
+                    if separator != ',':
+                        raise ValueError(f"Malformed array '{key}' in JSON stream")
+        else:
+            meta[name] = buf.value()
+        separator = buf.peek()
+        buf.pos += 1
+        if separator == '}':
+            return meta
+        if separator != ',':
+            raise ValueError("Malformed object in JSON stream")
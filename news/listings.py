@@ -0,0 +1,119 @@
+"""
+Read-side access to stored articles for listings (history page, CSV export, JSON API).
+
+Listing pages only display a handful of columns, so instead of building a `NewsArticle` model
+instance per row they fetch plain tuples with `values_list` and wrap them in `ArticleRow`, a
+`__slots__` record with the same attribute names the templates already use. Rows for all of a
+user's keyword searches are read with one query and grouped by search in a single pass.
+"""
+
+from collections import defaultdict
+
+from .dedupe import collapse_clusters
+from .models import NewsArticle
+
+ROW_FIELDS = (
+    'keyword_search_id', 'title', 'description', 'url',
+    'published_at', 'source_name', 'language', 'story_cluster',
+)
+
+# Columns shown on listings and exported, in CSV order.
+EXPORT_FIELDS = ('title', 'description', 'url', 'published_at', 'source_name', 'language')
+
+
+class ArticleRow:
+    """
+    Compact read-only view of one stored article.
+
+    Attribute names match `NewsArticle`, so templates and `collapse_clusters` accept either.
+    `cluster_size` is set by `collapse_clusters`.
+    """
+    __slots__ = ROW_FIELDS + ('cluster_size',)
+
+    def __init__(self, keyword_search_id, title, description, url, published_at, source_name, language,
+                 story_cluster):
+        self.keyword_search_id = keyword_search_id
+        self.title = title
+        self.description = description
+        self.url = url
+        self.published_at = published_at
+        self.source_name = source_name
+        self.language = language
+        self.story_cluster = story_cluster
+        self.cluster_size = 1
+
+    def as_dict(self):
+        """
+        Returns the displayed columns as a JSON-serializable dict.
+        """
+        return {
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'published_at': self.published_at.isoformat() if self.published_at else None,
+            'source_name': self.source_name,
+            'language': self.language,
+            'cluster_size': self.cluster_size,
+        }
+
+
+def article_rows(queryset, chunk_size=None):
+    """
+    Yields an ArticleRow for every article in `queryset`.
+
+    Args:
+        queryset (QuerySet): NewsArticle queryset; its filters and ordering are kept.
+        chunk_size (int, optional): Stream rows from the database cursor in chunks of this size
+            instead of loading the whole result first (for exports).
+
+    Returns:
+        generator: ArticleRow records.
+    """
+    rows = queryset.values_list(*ROW_FIELDS)
+    if chunk_size:
+        rows = rows.iterator(chunk_size=chunk_size)
+    for values in rows:
+        yield ArticleRow(*values)
+
+
+def filter_articles(queryset, date=None, source=None, language=None):
+    """
+    Applies the history page filters to a NewsArticle queryset.
+
+    Args:
+        date (str, optional): Publication date (YYYY-MM-DD).
+        source (str, optional): Case-insensitive substring of the source name.
+        language (str, optional): Exact language code.
+
+    Returns:
+        QuerySet: The filtered queryset.
+    """
+    if date:
+        queryset = queryset.filter(published_at__date=date)
+    if source:
+        queryset = queryset.filter(source_name__icontains=source)
+    if language:
+        queryset = queryset.filter(language=language)
+    return queryset
+
+
+def rows_by_search(searches, collapse=True, **filters):
+    """
+    Reads the articles of several keyword searches with one query and groups them by search.
+
+    Args:
+        searches (iterable[KeywordSearch]): The searches to read.
+        collapse (bool): Keep one row per near-duplicate story cluster (see `collapse_clusters`).
+        **filters: Passed to `filter_articles`.
+
+    Returns:
+        dict: Search id -> list of ArticleRow in storage order. Searches without matching
+        articles are left out.
+    """
+    queryset = NewsArticle.objects.filter(keyword_search__in=[search.pk for search in searches])
+    grouped = defaultdict(list)
+    for row in article_rows(filter_articles(queryset, **filters).order_by('keyword_search_id', 'pk')):
+        grouped[row.keyword_search_id].append(row)
+    if collapse:
+        return {search_id: collapse_clusters(rows) for search_id, rows in grouped.items()}
+    return dict(grouped)
@@ -0,0 +1,142 @@
+"""
+Lease locks that stop overlapping runs of scheduled work.
+
+A `LeaseLock` is a Redis key holding a random token with a TTL. The holder renews the TTL from a
+heartbeat thread while it works, so a long run keeps its lease, while a crashed worker's lease
+simply expires. Release and renewal only touch the key if it still holds our token.
+
+If Redis is unavailable the lock falls back to an in-process table, which still prevents overlap
+between threads of one worker but not across workers.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'news:lock:'
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_local_leases = {}
+_local_lock = threading.Lock()
+
+
+class LeaseLock:
+    """
+    Non-blocking lease lock with an optional heartbeat.
+
+    Usage:
+        with LeaseLock('refresh-cycle') as lock:
+            if not lock.acquired:
+                return  # another run holds the lease
+            ...
+
+    Args:
+        name (str): Lock name; the Redis key is KEY_PREFIX + name.
+        ttl (float): Lease length in seconds. Defaults to NEWS_LOCK_TTL.
+        heartbeat (bool): Renew the lease every ttl/3 seconds until released.
+    """
+
+    def __init__(self, name, ttl=None, heartbeat=True):
+        self.key = KEY_PREFIX + name
+        self.ttl = ttl or settings.NEWS_LOCK_TTL
+        self.heartbeat = heartbeat
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+        self.lost = False
+        self._local = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def acquire(self):
+        client = get_redis()
+        try:
+            if client is not None:
+                self.acquired = bool(client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)))
+            else:
+                self.acquired = self._local_acquire()
+        except redis.RedisError as e:
+            logger.warning(f"Redis error acquiring {self.key}, using local lease: {e}")
+            self.acquired = self._local_acquire()
+
+        if self.acquired and self.heartbeat:
+            self._thread = threading.Thread(target=self._renew_loop, name=f"lease:{self.key}", daemon=True)
+            self._thread.start()
+        return self.acquired
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if not self.acquired:
+            return
+        client = get_redis()
+        try:
+            if client is not None and not self._local:
+                client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except redis.RedisError as e:
+            logger.warning(f"Redis error releasing {self.key}; it will expire: {e}")
+        with _local_lock:
+            if _local_leases.get(self.key, (None,))[0] == self.token:
+                del _local_leases[self.key]
+        self.acquired = False
+
+    def _renew(self):
+        client = get_redis()
+        if client is not None and not self._local:
+            try:
+                return bool(client.eval(_RENEW_SCRIPT, 1, self.key, self.token, int(self.ttl * 1000)))
+            except redis.RedisError as e:
+                # Keep heartbeating; the lease itself expires if Redis stays unreachable.
+                logger.warning(f"Redis error renewing {self.key}: {e}")
+                return True
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            if holder and holder[0] == self.token:
+                _local_leases[self.key] = (self.token, time.monotonic() + self.ttl)
+                return True
+        return False
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.ttl / 3):
+            if not self._renew():
+                self.lost = True
+                logger.error(f"Lost lease {self.key}; another worker may now run the same work")
+                return
+
+    def _local_acquire(self):
+        self._local = True
+        now = time.monotonic()
+        with _local_lock:
+            holder = _local_leases.get(self.key)
+            if holder and holder[1] > now:
+                return False
+            _local_leases[self.key] = (self.token, now + self.ttl)
+            return True
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,206 @@
+"""
+Bulk-loads keywords for a user from a file, fetching and storing their articles in parallel.
+
+Every keyword becomes a KeywordSearch of `--user` and is fetched through the streaming ingestion
+pipeline (news.utils.stream_pages) with the background share of the request budget. Keywords are
+spread over a pool of worker processes; each has its own database connection and HTTP session.
+Requests reserve tokens from the shared Redis rate limiter (news.budget), so the run never exceeds
+NEWS_API_RATE_PER_SECOND in total, however many workers are used.
+
+Finished keywords are appended to a checkpoint file as they complete. Running the same command
+again skips them, so an interrupted run (Ctrl-C, crash, budget used up) resumes where it stopped.
+Failed keywords (including ones whose articles could not all be written, e.g. because SQLite stayed
+locked past its busy timeout) and keywords deferred by the rate limiter are not checkpointed and are
+retried on the next run. Any failure makes the command exit non-zero.
+
+Usage:
+    python manage.py backfill_keywords keywords.txt --user acme --workers 8
+    python manage.py backfill_keywords keywords.txt --user acme --restart   # ignore the checkpoint
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from news.redis_client import get_redis
+
+
+def _init_worker():
+    django.setup()
+
+
+def _backfill_keyword(user_id, keyword, max_pages):
+    """
+    Fetches and stores one keyword in a worker process.
+
+    Returns:
+        dict: `keyword`, `status` ('done', 'failed', 'budget', 'rate' or 'circuit'), `saved` and `error`.
+    """
+    from news.budget import BACKGROUND
+    from news.models import KeywordSearch
+    from news.newsapi import BudgetExhaustedError, CircuitOpenError
+    from news.utils import ArticleWriteError, ingest_articles, stream_pages
+
+    result = {'keyword': keyword, 'status': 'done', 'saved': 0, 'error': None}
+    try:
+        search, _ = KeywordSearch.objects.get_or_create(
+            user_id=user_id, keyword__iexact=keyword,
+            defaults={'keyword': keyword},
+        )
+        result['saved'] = ingest_articles(
+            [search], stream_pages(keyword, kind=BACKGROUND, max_pages=max_pages), skip_existing=True,
+        )
+        search.last_refreshed = timezone.now()
+        search.save(update_fields=['last_refreshed'])
+    except BudgetExhaustedError as e:
+        result.update(status=e.reservation.reason, error=str(e))
+    except CircuitOpenError as e:
+        result.update(status='circuit', error=str(e))
+    except ArticleWriteError as e:
+        result.update(status='failed', saved=e.saved, error=str(e))
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+    return result
+
+
+def _read_keywords(path):
+    keywords, seen = [], set()
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            keyword = line.strip()
+            if keyword and not keyword.startswith('#') and keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                keywords.append(keyword)
+    return keywords
+
+
+def _read_checkpoint(path):
+    done = set()
+    if path.exists():
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    done.add(json.loads(line)['keyword'].lower())
+                except (ValueError, KeyError):
+                    continue  # a line cut off by an interrupted write
+    return done
+
+
+class Command(BaseCommand):
+    help = "Backfills articles for a file of keywords using a process pool, with resumable checkpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('keyword_file', help="Text file with one keyword per line ('#' starts a comment).")
+        parser.add_argument('--user', required=True, help="Username that will own the keyword searches.")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--pages', type=int, default=None, help="Pages per keyword (defaults to NEWS_INGEST_MAX_PAGES).")
+        parser.add_argument('--checkpoint', default=None, help="Checkpoint file (defaults to <keyword_file>.checkpoint).")
+        parser.add_argument('--restart', action='store_true', help="Ignore and overwrite an existing checkpoint.")
+        parser.add_argument('--progress-every', type=int, default=50, help="Print throughput every N keywords.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+        keyword_file = Path(options['keyword_file'])
+        if not keyword_file.exists():
+            raise CommandError(f"Keyword file {keyword_file} not found.")
+
+        checkpoint = Path(options['checkpoint'] or f"{keyword_file}.checkpoint")
+        if options['restart'] and checkpoint.exists():
+            checkpoint.unlink()
+        keywords = _read_keywords(keyword_file)
+        done = _read_checkpoint(checkpoint)
+        pending = [k for k in keywords if k.lower() not in done]
+        self.stdout.write(
+            f"{len(keywords)} keywords, {len(keywords) - len(pending)} already done, {len(pending)} to fetch."
+        )
+        if not pending:
+            return
+        if get_redis() is None:
+            self.stderr.write(
+                "Redis is unavailable: the rate limit and budget are enforced per worker process, not shared."
+            )
+
+        max_pages = options['pages'] or settings.NEWS_INGEST_MAX_PAGES
+        workers = max(1, min(options['workers'], len(pending)))
+        totals = {'done': 0, 'deferred': 0, 'failed': 0, 'saved': 0}
+        failed = []
+        stop_reason = None
+        started = time.perf_counter()
+
+        connections.close_all()
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        )
+        try:
+            with open(checkpoint, 'a', encoding='utf-8') as ckpt:
+                futures = [pool.submit(_backfill_keyword, user.pk, k, max_pages) for k in pending]
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    if result['status'] == 'done':
+                        totals['done'] += 1
+                        totals['saved'] += result['saved']
+                        ckpt.write(json.dumps({
+                            'keyword': result['keyword'], 'saved': result['saved'],
+                            'at': timezone.now().isoformat(),
+                        }) + '\n')
+                        ckpt.flush()
+                        os.fsync(ckpt.fileno())
+                    elif result['status'] in ('budget', 'circuit'):
+                        # Keywords already running finish; the rest wait for the next run.
+                        stop_reason = stop_reason or result['error']
+                        for pending_future in futures:
+                            pending_future.cancel()
+                    elif result['status'] == 'rate':
+                        # The rate limiter was busy; not an error, the keyword is fetched on the next run.
+                        totals['deferred'] += 1
+                    else:
+                        totals['failed'] += 1
+                        totals['saved'] += result['saved']
+                        failed.append(result)
+
+                    finished = totals['done'] + totals['deferred'] + totals['failed']
+                    if finished < len(pending) and finished % options['progress_every'] == 0:
+                        self._report(totals, started, len(pending))
+        except KeyboardInterrupt:
+            stop_reason = "interrupted"
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        self._report(totals, started, len(pending))
+        for result in failed[:20]:
+            self.stderr.write(f"  failed '{result['keyword']}': {result['error']}")
+        if stop_reason:
+            self.stderr.write(f"Stopped early ({stop_reason}); run the command again to resume from {checkpoint}.")
+        elif totals['deferred']:
+            self.stderr.write(
+                f"{totals['deferred']} keywords deferred by the rate limiter; run the command again to fetch them."
+            )
+        if failed:
+            raise CommandError(f"{len(failed)} keywords failed; run the command again to retry them.")
+
+    def _report(self, totals, started, total):
+        elapsed = time.perf_counter() - started
+        finished = totals['done'] + totals['deferred'] + totals['failed']
+        self.stdout.write(
+            f"{finished}/{total} keywords in {elapsed:.1f}s "
+            f"({finished / elapsed:.2f} keywords/s, {totals['saved'] / elapsed:.1f} articles/s), "
+            f"{totals['deferred']} deferred, {totals['failed']} failed"
+        )
@@ -0,0 +1,135 @@
+"""
+Microbenchmark for the article listing read path.
+
+Seeds a throwaway database with `--rows` articles spread over a few keyword searches, then reads
+them back once as `NewsArticle` model instances (queryset iteration) and once as `ArticleRow`
+records (news.listings), touching the fields the history page displays. Reports CPU time per row
+(best of `--repeat` runs) and the memory held per row while the whole listing is in memory.
+
+Usage:
+    python manage.py bench_article_rows --rows 100000
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DISPLAYED = ('title', 'description', 'url', 'published_at', 'source_name', 'language')
+
+
+def _read_models(queryset):
+    articles = list(queryset)
+    for article in articles:
+        for field in DISPLAYED:
+            getattr(article, field)
+    return articles
+
+
+def _read_rows(queryset):
+    from news.listings import article_rows
+
+    rows = list(article_rows(queryset))
+    for row in rows:
+        for field in DISPLAYED:
+            getattr(row, field)
+    return rows
+
+
+READERS = {'queryset': _read_models, 'rows': _read_rows}
+
+
+class Command(BaseCommand):
+    help = "Compares per-row CPU and memory of model instances and ArticleRow records for article listings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--searches', type=int, default=10, help="Keyword searches the rows are spread over.")
+        parser.add_argument('--repeat', type=int, default=3)
+        # Internal: run the workload in this process against the configured database.
+        parser.add_argument('--run-workload', action='store_true', help="(internal)")
+
+    def handle(self, *args, **options):
+        if options['run_workload']:
+            self._run_workload(options)
+            return
+
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, NEWS_DB_NAME=str(Path(tmp) / 'bench.sqlite3'))
+            manage = [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py')]
+            subprocess.run(manage + ['migrate', '--verbosity', '0'], env=env, check=True)
+            cmd = manage + [
+                'bench_article_rows', '--run-workload',
+                '--rows', str(options['rows']),
+                '--searches', str(options['searches']),
+                '--repeat', str(options['repeat']),
+            ]
+            out = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+        results = json.loads(out.strip().splitlines()[-1])
+
+        rows = options['rows']
+        self.stdout.write(f"{rows} rows")
+        self.stdout.write(f"{'reader':<10}{'total s':>10}{'us/row':>10}{'bytes/row':>12}{'peak MB':>10}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<10}{r['cpu']:>10.3f}{r['cpu'] / rows * 1e6:>10.2f}"
+                f"{r['held'] / rows:>12.0f}{r['peak'] / 1024 / 1024:>10.1f}"
+            )
+        base, new = results['queryset'], results['rows']
+        self.stdout.write(
+            f"ArticleRow: {base['cpu'] / new['cpu']:.1f}x less CPU, {base['held'] / new['held']:.1f}x less memory held"
+        )
+
+    def _run_workload(self, options):
+        from django.contrib.auth.models import User
+        from news.models import KeywordSearch, NewsArticle
+
+        user, _ = User.objects.get_or_create(username='bench-user')
+        searches = [KeywordSearch.objects.create(user=user, keyword=f"bench-{i}") for i in range(options['searches'])]
+        now = timezone.now()
+        batch = []
+        for i in range(options['rows']):
+            batch.append(NewsArticle(
+                keyword_search=searches[i % len(searches)],
+                title=f"Benchmark article {i} about a developing story",
+                description='Benchmark article body ' * 8,
+                url=f"https://example.com/articles/{i}",
+                published_at=now - timedelta(minutes=i),
+                source_name='Bench',
+                language='en',
+                simhash=i,
+                story_cluster=i,
+            ))
+            if len(batch) == 5000:
+                NewsArticle.objects.bulk_create(batch)
+                batch = []
+        NewsArticle.objects.bulk_create(batch)
+
+        queryset = NewsArticle.objects.filter(keyword_search__in=searches).order_by('keyword_search_id', 'pk')
+        results = {}
+        for name, reader in READERS.items():
+            cpu = []
+            for _ in range(options['repeat']):
+                gc.collect()
+                started = time.process_time()
+                reader(queryset.all())
+                cpu.append(time.process_time() - started)
+
+            gc.collect()
+            tracemalloc.start()
+            held_rows = reader(queryset.all())
+            held, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del held_rows
+            results[name] = {'cpu': min(cpu), 'held': held, 'peak': peak}
+        self.stdout.write(json.dumps(results))
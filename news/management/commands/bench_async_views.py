@@ -0,0 +1,169 @@
+"""
+WSGI vs. ASGI benchmark for the search view under a slow News API.
+
+Starts a local stub of the News API that answers after `--delay` seconds, then submits the
+same number of searches to:
+
+    - the sync `views.search_news` from a fixed pool of `--wsgi-workers` threads, modelling
+      a WSGI server with that many worker threads;
+    - the async `async_views.search_news` from a single event loop, modelling one ASGI worker.
+
+Everything runs against a throwaway test database. The request budget and rate limiter are
+switched off and the circuit breaker is reset before each run, so every search reaches the stub
+and the two modes are compared on the same work.
+
+Usage:
+    python manage.py bench_async_views --requests 200 --delay 0.5 --wsgi-workers 8
+"""
+
+import asyncio
+import json
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+from django.urls import include, path
+
+from news import async_views, views
+from news.circuit import newsapi_breaker
+
+# Served as ROOT_URLCONF during the benchmark so both implementations are reachable at once.
+urlpatterns = [
+    path('bench/sync/', views.search_news),
+    path('bench/async/', async_views.search_news),
+    path('', include('news.urls')),
+]
+
+STUB_PAYLOAD = json.dumps({
+    'status': 'ok',
+    'articles': [
+        {
+            'title': f"Stub article {i}",
+            'description': 'Stub description',
+            'url': f"https://example.com/{i}",
+            'publishedAt': '2025-01-01T00:00:00Z',
+            'source': {'name': 'Stub'},
+        }
+        for i in range(5)
+    ],
+}).encode()
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def _stub_handler(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(STUB_PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(STUB_PAYLOAD)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compares search throughput of the sync (WSGI) and async (ASGI) views under a slow upstream."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--delay', type=float, default=0.5, help="Upstream latency in seconds.")
+        parser.add_argument('--wsgi-workers', type=int, default=8)
+
+    def handle(self, *args, **options):
+        server = _StubServer(('127.0.0.1', 0), _stub_handler(options['delay']))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        upstream = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.settings_dict['TEST']['NAME'] = str(Path(tmp) / 'bench.sqlite3')
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with override_settings(
+                    ROOT_URLCONF=__name__, NEWS_API_URL=upstream,
+                    NEWS_API_RATE_PER_SECOND=0, NEWS_API_DAILY_BUDGET=0,
+                ):
+                    newsapi_breaker.reset()
+                    wsgi = self._run_sync(options)
+                    newsapi_breaker.reset()
+                    results = {
+                        'WSGI (sync view)': wsgi,
+                        'ASGI (async view)': asyncio.run(self._run_async(options)),
+                    }
+            finally:
+                connections.close_all()
+                teardown_databases(old_config, verbosity=0)
+                server.shutdown()
+
+        self.stdout.write(
+            f"{options['requests']} searches, upstream delay {options['delay']}s, "
+            f"{options['wsgi_workers']} WSGI worker threads vs. 1 ASGI event loop"
+        )
+        self.stdout.write(f"{'mode':<20}{'req/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+        for mode, r in results.items():
+            self.stdout.write(f"{mode:<20}{r['rps']:>10.1f}{r['p50']:>10.3f}{r['p95']:>10.3f}")
+
+    def _bench_user(self):
+        from django.contrib.auth.models import User
+        user, _ = User.objects.get_or_create(username='bench-admin', defaults={'is_superuser': True})
+        return user
+
+    def _run_sync(self, options):
+        user = self._bench_user()
+        local = threading.local()
+
+        def one(i):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+                local.client.force_login(user)
+            started = time.monotonic()
+            local.client.post('/bench/sync/', {'keyword': f"sync-{i}"})
+            return time.monotonic() - started
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['wsgi_workers']) as pool:
+            latencies = list(pool.map(one, range(options['requests'])))
+        return _summary(latencies, time.monotonic() - started)
+
+    async def _run_async(self, options):
+        from asgiref.sync import sync_to_async
+        user = await sync_to_async(self._bench_user)()
+        client = AsyncClient()
+        await client.aforce_login(user)
+
+        async def one(i):
+            started = time.monotonic()
+            await client.post('/bench/async/', {'keyword': f"async-{i}"})
+            return time.monotonic() - started
+
+        started = time.monotonic()
+        latencies = await asyncio.gather(*(one(i) for i in range(options['requests'])))
+        return _summary(latencies, time.monotonic() - started)
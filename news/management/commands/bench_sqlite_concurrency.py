@@ -0,0 +1,148 @@
+"""
+Concurrency benchmark for the SQLite database profiles.
+
+Runs web-style writers (new keyword search + article replace) and worker-style writers
+(batched refresh inserts) at the same time against a throwaway database, once per
+NEWS_DB_PROFILE, and reports throughput plus the writes lost to "database is locked" errors.
+
+Usage:
+    python manage.py bench_sqlite_concurrency --seconds 10 --web-writers 8 --worker-writers 2
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+PROFILES = ('default', 'production')
+
+
+def _fake_articles(count, tag):
+    now = timezone.now()
+    return [
+        {
+            'title': f"{tag} article {i}",
+            'description': 'Benchmark article body ' * 8,
+            'url': f"https://example.com/{tag}/{i}",
+            'publishedAt': (now - timedelta(minutes=i)).isoformat(),
+            'source': {'name': 'Bench'},
+            'language': 'en',
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmarks concurrent web and worker writes for each SQLite profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--web-writers', type=int, default=8)
+        parser.add_argument('--worker-writers', type=int, default=2)
+        parser.add_argument('--articles', type=int, default=20, help="Articles per web search.")
+        parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=PROFILES)
+        # Internal: run the workload in this process against the configured database.
+        parser.add_argument('--run-workload', action='store_true', help="(internal)")
+
+    def handle(self, *args, **options):
+        if options['run_workload']:
+            self._run_workload(options)
+            return
+
+        results = {}
+        for profile in options['profiles']:
+            with tempfile.TemporaryDirectory() as tmp:
+                results[profile] = self._run_profile(profile, Path(tmp) / 'bench.sqlite3', options)
+
+        self.stdout.write(f"{'profile':<12}{'web ops/s':>12}{'worker ops/s':>14}{'articles/s':>12}{'lost':>8}{'locked':>8}")
+        for profile, r in results.items():
+            self.stdout.write(
+                f"{profile:<12}{r['web_ops'] / r['seconds']:>12.1f}{r['worker_ops'] / r['seconds']:>14.1f}"
+                f"{r['articles'] / r['seconds']:>12.1f}{r['lost']:>8}{r['locked']:>8}"
+            )
+
+    def _run_profile(self, profile, db_path, options):
+        env = dict(os.environ, NEWS_DB_PROFILE=profile, NEWS_DB_NAME=str(db_path))
+        manage = [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py')]
+        subprocess.run(manage + ['migrate', '--verbosity', '0'], env=env, check=True)
+        cmd = manage + [
+            'bench_sqlite_concurrency', '--run-workload',
+            '--seconds', str(options['seconds']),
+            '--web-writers', str(options['web_writers']),
+            '--worker-writers', str(options['worker_writers']),
+            '--articles', str(options['articles']),
+        ]
+        out = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    def _run_workload(self, options):
+        from django.contrib.auth.models import User
+        from news.models import KeywordSearch
+        from news.utils import ArticleWriteError, replace_articles, save_articles
+
+        user, _ = User.objects.get_or_create(username='bench-user')
+        deadline = time.monotonic() + options['seconds']
+        lock = threading.Lock()
+        totals = {'web_ops': 0, 'worker_ops': 0, 'articles': 0, 'lost': 0, 'locked': 0}
+
+        def record(key, saved, expected):
+            with lock:
+                totals[key] += 1
+                totals['articles'] += saved
+                totals['lost'] += expected - saved
+
+        def web_writer(n):
+            i = 0
+            try:
+                while time.monotonic() < deadline:
+                    i += 1
+                    try:
+                        search, _ = KeywordSearch.objects.get_or_create(user=user, keyword=f"web-{n}-{i % 5}")
+                        saved = replace_articles(search, _fake_articles(options['articles'], f"web-{n}-{i}"))
+                        KeywordSearch.objects.filter(user=user).count()
+                        record('web_ops', saved, options['articles'])
+                    except ArticleWriteError:
+                        # replace_articles removes the partial new set again and keeps the old one
+                        record('web_ops', 0, options['articles'])
+                    except OperationalError:
+                        with lock:
+                            totals['locked'] += 1
+            finally:
+                connection.close()
+
+        def worker_writer(n):
+            i = 0
+            try:
+                search, _ = KeywordSearch.objects.get_or_create(user=user, keyword=f"worker-{n}")
+                while time.monotonic() < deadline:
+                    i += 1
+                    try:
+                        saved = save_articles(search, _fake_articles(settings.NEWS_INGEST_BATCH_SIZE, f"worker-{n}-{i}"))
+                        record('worker_ops', saved, settings.NEWS_INGEST_BATCH_SIZE)
+                    except ArticleWriteError as e:
+                        record('worker_ops', e.saved, settings.NEWS_INGEST_BATCH_SIZE)
+                    except OperationalError:
+                        with lock:
+                            totals['locked'] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=web_writer, args=(n,)) for n in range(options['web_writers'])]
+        threads += [threading.Thread(target=worker_writer, args=(n,)) for n in range(options['worker_writers'])]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        totals['seconds'] = time.monotonic() - started
+        self.stdout.write(json.dumps(totals))
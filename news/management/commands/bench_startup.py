@@ -0,0 +1,171 @@
+"""
+Cold-start benchmark for web and worker processes.
+
+Every measurement runs in a fresh interpreter, `--repeat` times, and the median is reported:
+
+    - check:          `manage.py check`, wall time of the whole process.
+    - wsgi_load:      importing news_project.wsgi (settings, apps, middleware) inside the process.
+    - first_request:  serving a first GET for `--path` right after the WSGI app is loaded.
+    - wsgi_total:     wall time from process start until that first response is complete.
+    - celery_load:    loading the Celery app and importing the task modules, as a worker does.
+    - celery_ready:   `celery worker` from launch until it logs "ready" (needs the broker; skipped
+                      with a note when it is unreachable or `--skip-worker` is given).
+
+Results are printed and appended as one JSON line (with time, git commit and Python version) to
+`--output`, so startup time can be tracked across changes. The default file,
+`<BASE_DIR>/startup-bench.jsonl`, is listed in .gitignore.
+
+Usage:
+    python manage.py bench_startup --repeat 5
+    python manage.py bench_startup --output /var/log/news/startup-bench.jsonl --skip-worker
+"""
+
+import json
+import os
+import platform
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+WSGI_SCRIPT = """
+import io, json, sys, time
+started = time.perf_counter()
+from news_project.wsgi import application
+loaded = time.perf_counter()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+    'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+}
+b''.join(application(environ, lambda status, headers: None))
+print(json.dumps({'wsgi_load': loaded - started, 'first_request': time.perf_counter() - loaded}))
+"""
+
+CELERY_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from news_project.celery import app
+app.loader.import_default_modules()
+print(json.dumps({'celery_load': time.perf_counter() - started}))
+"""
+
+
+def _git_commit(cwd):
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Measures cold-start time of manage.py, the WSGI app and a Celery worker, and logs it to a JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--path', default='/login/', help="Path requested as the first request.")
+        parser.add_argument('--output', default=None, help="JSONL file to append to (defaults to <BASE_DIR>/startup-bench.jsonl).")
+        parser.add_argument('--skip-worker', action='store_true', help="Do not start a Celery worker.")
+        parser.add_argument('--worker-timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        self.base_dir = Path(settings.BASE_DIR)
+        self.env = dict(os.environ, DJANGO_SETTINGS_MODULE='news_project.settings')
+        samples = {}
+
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            self._run([sys.executable, 'manage.py', 'check'])
+            samples.setdefault('check', []).append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            result = self._run([sys.executable, '-c', WSGI_SCRIPT, options['path']])
+            samples.setdefault('wsgi_total', []).append(time.perf_counter() - started)
+            for key, value in result.items():
+                samples.setdefault(key, []).append(value)
+
+            for key, value in self._run([sys.executable, '-c', CELERY_SCRIPT]).items():
+                samples.setdefault(key, []).append(value)
+
+        note = None
+        if options['skip_worker']:
+            note = "worker skipped"
+        else:
+            for _ in range(options['repeat']):
+                ready, note = self._worker_ready(options['worker_timeout'])
+                if ready is None:
+                    break
+                samples.setdefault('celery_ready', []).append(ready)
+
+        medians = {key: round(statistics.median(values), 4) for key, values in samples.items()}
+        for key, value in medians.items():
+            self.stdout.write(f"{key:<15}{value * 1000:>10.1f} ms")
+        if note:
+            self.stdout.write(f"celery_ready   skipped: {note}")
+
+        output = Path(options['output'] or self.base_dir / 'startup-bench.jsonl')
+        with open(output, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps({
+                'at': timezone.now().isoformat(),
+                'commit': _git_commit(self.base_dir),
+                'python': platform.python_version(),
+                'repeat': options['repeat'],
+                'seconds': medians,
+                'note': note,
+            }) + '\n')
+        self.stdout.write(f"Appended to {output}")
+
+    def _run(self, cmd):
+        out = subprocess.run(cmd, cwd=self.base_dir, env=self.env, check=True, capture_output=True, text=True).stdout
+        lines = out.strip().splitlines()
+        try:
+            return json.loads(lines[-1]) if lines else {}
+        except ValueError:
+            return {}
+
+    def _worker_ready(self, timeout):
+        """
+        Starts a throwaway worker on a private queue and times it until it logs "ready".
+
+        Returns:
+            tuple: (seconds or None, note explaining a failure or None).
+        """
+        cmd = [
+            sys.executable, '-m', 'celery', '-A', 'news_project', 'worker', '--pool', 'solo',
+            '-Q', 'bench-startup', '-n', f"bench-startup-{os.getpid()}@%h",
+            '--without-mingle', '--without-gossip', '--without-heartbeat', '--loglevel', 'INFO',
+        ]
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=self.base_dir, env=self.env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True)
+        lines = queue.Queue()
+        threading.Thread(target=lambda: [lines.put(line) for line in proc.stdout], daemon=True).start()
+        last = ''
+        try:
+            while time.perf_counter() - started < timeout:
+                try:
+                    line = lines.get(timeout=0.1)
+                except queue.Empty:
+                    if proc.poll() is not None:
+                        return None, f"worker exited: {last.strip()}"
+                    continue
+                if 'ready.' in line:
+                    return time.perf_counter() - started, None
+                if 'Cannot connect' in line:
+                    return None, f"broker unreachable: {line.strip()[-120:]}"
+                last = line
+            return None, f"worker not ready within {timeout:.0f}s"
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
@@ -0,0 +1,63 @@
+"""
+Load test for interactive task latency while a refresh cycle runs.
+
+Needs the Redis broker and workers for the `interactive` and `scheduled-refresh` queues, e.g.:
+
+    celery -A news_project worker -Q interactive -n interactive@%h
+    celery -A news_project worker -Q scheduled-refresh -n refresh@%h
+
+The test sends `queue_probe` tasks to the interactive queue and records how long each waited
+before a worker started it: first with the system idle, then while the scheduled-refresh queue
+is flooded with `--background-tasks` slow tasks (and, with --real-cycle, a real
+`refresh_all_keywords` run).
+
+Usage:
+    python manage.py loadtest_queues --probes 50 --background-tasks 200 --background-seconds 2
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.tasks import queue_probe, refresh_all_keywords
+
+
+class Command(BaseCommand):
+    help = "Measures interactive queue latency with and without a full refresh cycle running."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--probes', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=0.1, help="Seconds between probes.")
+        parser.add_argument('--background-tasks', type=int, default=200)
+        parser.add_argument('--background-seconds', type=float, default=2.0, help="Work per background task.")
+        parser.add_argument('--real-cycle', action='store_true', help="Also trigger refresh_all_keywords.")
+        parser.add_argument('--timeout', type=float, default=120.0)
+
+    def handle(self, *args, **options):
+        try:
+            idle = self._probe(options)
+        except Exception as e:
+            raise CommandError(f"Probe failed; are the broker and an interactive worker running? {e}")
+
+        if options['real_cycle']:
+            refresh_all_keywords.delay()
+        for _ in range(options['background_tasks']):
+            queue_probe.apply_async(
+                args=[time.time(), options['background_seconds']],
+                queue='scheduled-refresh', priority=6,
+            )
+        loaded = self._probe(options)
+
+        self.stdout.write(f"{'phase':<28}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}")
+        for phase, waits in (('idle', idle), ('during refresh cycle', loaded)):
+            waits = sorted(w * 1000 for w in waits)
+            p95 = waits[max(0, int(len(waits) * 0.95) - 1)]
+            self.stdout.write(f"{phase:<28}{statistics.median(waits):>10.1f}{p95:>10.1f}{waits[-1]:>10.1f}")
+
+    def _probe(self, options):
+        results = []
+        for _ in range(options['probes']):
+            results.append(queue_probe.delay(time.time()))
+            time.sleep(options['interval'])
+        return [r.get(timeout=options['timeout']) for r in results]
@@ -0,0 +1,140 @@
+"""
+Replays archived raw News API responses (see news.rawarchive) into the article tables.
+
+Records are grouped by keyword and the keywords are spread over a pool of worker processes, so no
+two processes write articles for the same keyword search. Each worker reads only its records,
+using the offsets in the segment indexes, and stores them oldest first with `save_articles`
+(skip_existing=True) for every keyword search matching the keyword. Rebuilding or backfilling the
+articles is therefore purely local I/O; the News API is never called.
+
+On SQLite the workers share one write lock. A batch that still cannot be written after the busy
+timeout is counted as failed, reported in the summary, and makes the command exit non-zero; re-run
+it (it skips what was stored) or use fewer workers.
+
+Usage:
+    python manage.py replay_raw_archive --workers 4
+    python manage.py replay_raw_archive --keyword bitcoin --since 2025-06-01
+"""
+
+import multiprocessing
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from news.rawarchive import read_index, read_record
+
+
+def _init_worker():
+    django.setup()
+
+
+def _replay_keyword_group(jobs):
+    """
+    Replays the records of a group of keywords in one worker process.
+
+    Args:
+        jobs (list): (keyword, [(segment, offset, length), ...]) pairs, records in fetch order.
+
+    Returns:
+        dict: Counts of `records`, `articles` read, articles `saved` and `failed` (not written),
+        plus `unmatched` keywords.
+    """
+    from news.models import KeywordSearch
+    from news.utils import ArticleWriteError, save_articles
+
+    totals = {'records': 0, 'articles': 0, 'saved': 0, 'failed': 0, 'unmatched': 0}
+    handles = {}
+    try:
+        for keyword, records in jobs:
+            searches = list(KeywordSearch.objects.filter(keyword__iexact=keyword))
+            if not searches:
+                totals['unmatched'] += 1
+                continue
+            for segment, offset, length in records:
+                fh = handles.get(segment)
+                if fh is None:
+                    fh = handles[segment] = open(segment, 'rb')
+                articles = read_record(segment, offset, length, fh=fh)['response'].get('articles', [])
+                totals['records'] += 1
+                totals['articles'] += len(articles)
+                for search in searches:
+                    try:
+                        totals['saved'] += save_articles(search, articles, skip_existing=True)
+                    except ArticleWriteError as e:
+                        totals['saved'] += e.saved
+                        totals['failed'] += e.failed
+    finally:
+        for fh in handles.values():
+            fh.close()
+        connections.close_all()
+    return totals
+
+
+class Command(BaseCommand):
+    help = "Replays archived raw News API responses into the article tables using a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help="Archive directory (defaults to NEWS_RAW_ARCHIVE_DIR).")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--keyword', action='append', default=[], help="Only replay this keyword (repeatable).")
+        parser.add_argument('--since', default=None, help="Only replay records fetched at or after this ISO date.")
+        parser.add_argument('--until', default=None, help="Only replay records fetched before this ISO date.")
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.NEWS_RAW_ARCHIVE_DIR
+        if not directory:
+            raise CommandError("No archive directory: pass --dir or set NEWS_RAW_ARCHIVE_DIR.")
+
+        wanted = {k.strip().lower() for k in options['keyword']}
+        grouped = defaultdict(list)
+        for entry in read_index(directory):
+            if wanted and entry.keyword.strip().lower() not in wanted:
+                continue
+            # ISO timestamps with the same offset compare correctly as strings
+            if options['since'] and entry.fetched_at < options['since']:
+                continue
+            if options['until'] and entry.fetched_at >= options['until']:
+                continue
+            grouped[entry.keyword.strip().lower()].append((entry.fetched_at, entry.segment, entry.offset, entry.length))
+        if not grouped:
+            self.stdout.write("No archived records match.")
+            return
+
+        # Largest keywords first, each to the currently lightest worker
+        workers = max(1, min(options['workers'], len(grouped)))
+        groups = [[] for _ in range(workers)]
+        loads = [0] * workers
+        for keyword, records in sorted(grouped.items(), key=lambda item: len(item[1]), reverse=True):
+            target = loads.index(min(loads))
+            groups[target].append((keyword, [record[1:] for record in sorted(records)]))
+            loads[target] += len(records)
+
+        started = time.perf_counter()
+        connections.close_all()
+        totals = {'records': 0, 'articles': 0, 'saved': 0, 'failed': 0, 'unmatched': 0}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        ) as pool:
+            for result in pool.map(_replay_keyword_group, groups):
+                for key, value in result.items():
+                    totals[key] += value
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Replayed {totals['records']} responses for {len(grouped)} keywords with {workers} workers "
+            f"in {elapsed:.2f}s ({totals['records'] / elapsed:.1f} responses/s): "
+            f"{totals['articles']} articles read, {totals['saved']} saved, {totals['failed']} failed to write, "
+            f"{totals['unmatched']} keywords without a keyword search skipped."
+        )
+        if totals['failed']:
+            raise CommandError(
+                f"{totals['failed']} articles could not be written (see the log); "
+                f"run the command again, with fewer --workers on SQLite, to store them."
+            )
@@ -0,0 +1,51 @@
+"""
+Copies the primary SQLite database into the replica database file (see news.dbrouting).
+
+Stands in for replication when testing the read replica locally: run it once after `migrate`, or
+keep it running with `--every` to refresh the replica periodically. The copy uses SQLite's online
+backup API, so the primary stays usable while it runs.
+
+Usage:
+    NEWS_DB_REPLICA_NAME=replica.sqlite3 python manage.py sync_replica
+    NEWS_DB_REPLICA_NAME=replica.sqlite3 python manage.py sync_replica --every 5
+"""
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.dbrouting import REPLICA
+
+
+class Command(BaseCommand):
+    help = "Copies the primary SQLite database into the local read replica file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=None, help="Repeat every N seconds until interrupted.")
+
+    def handle(self, *args, **options):
+        replica = settings.DATABASES.get(REPLICA)
+        if replica is None:
+            raise CommandError("No replica configured: set NEWS_DB_REPLICA_NAME.")
+        primary = settings.DATABASES['default']
+        if 'sqlite3' not in primary['ENGINE']:
+            raise CommandError("sync_replica only copies SQLite databases; use the database's own replication.")
+
+        while True:
+            started = time.perf_counter()
+            source = sqlite3.connect(str(primary['NAME']))
+            target = sqlite3.connect(str(replica['NAME']))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f"Copied {primary['NAME']} to {replica['NAME']} in {time.perf_counter() - started:.2f}s")
+            if not options['every']:
+                return
+            try:
+                time.sleep(options['every'])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_alter_keywordsearch_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='story_cluster',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
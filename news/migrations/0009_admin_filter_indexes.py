@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_newsarticle_story_cluster'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='keywordsearch',
+            index=models.Index(fields=['searched_at'], name='keywordsearch_searched_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['published_at'], name='newsarticle_published_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['language'], name='newsarticle_language_idx'),
+        ),
+    ]
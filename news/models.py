@@ -1,7 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 
 
 ### --- Keyword Search Tracking --- ###
@@ -20,7 +18,10 @@ class KeywordSearch(models.Model):
     searched_at = models.DateTimeField(auto_now_add=True)
     last_refreshed = models.DateTimeField(null=True, blank=True)
 
-
+    class Meta:
+        indexes = [
+            models.Index(fields=['searched_at'], name='keywordsearch_searched_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.keyword}"
@@ -40,6 +41,8 @@ class NewsArticle(models.Model):
         published_at (DateTimeField): When it was published.
         source_name (CharField): News source (e.g., BBC, CNN).
         language (CharField): Language of the article.
+        simhash (BigIntegerField): SimHash of title and description (see news.dedupe).
+        story_cluster (BigIntegerField): SimHash of the first article of its near-duplicate story.
     """
     keyword_search = models.ForeignKey(
         KeywordSearch,
@@ -52,6 +55,14 @@ class NewsArticle(models.Model):
     published_at = models.DateTimeField()
     source_name = models.CharField(max_length=200)
     language = models.CharField(max_length=10)
+    simhash = models.BigIntegerField(null=True, blank=True)
+    story_cluster = models.BigIntegerField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['published_at'], name='newsarticle_published_at_idx'),
+            models.Index(fields=['language'], name='newsarticle_language_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -76,14 +87,36 @@ class UserProfile(models.Model):
         return f"{self.user.username} Profile"
 
 
-### --- Signal: Create or Update UserProfile on User Creation --- ###
+### --- Sampled Performance Profiles (see news.profiling) --- ###
 
-@receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+class ProfileSample(models.Model):
     """
-    Signal to create or update UserProfile whenever a User is saved.
+    A sampled request or Celery task that was slow or ran slow SQL.
+
+    Fields:
+        kind (CharField): 'request' or 'task'.
+        name (CharField): Request path or task name.
+        method (CharField): HTTP method (blank for tasks).
+        status_code (int): HTTP status, or None for tasks.
+        duration_ms (float): Wall time of the request or task.
+        query_count (int): SQL statements executed.
+        query_ms (float): Total time spent in SQL.
+        slow_queries (JSONField): Statements over the threshold with their timing and query plan.
+        call_profile (TextField): cProfile summary, captured when the request or task was slow.
+        created_at (DateTimeField): When the sample was recorded.
     """
-    if created:
-        UserProfile.objects.create(user=instance)
-    else:
-        instance.userprofile.save()
+    KIND_CHOICES = [('request', 'Request'), ('task', 'Task')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    name = models.CharField(max_length=255)
+    method = models.CharField(max_length=10, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    slow_queries = models.JSONField(default=list, blank=True)
+    call_profile = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.name} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,303 @@
+"""
+Shared client for the NewsAPI `everything` endpoint.
+
+Every fetch path (views, async views and Celery tasks) calls the API through this module so
+that connection pooling, timeouts, error handling, the shared request budget (news.budget) and
+the circuit breaker (news.circuit) live in one place. Successful responses are also written to
+the raw response archive (news.rawarchive) when it is enabled.
+
+Functions:
+    - fetch_articles: Blocking request using a pooled `requests.Session`.
+    - open_article_stream: Blocking request whose articles are parsed while the body downloads.
+    - afetch_articles: Non-blocking request using a pooled `httpx.AsyncClient`.
+
+`requests` and `httpx` are imported on first use, so processes that never call the API (or only
+use one of the clients) do not pay for importing them at startup.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .budget import BACKGROUND, INTERACTIVE, reserve
+from .circuit import newsapi_breaker
+from .jsonstream import iter_array_items
+from .rawarchive import archive_response, begin_record
+
+logger = logging.getLogger(__name__)
+
+
+class NewsAPIError(Exception):
+    """Raised when the News API cannot be reached or returns an unreadable response."""
+
+
+class BudgetExhaustedError(NewsAPIError):
+    """Raised instead of calling the API when the shared request budget denies the request."""
+
+    def __init__(self, reservation):
+        self.reservation = reservation
+        super().__init__(f"News API request budget denied the request ({reservation.reason})")
+
+
+class CircuitOpenError(NewsAPIError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+# Longest wait for the rate limiter before giving up, per kind of caller. User actions that fan out
+# over many keywords (refresh all, batch search) pass BULK_RATE_LIMIT_WAIT so they queue for tokens
+# instead of failing the keywords that exceed the burst.
+RATE_LIMIT_WAIT = {INTERACTIVE: 1.0, BACKGROUND: 30.0}
+BULK_RATE_LIMIT_WAIT = 30.0
+
+
+def _before_request(kind, max_wait=None):
+    # The breaker is checked first so requests failing fast do not use up budget.
+    if not newsapi_breaker.allow_request():
+        raise CircuitOpenError("News API circuit breaker is open")
+    reservation = reserve(kind, max_wait=RATE_LIMIT_WAIT[kind] if max_wait is None else max_wait)
+    if not reservation.allowed:
+        raise BudgetExhaustedError(reservation)
+
+
+def _record_outcome(status_code, started):
+    # 429 and 5xx mean the provider is struggling; other responses count as healthy.
+    if status_code == 429 or status_code >= 500:
+        newsapi_breaker.record_failure()
+    else:
+        newsapi_breaker.record_success(time.monotonic() - started)
+
+
+def build_params(keyword, from_date=None, **extra):
+    """
+    Builds query parameters for the `everything` endpoint.
+
+    Args:
+        keyword (str): Search keyword.
+        from_date (datetime, optional): Only return articles published after this moment.
+        **extra: Additional NewsAPI parameters (e.g. sortBy, page, pageSize).
+
+    Returns:
+        dict: Query parameters including the API key.
+    """
+    params = {'q': keyword, 'apiKey': settings.NEWS_API_KEY}
+    if from_date is not None:
+        params['from'] = from_date.isoformat()
+    params.update(extra)
+    return params
+
+
+_local = threading.local()
+
+
+def _get_session():
+    # requests.Session is not guaranteed thread-safe, so each thread keeps its own pool.
+    session = getattr(_local, 'session', None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.NEWS_API_MAX_CONNECTIONS)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
+
+
+def fetch_articles(keyword, from_date=None, kind=INTERACTIVE, **extra):
+    """
+    Queries the News API and returns the decoded JSON payload.
+
+    Args:
+        kind (str): INTERACTIVE or BACKGROUND; decides which share of the request budget is used.
+
+    Returns:
+        dict: The API response; callers should check `status == "ok"`.
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open.
+        BudgetExhaustedError: If the shared request budget denies the call.
+        NewsAPIError: On connection errors, timeouts or invalid JSON.
+    """
+    import requests
+
+    _before_request(kind)
+    params = build_params(keyword, from_date, **extra)
+    started = time.monotonic()
+    try:
+        response = _get_session().get(settings.NEWS_API_URL, params=params, timeout=settings.NEWS_API_TIMEOUT)
+        _record_outcome(response.status_code, started)
+        data = response.json()
+    except requests.RequestException as e:
+        newsapi_breaker.record_failure()
+        raise NewsAPIError(str(e)) from e
+    except ValueError as e:
+        raise NewsAPIError(str(e)) from e
+    if isinstance(data, dict) and data.get('status') == 'ok':
+        archive_response(keyword, params, data)
+    return data
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ArticleStream:
+    """
+    Iterates the articles of one News API response while the body is still downloading.
+
+    Created by `open_article_stream`, which has already received the response headers. Articles are
+    decoded one at a time (see news.jsonstream), so memory use does not depend on the page size, and
+    the body is only read as fast as the consumer asks for articles. After iteration `meta` holds
+    the other response fields (`status`, `totalResults`) and `count` the number of articles.
+
+    Raises (while iterating):
+        NewsAPIError: If the download fails, the body is not valid JSON or its status is not "ok".
+    """
+
+    def __init__(self, response, keyword, params):
+        self.keyword = keyword
+        self.meta = {}
+        self.count = 0
+        self._response = response
+        self._record = begin_record(keyword, params)
+
+    def _chunks(self):
+        for chunk in self._response.iter_content(STREAM_CHUNK_SIZE):
+            if self._record is not None:
+                self._record.write(chunk)
+            yield chunk
+
+    def __iter__(self):
+        import requests
+
+        try:
+            articles = iter_array_items(self._chunks(), 'articles')
+            while True:
+                try:
+                    article = next(articles)
+                except StopIteration as done:
+                    self.meta = done.value
+                    break
+                self.count += 1
+                yield article
+        except requests.RequestException as e:
+            newsapi_breaker.record_failure()
+            raise NewsAPIError(str(e)) from e
+        except ValueError as e:
+            raise NewsAPIError(f"Invalid JSON from News API: {e}") from e
+        finally:
+            self.close()
+
+        if self.meta.get('status') != 'ok':
+            raise NewsAPIError(f"News API error for '{self.keyword}': {self.meta.get('message', self.meta)}")
+        if self._record is not None:
+            try:
+                self._record.commit()
+            except OSError as e:
+                logger.error(f"Could not archive News API response for '{self.keyword}': {e}")
+            self._record = None
+
+    def close(self):
+        """Releases the connection and drops an unfinished archive record."""
+        self._response.close()
+        if self._record is not None and self.meta.get('status') != 'ok':
+            self._record.abort()
+            self._record = None
+
+
+def open_article_stream(keyword, from_date=None, kind=INTERACTIVE, max_wait=None, **extra):
+    """
+    Sends a News API request and returns an `ArticleStream` over its articles.
+
+    Budget, circuit breaker and HTTP errors are raised here, before any article is consumed.
+
+    Args:
+        max_wait (float, optional): Seconds to wait for the rate limiter; defaults to RATE_LIMIT_WAIT[kind].
+
+    Returns:
+        ArticleStream: Lazily parsed articles of the response.
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open.
+        BudgetExhaustedError: If the shared request budget denies the call.
+        NewsAPIError: On connection errors, timeouts or an error response.
+    """
+    import requests
+
+    _before_request(kind, max_wait)
+    params = build_params(keyword, from_date, **extra)
+    started = time.monotonic()
+    try:
+        response = _get_session().get(
+            settings.NEWS_API_URL, params=params, timeout=settings.NEWS_API_TIMEOUT, stream=True,
+        )
+    except requests.RequestException as e:
+        newsapi_breaker.record_failure()
+        raise NewsAPIError(str(e)) from e
+    _record_outcome(response.status_code, started)
+    if response.status_code >= 400:
+        try:
+            message = response.json().get('message', response.status_code)
+        except (ValueError, AttributeError):
+            message = response.status_code
+        finally:
+            response.close()
+        raise NewsAPIError(f"News API error for '{keyword}': {message}")
+    return ArticleStream(response, keyword, params)
+
+
+_async_clients = {}
+
+
+def _get_async_client():
+    # An httpx.AsyncClient is bound to the event loop it was first used on,
+    # so one pooled client is kept per running loop.
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+
+        for old_loop in [l for l in _async_clients if l.is_closed()]:
+            del _async_clients[old_loop]
+        client = httpx.AsyncClient(
+            timeout=settings.NEWS_API_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.NEWS_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NEWS_API_MAX_CONNECTIONS,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def afetch_articles(keyword, from_date=None, kind=INTERACTIVE, **extra):
+    """
+    Async counterpart of `fetch_articles` sharing one connection pool per event loop.
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open.
+        BudgetExhaustedError: If the shared request budget denies the call.
+        NewsAPIError: On connection errors, timeouts or invalid JSON.
+    """
+    import httpx
+
+    await sync_to_async(_before_request, thread_sensitive=False)(kind)
+    params = build_params(keyword, from_date, **extra)
+    started = time.monotonic()
+    try:
+        response = await _get_async_client().get(settings.NEWS_API_URL, params=params)
+    except httpx.HTTPError as e:
+        await sync_to_async(newsapi_breaker.record_failure, thread_sensitive=False)()
+        raise NewsAPIError(str(e)) from e
+    await sync_to_async(_record_outcome, thread_sensitive=False)(response.status_code, started)
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise NewsAPIError(str(e)) from e
+    if settings.NEWS_RAW_ARCHIVE_DIR and isinstance(data, dict) and data.get('status') == 'ok':
+        await sync_to_async(archive_response, thread_sensitive=False)(keyword, params, data)
+    return data
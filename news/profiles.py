@@ -0,0 +1,65 @@
+"""
+Cached access to UserProfile.
+
+Every search checks the user's quota and block status, so the profile is read on most
+authenticated requests. `get_profile` keeps it in the shared Django cache for
+NEWS_PROFILE_CACHE_TTL seconds. Saving or deleting a profile drops the cached copy (see
+news.signals); code that changes profiles with `QuerySet.update`, which sends no signals, must
+call `invalidate_profiles` itself.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'news:profile:'
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def get_profile(user):
+    """
+    Returns the user's profile, from the cache when possible.
+
+    Args:
+        user (User): The user whose profile is wanted.
+
+    Returns:
+        UserProfile: The profile (without its `user` relation loaded).
+
+    Raises:
+        UserProfile.DoesNotExist: If the user has no profile. Missing profiles are not cached.
+    """
+    key = _key(user.pk)
+    try:
+        profile = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Profile cache lookup failed for user {user.pk}: {e}")
+        return UserProfile.objects.get(user_id=user.pk)
+    if profile is None:
+        profile = UserProfile.objects.get(user_id=user.pk)
+        try:
+            cache.set(key, profile, settings.NEWS_PROFILE_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Could not cache profile of user {user.pk}: {e}")
+    return profile
+
+
+def invalidate_profiles(user_ids):
+    """
+    Drops the cached profiles of the given users so the next `get_profile` reads the database.
+    """
+    keys = [_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.error(f"Could not invalidate cached profiles for users {list(user_ids)}: {e}")
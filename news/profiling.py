@@ -0,0 +1,221 @@
+"""
+Opt-in sampling profiler for web requests and Celery tasks.
+
+With NEWS_PROFILER_SAMPLE_RATE > 0 that share of requests (ProfilerMiddleware) and Celery tasks
+(task_prerun/task_postrun signals) is sampled. While a sample runs:
+
+    - every SQL statement on every database connection is timed; statements slower than
+      NEWS_PROFILER_SLOW_SQL_MS are kept and, once the request or task has finished, their query
+      plan is captured (`EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN` elsewhere);
+    - the calling thread runs under cProfile; when the whole request or task took longer than
+      NEWS_PROFILER_SLOW_MS, the top functions by cumulative time are kept.
+
+The task handlers are connected by news_project.celery, so only worker processes load Celery.
+Samples with slow SQL or a slow total time are stored as ProfileSample rows and listed in the
+admin; fast samples are discarded. When the rate is 0 the middleware removes itself from the
+stack and the task signal handlers return after one comparison, so there is no overhead.
+"""
+
+import io
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Slow statements stored per sample, and functions listed in a call profile.
+MAX_SLOW_QUERIES = 20
+PROFILE_LINES = 40
+
+
+def should_sample():
+    rate = settings.NEWS_PROFILER_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class Sample:
+    """
+    Collects SQL timings and a call profile for one request or task.
+
+    Use as a context manager around the work, then call `save`.
+
+    Args:
+        kind (str): 'request' or 'task'.
+        name (str): Request path or task name.
+    """
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name[:255]
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.slow_queries = []
+        self.duration_ms = 0.0
+        import cProfile  # only needed once a request or task is sampled
+
+        self._stack = ExitStack()
+        self._profiler = cProfile.Profile()
+        self._profiling = False
+        self._started = 0.0
+
+    def __enter__(self):
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._time_query(alias)))
+        try:
+            self._profiler.enable()
+            self._profiling = True
+        except ValueError:
+            # Another profiler is already active on this thread; keep the SQL timings only.
+            pass
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if self._profiling:
+            self._profiler.disable()
+        self._stack.close()
+        return False
+
+    def _time_query(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                self.query_count += 1
+                self.query_ms += elapsed
+                if elapsed >= settings.NEWS_PROFILER_SLOW_SQL_MS and len(self.slow_queries) < MAX_SLOW_QUERIES:
+                    self.slow_queries.append({
+                        'alias': alias, 'sql': sql, 'params': None if many else params,
+                        'ms': round(elapsed, 2), 'many': many,
+                    })
+        return wrapper
+
+    @property
+    def slow(self):
+        return self.duration_ms >= settings.NEWS_PROFILER_SLOW_MS
+
+    def call_profile(self):
+        """
+        Returns the top functions by cumulative time as text, or '' if the sample was not profiled.
+        """
+        if not self._profiling:
+            return ''
+        import pstats
+
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        return out.getvalue()
+
+    def save(self, method='', status_code=None):
+        """
+        Stores the sample if it was slow or ran slow SQL, adding query plans for the slow statements.
+
+        Returns:
+            ProfileSample or None: The stored sample, or None if it was discarded.
+        """
+        if not (self.slow or self.slow_queries):
+            return None
+        from .models import ProfileSample
+
+        try:
+            for query in self.slow_queries:
+                query['plan'] = explain(query['alias'], query['sql'], query['params']) if not query['many'] else ''
+                query['params'] = _printable(query['params'])
+            return ProfileSample.objects.create(
+                kind=self.kind,
+                name=self.name,
+                method=method,
+                status_code=status_code,
+                duration_ms=round(self.duration_ms, 2),
+                query_count=self.query_count,
+                query_ms=round(self.query_ms, 2),
+                slow_queries=self.slow_queries,
+                call_profile=self.call_profile() if self.slow else '',
+            )
+        except Exception as e:
+            logger.error(f"Could not store profile sample for {self.kind} {self.name}: {e}")
+            return None
+
+
+def _printable(params):
+    if params is None:
+        return None
+    return [p if isinstance(p, (int, float, bool, type(None))) else str(p)[:200] for p in params]
+
+
+def explain(alias, sql, params):
+    """
+    Returns the database's query plan for a statement, without running it.
+
+    Args:
+        alias (str): Database alias the statement ran on.
+        sql (str): The statement, with placeholders.
+        params (sequence or None): Its parameters.
+
+    Returns:
+        str: One plan line per row, or a note if the plan could not be obtained.
+    """
+    statement = sql.lstrip()[:6].upper()
+    if not statement.startswith(('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')):
+        return ''
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(' | '.join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+
+class ProfilerMiddleware:
+    """
+    Samples NEWS_PROFILER_SAMPLE_RATE of requests (see module docstring).
+
+    Place it first in MIDDLEWARE so the sample covers the whole middleware stack. It is removed at
+    startup when the rate is 0. For streaming responses only the time until the view returns is
+    measured.
+    """
+
+    def __init__(self, get_response):
+        if settings.NEWS_PROFILER_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_sample():
+            return self.get_response(request)
+        with Sample('request', request.path) as sample:
+            response = self.get_response(request)
+        sample.save(method=request.method, status_code=response.status_code)
+        return response
+
+
+_task_samples = threading.local()
+
+
+def start_task_sample(task_id=None, task=None, **kwargs):
+    if not should_sample():
+        return
+    sample = Sample('task', task.name)
+    sample.__enter__()
+    if not hasattr(_task_samples, 'active'):
+        _task_samples.active = {}
+    _task_samples.active[task_id] = sample
+
+
+def finish_task_sample(task_id=None, **kwargs):
+    sample = getattr(_task_samples, 'active', {}).pop(task_id, None)
+    if sample is None:
+        return
+    sample.__exit__(None, None, None)
+    sample.save()
@@ -0,0 +1,228 @@
+"""
+Append-only archive of raw News API responses.
+
+When NEWS_RAW_ARCHIVE_DIR is set, every successful News API response is written to a
+gzip-compressed NDJSON segment in that directory, one JSON record per line:
+
+    {"keyword": ..., "fetched_at": ..., "params": {...}, "response": {...}}
+
+Each record is its own gzip member, so the segment stays a valid .gz file that `zcat` can read and
+any record can be decompressed on its own. Next to every segment an index file lists one line per
+record with its byte offset, compressed length, keyword and fetch time; the replay command
+(`replay_raw_archive`) uses it to read only the records it needs.
+
+Responses that are streamed (see news.newsapi.ArticleStream) are compressed into a temporary file
+while they download and appended once complete, so archiving never holds a whole response in memory.
+
+Every process writes its own segments (host and pid are part of the name), so web and Celery
+processes never append to the same file. A segment is closed and a new one started once it grows
+beyond NEWS_RAW_SEGMENT_MAX_MB or is older than NEWS_RAW_SEGMENT_MAX_MINUTES.
+"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.ndjson.gz'
+INDEX_SUFFIX = '.idx'
+
+IndexEntry = namedtuple('IndexEntry', ['segment', 'offset', 'length', 'keyword', 'fetched_at'])
+
+
+class RawResponseArchive:
+    """
+    Writer for one process's raw response segments.
+
+    Args:
+        directory (str or Path): Directory holding segments and their indexes.
+        max_bytes (int): Compressed size after which the segment is rotated.
+        max_seconds (float): Age after which the segment is rotated.
+    """
+
+    def __init__(self, directory, max_bytes, max_seconds):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._opened_at = 0.0
+        self._seq = 0
+
+    def _rotate(self):
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._seq += 1
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        name = f"raw-{stamp}-{socket.gethostname()}-{os.getpid()}-{self._seq}"
+        self._segment = open(self.directory / f"{name}{SEGMENT_SUFFIX}", 'ab')
+        self._index = open(self.directory / f"{name}{INDEX_SUFFIX}", 'a', encoding='utf-8')
+        self._opened_at = time.monotonic()
+
+    def append(self, keyword, params, response):
+        """
+        Appends one decoded response as a separate gzip member and indexes it.
+        """
+        record = PendingRecord(self, keyword, params)
+        record.write(json.dumps(response).encode('utf-8'))
+        record.commit()
+
+    def _append_member(self, member, length, keyword, fetched_at):
+        # The index line is written after the data is flushed, so an indexed record is always complete.
+        with self._lock:
+            if (
+                self._segment is None
+                or self._segment.tell() >= self.max_bytes
+                or time.monotonic() - self._opened_at >= self.max_seconds
+            ):
+                self._rotate()
+            offset = self._segment.tell()
+            shutil.copyfileobj(member, self._segment)
+            self._segment.flush()
+            self._index.write(json.dumps({'o': offset, 'n': length, 'k': keyword, 't': fetched_at}) + '\n')
+            self._index.flush()
+
+    def close(self):
+        for fh in (self._segment, self._index):
+            if fh is not None:
+                fh.close()
+        self._segment = self._index = None
+
+
+class PendingRecord:
+    """
+    A record whose response body is archived while it is still being downloaded.
+
+    Raw body chunks are compressed into a temporary file as they arrive, so memory use does not grow
+    with the response size. `commit` appends the finished gzip member to the current segment;
+    `abort` (e.g. for an error response) discards it.
+    """
+
+    def __init__(self, archive, keyword, params):
+        self.archive = archive
+        self.keyword = keyword
+        self.fetched_at = timezone.now().isoformat()
+        self._file = tempfile.TemporaryFile()
+        self._zip = zlib.compressobj(wbits=31)  # gzip container
+        header = json.dumps({'keyword': keyword, 'fetched_at': self.fetched_at, 'params': params})
+        self._file.write(self._zip.compress(header[:-1].encode('utf-8') + b', "response": '))
+
+    def write(self, chunk):
+        # Raw newlines can only be insignificant whitespace in JSON, so dropping them keeps one record per line.
+        self._file.write(self._zip.compress(chunk.replace(b'\n', b' ').replace(b'\r', b' ')))
+
+    def commit(self):
+        self._file.write(self._zip.compress(b'}\n') + self._zip.flush())
+        length = self._file.tell()
+        self._file.seek(0)
+        try:
+            self.archive._append_member(self._file, length, self.keyword, self.fetched_at)
+        finally:
+            self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+
+_archive = None
+_archive_pid = None
+_archive_lock = threading.Lock()
+
+
+def _get_archive():
+    # Recreated after a fork so Celery pool processes get their own segments.
+    global _archive, _archive_pid
+    with _archive_lock:
+        if _archive is None or _archive_pid != os.getpid():
+            _archive = RawResponseArchive(
+                settings.NEWS_RAW_ARCHIVE_DIR,
+                max_bytes=settings.NEWS_RAW_SEGMENT_MAX_MB * 1024 * 1024,
+                max_seconds=settings.NEWS_RAW_SEGMENT_MAX_MINUTES * 60,
+            )
+            _archive_pid = os.getpid()
+        return _archive
+
+
+def archive_response(keyword, params, response):
+    """
+    Archives a raw News API response if NEWS_RAW_ARCHIVE_DIR is configured.
+
+    The API key is removed from `params`. Archive errors are logged and never reach the caller.
+    """
+    if not settings.NEWS_RAW_ARCHIVE_DIR:
+        return
+    params = {key: value for key, value in params.items() if key != 'apiKey'}
+    try:
+        _get_archive().append(keyword, params, response)
+    except (OSError, TypeError, ValueError) as e:
+        logger.error(f"Could not archive News API response for '{keyword}': {e}")
+
+
+def begin_record(keyword, params):
+    """
+    Starts archiving a response that will be streamed in chunks.
+
+    Returns:
+        PendingRecord or None: None when NEWS_RAW_ARCHIVE_DIR is not configured or the record
+        cannot be created.
+    """
+    if not settings.NEWS_RAW_ARCHIVE_DIR:
+        return None
+    params = {key: value for key, value in params.items() if key != 'apiKey'}
+    try:
+        return PendingRecord(_get_archive(), keyword, params)
+    except OSError as e:
+        logger.error(f"Could not archive News API response for '{keyword}': {e}")
+        return None
+
+
+def read_index(directory):
+    """
+    Yields an IndexEntry for every archived record in `directory`, segment by segment.
+
+    Index lines that are cut off (e.g. by a crash while writing) are skipped.
+    """
+    for index_path in sorted(Path(directory).glob(f"*{INDEX_SUFFIX}")):
+        segment = str(index_path)[:-len(INDEX_SUFFIX)] + SEGMENT_SUFFIX
+        with open(index_path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping damaged index line in {index_path}")
+                    continue
+                yield IndexEntry(segment, entry['o'], entry['n'], entry['k'], entry['t'])
+
+
+def read_record(segment, offset, length, fh=None):
+    """
+    Reads and decodes a single archived record.
+
+    Args:
+        fh (file, optional): An already open binary handle for `segment`, to avoid reopening it.
+
+    Returns:
+        dict: The archived record (`keyword`, `fetched_at`, `params`, `response`).
+    """
+    if fh is None:
+        with open(segment, 'rb') as own:
+            own.seek(offset)
+            data = own.read(length)
+    else:
+        fh.seek(offset)
+        data = fh.read(length)
+    return json.loads(gzip.decompress(data))
@@ -0,0 +1,45 @@
+"""
+Shared Redis connection for cross-process coordination (locks, counters, breaker state).
+
+`get_redis()` returns None when Redis is unreachable so callers can fall back to an in-process
+stand-in; reconnection is retried at most every RETRY_SECONDS.
+"""
+
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 30
+
+_lock = threading.Lock()
+_client = None
+_next_attempt = 0.0
+
+
+def get_redis():
+    """
+    Returns a connected Redis client for NEWS_REDIS_URL, or None if Redis is unavailable.
+    """
+    global _client, _next_attempt
+    if _client is not None:
+        return _client
+    with _lock:
+        if _client is not None or time.monotonic() < _next_attempt:
+            return _client
+        try:
+            client = redis.Redis.from_url(
+                settings.NEWS_REDIS_URL,
+                socket_timeout=settings.NEWS_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.NEWS_REDIS_TIMEOUT,
+            )
+            client.ping()
+            _client = client
+        except redis.RedisError as e:
+            _next_attempt = time.monotonic() + RETRY_SECONDS
+            logger.warning(f"Redis unavailable at {settings.NEWS_REDIS_URL}, using local fallback: {e}")
+    return _client
@@ -0,0 +1,167 @@
+"""
+Retention policy for stored news articles.
+
+Nothing else in the app removes old `NewsArticle` rows, so this module enforces
+two limits configured in settings:
+
+    - NEWS_RETENTION_MAX_AGE_DAYS: articles published before this many days ago
+      are removed (0 disables the age limit).
+    - NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD: only the newest N articles are
+      kept for each keyword search (0 disables the per-keyword limit).
+
+Rows are removed in bounded primary-key chunks, each in its own short
+transaction, so the purge never holds the SQLite write lock for long. When
+NEWS_RETENTION_ARCHIVE_DIR is set, every removed row is first appended to a
+gzip-compressed NDJSON file in that directory.
+"""
+
+import gzip
+import json
+import logging
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .models import KeywordSearch, NewsArticle
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = (
+    'id', 'keyword_search_id', 'title', 'description', 'url',
+    'published_at', 'source_name', 'language', 'simhash', 'story_cluster',
+)
+
+
+class ArticleArchive:
+    """
+    Append-only gzip NDJSON writer for purged articles.
+
+    The file is opened lazily, so runs that remove nothing leave no empty archive behind.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = None
+        self._fh = None
+        self.written = 0
+
+    def write(self, rows):
+        if self._fh is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+            self.path = self.directory / f"articles-{stamp}.ndjson.gz"
+            self._fh = gzip.open(self.path, 'at', encoding='utf-8')
+        for row in rows:
+            self._fh.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            self.written += 1
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def _remove_chunk(ids, archive):
+    """
+    Archives (optionally) and deletes a single chunk of article ids in one transaction.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    if not ids:
+        return 0
+    with transaction.atomic():
+        if archive is not None:
+            archive.write(NewsArticle.objects.filter(id__in=ids).order_by('id').values(*ARCHIVE_FIELDS))
+        deleted, _ = NewsArticle.objects.filter(id__in=ids).delete()
+    return deleted
+
+
+def _purge_by_age(cutoff, chunk_size, archive):
+    """
+    Walks the article table in primary-key windows and removes rows published before `cutoff`.
+    """
+    bounds = NewsArticle.objects.aggregate(lo=Min('id'), hi=Max('id'))
+    if bounds['lo'] is None:
+        return 0
+
+    removed = 0
+    start = bounds['lo']
+    while start <= bounds['hi']:
+        end = start + chunk_size
+        ids = list(
+            NewsArticle.objects
+            .filter(id__gte=start, id__lt=end, published_at__lt=cutoff)
+            .values_list('id', flat=True)
+        )
+        removed += _remove_chunk(ids, archive)
+        start = end
+    return removed
+
+
+def _purge_per_keyword(max_articles, chunk_size, archive):
+    """
+    Keeps only the newest `max_articles` articles for every keyword search.
+    """
+    removed = 0
+    oversized = (
+        KeywordSearch.objects
+        .annotate(article_count=Count('articles'))
+        .filter(article_count__gt=max_articles)
+        .values_list('id', flat=True)
+    )
+    for search_id in oversized:
+        excess = sorted(
+            NewsArticle.objects
+            .filter(keyword_search_id=search_id)
+            .order_by('-published_at', '-id')
+            .values_list('id', flat=True)[max_articles:]
+        )
+        for i in range(0, len(excess), chunk_size):
+            removed += _remove_chunk(excess[i:i + chunk_size], archive)
+    return removed
+
+
+def purge_old_articles():
+    """
+    Applies the configured retention policy to `NewsArticle`.
+
+    Returns:
+        dict: `deleted` (rows removed), `archived` (rows written to the archive),
+              `archive_path` (str or None) and `seconds` (wall time of the run).
+    """
+    started = time.monotonic()
+    max_age_days = settings.NEWS_RETENTION_MAX_AGE_DAYS
+    max_articles = settings.NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD
+    chunk_size = max(1, settings.NEWS_RETENTION_CHUNK_SIZE)
+    archive_dir = settings.NEWS_RETENTION_ARCHIVE_DIR
+
+    archive = ArticleArchive(archive_dir) if archive_dir else None
+    deleted = 0
+    try:
+        if max_age_days:
+            cutoff = timezone.now() - timedelta(days=max_age_days)
+            deleted += _purge_by_age(cutoff, chunk_size, archive)
+        if max_articles:
+            deleted += _purge_per_keyword(max_articles, chunk_size, archive)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    stats = {
+        'deleted': deleted,
+        'archived': archive.written if archive else 0,
+        'archive_path': str(archive.path) if archive and archive.path else None,
+        'seconds': round(time.monotonic() - started, 3),
+    }
+    logger.info(
+        f"Retention purge removed {stats['deleted']} articles in {stats['seconds']}s "
+        f"(archived {stats['archived']} to {stats['archive_path']})"
+    )
+    return stats
@@ -1,25 +1,26 @@
 """
-Signal to automatically create a UserProfile whenever a new user is registered.
-
-This ensures that every non-staff, non-superuser User has a corresponding UserProfile
-created immediately after the User instance is saved.
+Signals keeping UserProfile in step with User.
 
 Functions:
-    - create_user_profile: Triggered after a User instance is saved. If the User is newly created
-      and not a staff/superuser, a UserProfile is created or retrieved.
+    - create_user_profile: Triggered after a User instance is saved. Creates the UserProfile of a
+      newly created user; later saves (e.g. the `last_login` update on every login) do not touch
+      the profile.
+    - invalidate_cached_profile: Triggered after a UserProfile is saved or deleted. Drops the
+      cached copy used by `news.profiles.get_profile`, so quota and block changes apply immediately.
 
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserProfile
+from .profiles import invalidate_profiles
 
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """
-    Signal handler that creates a UserProfile for each newly registered non-admin user.
+    Signal handler that creates a UserProfile for each newly created user.
 
     Args:
         sender (Model): The model class (User) that sent the signal.
@@ -28,5 +29,20 @@ def create_user_profile(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments.
 
     """
-    if created and not instance.is_staff and not instance.is_superuser:
+    if created:
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """
+    Signal handler that drops the cached profile whenever a UserProfile is saved or deleted.
+
+    Args:
+        sender (Model): The model class (UserProfile) that sent the signal.
+        instance (UserProfile): The saved or deleted profile.
+        **kwargs: Additional keyword arguments.
+
+    """
+    invalidate_profiles([instance.user_id])
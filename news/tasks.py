@@ -1,6 +1,13 @@
 from celery import shared_task
+from news_project.celery import app  # noqa: F401  (tasks are sent with the project's app and broker)
+from django.conf import settings
+from django.db.models.functions import Lower
 from .models import KeywordSearch
-from .utils import fetch_and_store_news
+from .utils import fetch_and_store_news, refresh_due, refresh_keyword_search
+from .locks import LeaseLock
+from .newsapi import BudgetExhaustedError, CircuitOpenError
+from .retention import purge_old_articles as apply_retention_policy
+from .warming import warm_trending_keywords as warm_trending
 import logging
 import time
 from celery.schedules import crontab
@@ -9,15 +16,114 @@ logger = logging.getLogger(__name__)
 
 @shared_task(bind=True)
 def refresh_all_keywords(self):
+    """
+    Fetches fresh articles for every searched keyword.
+
+    The whole cycle runs under a heartbeated lease, so a beat trigger that fires while the previous
+    cycle is still running (or a duplicate trigger) exits immediately. Each keyword also takes its
+    own lease and is skipped if another worker is already fetching it.
+    """
+    with LeaseLock('refresh-cycle') as cycle:
+        if not cycle.acquired:
+            logger.info("refresh_all_keywords skipped: previous cycle still running")
+            return
+        try:
+            # One fetch per keyword regardless of case; fetch_and_store_news matches searches case-insensitively
+            keywords = (
+                KeywordSearch.objects.annotate(k=Lower('keyword'))
+                .values_list('k', flat=True).distinct().order_by('k')
+            )
+            for keyword in keywords:
+                if cycle.lost:
+                    logger.error("refresh_all_keywords stopped: cycle lease lost")
+                    return
+                with LeaseLock(f"refresh-keyword:{keyword.lower()}", heartbeat=False) as lease:
+                    if not lease.acquired:
+                        logger.info(f"Skipping '{keyword}': refresh already in progress")
+                        continue
+                    try:
+                        fetch_and_store_news(keyword)
+                    except BudgetExhaustedError as e:
+                        if e.reservation.reason == 'budget':
+                            logger.warning("refresh_all_keywords stopped: background API budget used up")
+                            return
+                        logger.warning(f"Skipping '{keyword}': {str(e)}")
+                    except CircuitOpenError:
+                        logger.warning("refresh_all_keywords stopped: News API circuit breaker is open")
+                        return
+                    except Exception as e:
+                        logger.error(f"Failed to fetch/store news for keyword '{keyword}': {str(e)}")
+        except Exception as e:
+            logger.critical(f"Failed refresh_all_keywords task: {str(e)}")
+
+@shared_task(bind=True)
+def refresh_keyword(self, keyword_search_id):
+    """
+    User-triggered refresh of a single keyword search; routed to the `interactive` queue.
+
+    Sent by the Refresh button of the history page (`views.refresh_news`).
+
+    Returns:
+        dict: `keyword`, `status` and `new_articles`. Status is 'refreshed', 'skipped' (refreshed
+        recently or already in progress), 'budget' or 'rate' (denied by the request budget),
+        'unavailable' (circuit breaker open) or 'failed'.
+    """
+    search = KeywordSearch.objects.filter(pk=keyword_search_id).first()
+    if search is None:
+        return {'keyword': None, 'status': 'failed', 'new_articles': 0}
+    if not refresh_due(search):
+        return {'keyword': search.keyword, 'status': 'skipped', 'new_articles': 0}
+    with LeaseLock(f"refresh-keyword:{search.keyword.lower()}", heartbeat=False) as lease:
+        if not lease.acquired:
+            return {'keyword': search.keyword, 'status': 'skipped', 'new_articles': 0}
+        try:
+            saved = refresh_keyword_search(search)
+            return {'keyword': search.keyword, 'status': 'refreshed', 'new_articles': saved}
+        except BudgetExhaustedError as e:
+            logger.warning(f"Refresh of '{search.keyword}' not possible: {e}")
+            return {'keyword': search.keyword, 'status': e.reservation.reason, 'new_articles': 0}
+        except CircuitOpenError as e:
+            logger.warning(f"Refresh of '{search.keyword}' skipped: {e}")
+            return {'keyword': search.keyword, 'status': 'unavailable', 'new_articles': 0}
+        except Exception as e:
+            logger.error(f"Failed to refresh keyword search {keyword_search_id}: {str(e)}")
+            return {'keyword': search.keyword, 'status': 'failed', 'new_articles': 0}
+
+@shared_task(bind=True)
+def purge_old_articles(self):
+    """
+    Enforces the article retention policy (see news.retention) and reports rows removed and time taken.
+    """
     try:
-        keywords = KeywordSearch.objects.values_list('keyword', flat=True).distinct()
-        for keyword in keywords:
-            try:
-                fetch_and_store_news(keyword)
-            except Exception as e:
-                logger.error(f"Failed to fetch/store news for keyword '{keyword}': {str(e)}")
+        return apply_retention_policy()
     except Exception as e:
-        logger.critical(f"Failed refresh_all_keywords task: {str(e)}")
+        logger.critical(f"Failed purge_old_articles task: {str(e)}")
+
+@shared_task(bind=True)
+def warm_trending_keywords(self):
+    """
+    Pre-fetches the top trending keywords into the cache (see news.warming).
+
+    Runs under a lease so overlapping beat triggers do not fetch the same keywords twice.
+    """
+    if not settings.NEWS_WARM_TOP_N:
+        return None
+    with LeaseLock('warm-cycle') as cycle:
+        if not cycle.acquired:
+            logger.info("warm_trending_keywords skipped: previous run still in progress")
+            return None
+        try:
+            return warm_trending()
+        except Exception as e:
+            logger.critical(f"Failed warm_trending_keywords task: {str(e)}")
+
+# Measures queue wait: returns how long the task sat in the queue (see loadtest_queues)
+@shared_task
+def queue_probe(sent_at, work_seconds=0):
+    started = time.time()
+    if work_seconds:
+        time.sleep(work_seconds)
+    return started - sent_at
 
 # for testing the code
 @shared_task
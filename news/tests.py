@@ -1,3 +1,961 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admin as news_admin
+from . import budget, circuit, dbrouting, locks, retention, tasks, utils
+from .budget import BACKGROUND, INTERACTIVE
+from .circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from .dedupe import SimHashIndex, collapse_clusters, hamming_distance, simhash
+from .jsonstream import iter_array_items
+from .locks import LeaseLock
+from .management.commands import backfill_keywords, replay_raw_archive
+from .models import KeywordSearch, NewsArticle, UserProfile
+from .newsapi import NewsAPIError
+from .profiles import get_profile
+from .redis_client import get_redis
+from .views import UNAVAILABLE_NOTICE, render_stored_results
+
+
+class _Article:
+    def __init__(self, title, story_cluster):
+        self.title = title
+        self.story_cluster = story_cluster
+
+
+IPHONE_BODY = (
+    "Apple on Tuesday unveiled its latest iPhone, featuring a faster processor and improved "
+    "battery life, as it seeks to revive sales."
+)
+
+# The same story as syndicated by different outlets, with the usual small edits.
+IPHONE_VARIANTS = [
+    ("Apple unveils new iPhone with faster chip and longer battery life - Reuters", IPHONE_BODY),
+    ("Apple launches new iPhone with faster chip and longer battery life - BBC News", IPHONE_BODY),
+    ("Apple unveils a new iPhone with faster chip and longer battery life", IPHONE_BODY),
+    ("Apple unveils new iPhone with faster chip and longer battery life | The Verge",
+     IPHONE_BODY.replace(', as', ' as').replace('sales.', 'sales!')),
+    ("Apple unveils new iPhone with faster chip and longer battery life",
+     IPHONE_BODY.replace('revive sales', 'revive slowing sales')),
+    ("Apple unveils new iPhone with faster chip, longer battery life - CNBC",
+     IPHONE_BODY + " Preorders open Friday."),
+]
+
+RATES_BODY = (
+    "The central bank raised its benchmark rate by 25 basis points on Wednesday, saying inflation "
+    "remains too high."
+)
+
+RATES_VARIANTS = [
+    ("Central bank raises interest rates by a quarter point to fight inflation", RATES_BODY),
+    ("Central bank hikes interest rates by a quarter point to fight inflation - AP", RATES_BODY),
+    ("Central bank raises interest rates by quarter point to fight inflation",
+     RATES_BODY.replace('saying inflation', 'saying that inflation')),
+    ("Central bank raises interest rates by a quarter point to fight inflation",
+     RATES_BODY + " Markets had expected the move."),
+]
+
+# Different stories, several sharing the keyword and much of the vocabulary of the ones above.
+UNRELATED = [
+    ("Apple shares fall after weak China sales forecast",
+     "Apple stock dropped 3% on Thursday after the company warned of slowing iPhone demand in China."),
+    ("Apple faces EU antitrust fine over App Store rules",
+     "European regulators fined Apple over rules that stopped music streaming apps from telling "
+     "users about cheaper offers."),
+    ("Apple to open new campus in Austin, adding 5,000 jobs",
+     "Apple said it will build a new campus in Austin, Texas, creating thousands of jobs over the next decade."),
+    ("Samsung unveils new Galaxy phone with faster chip",
+     "Samsung on Wednesday unveiled its latest Galaxy phone with a faster processor and a brighter display."),
+    ("Apple unveils new MacBook Air with M3 chip",
+     "Apple on Monday unveiled a new MacBook Air powered by its M3 chip, with longer battery life."),
+    ("Central bank holds interest rates steady as inflation cools",
+     "The central bank left its benchmark rate unchanged on Wednesday, pointing to slowing inflation."),
+    ("Stock markets rally after central bank decision",
+     "Global stocks rose on Wednesday after the central bank signalled it could pause rate hikes."),
+    ("Inflation falls to lowest level in two years",
+     "Consumer prices rose 2.1% in the year to March, the smallest increase since early 2022."),
+]
+
+
+def _cluster(articles, max_distance=None):
+    """
+    Assigns story clusters the way ArticleSink does and returns one cluster id per article.
+    """
+    index = SimHashIndex(settings.NEWS_DEDUPE_MAX_DISTANCE if max_distance is None else max_distance)
+    clusters = []
+    for title, description in articles:
+        value = simhash(title, description)
+        cluster = index.find(value)
+        cluster = value if cluster is None else cluster
+        index.add(value, cluster)
+        clusters.append(cluster)
+    return clusters
+
+
+class SimHashClusteringTests(SimpleTestCase):
+    def test_syndicated_variants_share_a_cluster(self):
+        for variants in (IPHONE_VARIANTS, RATES_VARIANTS):
+            with self.subTest(story=variants[0][0]):
+                self.assertEqual(len(set(_cluster(variants))), 1)
+
+    def test_unrelated_stories_get_their_own_clusters(self):
+        self.assertEqual(len(set(_cluster(UNRELATED))), len(UNRELATED))
+
+    def test_mixed_feed_groups_by_story(self):
+        feed = [IPHONE_VARIANTS[0], UNRELATED[0], RATES_VARIANTS[0], UNRELATED[4]]
+        feed += IPHONE_VARIANTS[1:] + UNRELATED[5:] + RATES_VARIANTS[1:] + UNRELATED[1:4]
+        clusters = dict(zip(feed, _cluster(feed)))
+
+        self.assertEqual(len({clusters[a] for a in IPHONE_VARIANTS}), 1)
+        self.assertEqual(len({clusters[a] for a in RATES_VARIANTS}), 1)
+        self.assertEqual(len(set(clusters.values())), 2 + len(UNRELATED))
+
+    def test_source_suffix_and_case_are_ignored(self):
+        self.assertEqual(
+            simhash("Apple unveils new iPhone - Reuters", IPHONE_BODY),
+            simhash("APPLE UNVEILS NEW IPHONE | BBC News", IPHONE_BODY),
+        )
+
+    def test_index_finds_every_hash_within_the_threshold(self):
+        base = simhash(*IPHONE_VARIANTS[0])
+        index = SimHashIndex(10)
+        index.add(base, 'story')
+        # Flip bits spread over all bands: up to the threshold is a match, one more is not.
+        for flips in range(12):
+            value = base
+            for i in range(flips):
+                value ^= 1 << (i * 5)
+            value = value - (1 << 64) if value >= 1 << 63 else value
+            with self.subTest(flips=flips):
+                self.assertEqual(hamming_distance(base, value), flips)
+                self.assertEqual(index.find(value), 'story' if flips <= 10 else None)
+
+    def test_articles_without_words_have_no_hash(self):
+        self.assertIsNone(simhash('', None))
+        self.assertIsNone(simhash(' - ', '...'))
+
+    def test_collapse_keeps_first_article_per_cluster(self):
+        articles = [_Article('a', 1), _Article('b', 2), _Article('c', 1), _Article('d', None), _Article('e', 1)]
+        collapsed = collapse_clusters(articles)
+
+        self.assertEqual([a.title for a in collapsed], ['a', 'b', 'd'])
+        self.assertEqual([a.cluster_size for a in collapsed], [3, 1, 1])
+
+
+# --- Redis-backed state machines ---
+#
+# Breaker, budget and locks keep their state in Redis and fall back to an in-process stand-in when
+# it is unreachable. Each test class runs against the stand-in; its *RedisTests subclass repeats
+# the same tests against NEWS_REDIS_URL when a server is reachable.
+
+_redis_checked = []
+
+
+def _redis_client():
+    if not _redis_checked:
+        _redis_checked.append(get_redis())
+    return _redis_checked[0]
+
+
+class _LocalStateMixin:
+    """Runs a test class against the in-process fallback by hiding Redis from `modules`."""
+
+    modules = ()
+
+    def redis(self):
+        return None
+
+    def setUp(self):
+        super().setUp()
+        for module in self.modules:
+            patcher = mock.patch.object(module, 'get_redis', self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class _RedisStateMixin(_LocalStateMixin):
+    """Runs a test class against a real Redis server; skipped when none is reachable."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if _redis_client() is None:
+            raise unittest.SkipTest(f"Redis not reachable at {settings.NEWS_REDIS_URL}")
+
+    def redis(self):
+        return _redis_client()
+
+
+class _Clock:
+    """Stand-in for the `time` module that only advances when asked to (or when slept on)."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(
+    NEWS_BREAKER_FAILURE_THRESHOLD=3, NEWS_BREAKER_SLOW_SECONDS=5, NEWS_BREAKER_RESET_SECONDS=30,
+)
+class CircuitBreakerTests(_LocalStateMixin, SimpleTestCase):
+    modules = (circuit,)
+
+    def setUp(self):
+        super().setUp()
+        self.breaker = CircuitBreaker(f"test-{uuid.uuid4().hex}")
+        self.addCleanup(self.breaker.reset)
+
+    def _trip(self):
+        for _ in range(settings.NEWS_BREAKER_FAILURE_THRESHOLD):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success(0.1)
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+    def test_slow_responses_count_as_failures(self):
+        for _ in range(3):
+            self.breaker.record_success(settings.NEWS_BREAKER_SLOW_SECONDS + 1)
+        self.assertEqual(self.breaker.state(), OPEN)
+
+    def test_half_open_lets_a_single_probe_through(self):
+        self._trip()
+        with self.settings(NEWS_BREAKER_RESET_SECONDS=0):
+            self.assertEqual(self.breaker.state(), HALF_OPEN)
+            self.assertTrue(self.breaker.allow_request())
+            self.assertFalse(self.breaker.allow_request())
+            self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_probe_closes_the_breaker(self):
+        self._trip()
+        with self.settings(NEWS_BREAKER_RESET_SECONDS=0):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probe_reopens_the_breaker(self):
+        self._trip()
+        with self.settings(NEWS_BREAKER_RESET_SECONDS=0):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+
+class CircuitBreakerRedisTests(_RedisStateMixin, CircuitBreakerTests):
+    pass
+
+
+@override_settings(
+    NEWS_API_DAILY_BUDGET=10, NEWS_API_INTERACTIVE_RESERVE=0.2, NEWS_API_DEGRADE_AT=0.9,
+    NEWS_API_RATE_PER_SECOND=0, NEWS_API_BURST=2,
+)
+class RequestBudgetTests(_LocalStateMixin, SimpleTestCase):
+    modules = (budget,)
+
+    def setUp(self):
+        super().setUp()
+        self.clock = _Clock()
+        self.day = date(2025, 1, 1)
+        prefix = f"news:test-budget:{uuid.uuid4().hex}:"
+        for patcher in (
+            mock.patch.object(budget, 'time', self.clock),
+            mock.patch.object(budget, '_today', lambda: self.day),
+            mock.patch.object(budget, '_local', budget._LocalBudget()),
+            mock.patch.object(budget, 'KEY_PREFIX', prefix),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        if self.redis() is not None:
+            self.addCleanup(lambda: [self.redis().delete(key) for key in self.redis().keys(prefix + '*')])
+
+    def _reserve_all(self, kind):
+        granted = 0
+        while budget.reserve(kind).allowed:
+            granted += 1
+        return granted
+
+    def test_background_work_leaves_the_interactive_share(self):
+        self.assertEqual(self._reserve_all(BACKGROUND), 8)
+        denied = budget.reserve(BACKGROUND)
+        self.assertEqual((denied.allowed, denied.reason), (False, 'budget'))
+
+        # Interactive searches may still use their reserve, up to NEWS_API_DEGRADE_AT of the budget.
+        self.assertEqual(self._reserve_all(INTERACTIVE), 1)
+        self.assertEqual(budget.usage(), {'total': 9, INTERACTIVE: 1, BACKGROUND: 8})
+
+    def test_interactive_searches_stop_at_the_degrade_threshold(self):
+        self.assertEqual(self._reserve_all(INTERACTIVE), 9)
+        self.assertTrue(budget.status()['serving_stored_results'])
+
+    @override_settings(NEWS_API_DAILY_BUDGET=0)
+    def test_no_daily_cap_when_budget_is_zero(self):
+        for _ in range(50):
+            self.assertTrue(budget.reserve(BACKGROUND).allowed)
+
+    @override_settings(NEWS_API_DAILY_BUDGET=0, NEWS_API_RATE_PER_SECOND=1, NEWS_API_BURST=2)
+    def test_rate_limiter_denies_beyond_the_burst(self):
+        self.assertTrue(budget.reserve(INTERACTIVE).allowed)
+        self.assertTrue(budget.reserve(INTERACTIVE).allowed)
+
+        denied = budget.reserve(INTERACTIVE)
+        self.assertEqual((denied.allowed, denied.reason), (False, 'rate'))
+        self.assertAlmostEqual(denied.retry_after, 1.0)
+
+        self.clock.sleep(1.0)
+        self.assertTrue(budget.reserve(INTERACTIVE).allowed)
+        self.assertEqual(budget.reserve(INTERACTIVE).reason, 'rate')
+
+    @override_settings(NEWS_API_DAILY_BUDGET=0, NEWS_API_RATE_PER_SECOND=2, NEWS_API_BURST=1)
+    def test_reserve_waits_for_a_token_within_max_wait(self):
+        self.assertTrue(budget.reserve(BACKGROUND).allowed)
+        started = self.clock.now
+
+        self.assertTrue(budget.reserve(BACKGROUND, max_wait=1.0).allowed)
+        self.assertAlmostEqual(self.clock.now - started, 0.5)
+        self.assertEqual(budget.reserve(BACKGROUND, max_wait=0.1).reason, 'rate')
+
+    def test_counts_roll_over_at_midnight(self):
+        self._reserve_all(BACKGROUND)
+        self.assertFalse(budget.reserve(BACKGROUND).allowed)
+
+        self.day = date(2025, 1, 2)
+        self.assertEqual(budget.usage(), {'total': 0, INTERACTIVE: 0, BACKGROUND: 0})
+        self.assertTrue(budget.reserve(BACKGROUND).allowed)
+        self.assertEqual(budget.usage()['total'], 1)
+
+
+class RequestBudgetRedisTests(_RedisStateMixin, RequestBudgetTests):
+    pass
+
+
+class LeaseLockTests(_LocalStateMixin, SimpleTestCase):
+    modules = (locks,)
+
+    def setUp(self):
+        super().setUp()
+        self.name = f"test-{uuid.uuid4().hex}"
+
+    def _steal(self, lock):
+        """Hands the lease to another holder, as if it had expired and been re-acquired elsewhere."""
+        if self.redis() is not None:
+            self.redis().set(lock.key, 'someone-else')
+            self.addCleanup(self.redis().delete, lock.key)
+        else:
+            with locks._local_lock:
+                locks._local_leases[lock.key] = ('someone-else', time.monotonic() + 60)
+            self.addCleanup(locks._local_leases.pop, lock.key, None)
+
+    def test_only_one_holder_at_a_time(self):
+        with LeaseLock(self.name, heartbeat=False) as first:
+            self.assertTrue(first.acquired)
+            with LeaseLock(self.name, heartbeat=False) as second:
+                self.assertFalse(second.acquired)
+        self.assertFalse(first.acquired)
+
+        with LeaseLock(self.name, heartbeat=False) as third:
+            self.assertTrue(third.acquired)
+
+    def test_expired_lease_can_be_taken_over(self):
+        first = LeaseLock(self.name, ttl=0.1, heartbeat=False)
+        self.assertTrue(first.acquire())
+        time.sleep(0.2)
+
+        with LeaseLock(self.name, heartbeat=False) as second:
+            self.assertTrue(second.acquired)
+            # Releasing the expired lease must not remove the new holder's.
+            first.release()
+            with LeaseLock(self.name, heartbeat=False) as third:
+                self.assertFalse(third.acquired)
+
+    def test_heartbeat_renews_the_lease(self):
+        with LeaseLock(self.name, ttl=0.3) as lock:
+            time.sleep(0.6)
+            with LeaseLock(self.name, heartbeat=False) as other:
+                self.assertFalse(other.acquired)
+            self.assertFalse(lock.lost)
+
+    def test_lost_lease_is_reported(self):
+        with LeaseLock(self.name, ttl=0.3) as lock:
+            self.assertTrue(lock.acquired)
+            self._steal(lock)
+            time.sleep(0.25)
+            self.assertTrue(lock.lost)
+            lock.release()
+            # The new holder keeps its lease.
+            with LeaseLock(self.name, heartbeat=False) as other:
+                self.assertFalse(other.acquired)
+
+
+class LeaseLockRedisTests(_RedisStateMixin, LeaseLockTests):
+    pass
+
+
+# --- Incremental JSON parsing ---
+
+def _parse(chunks, key='articles'):
+    items = []
+    parser = iter_array_items(chunks, key)
+    while True:
+        try:
+            items.append(next(parser))
+        except StopIteration as done:
+            return items, done.value
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+PAYLOAD = {
+    'status': 'ok',
+    'totalResults': 12345,
+    'articles': [
+        {'title': 'Café prices rise — again', 'score': 1.5e3, 'tags': ['a', 'b'], 'source': {'name': None}},
+        {'title': '東京で新しい駅が開業', 'description': 'Emoji 🚄 and escapes \"quoted\" \\ \u00e9', 'n': -7},
+        {'title': 'Nested [brackets] and {braces}, commas', 'ok': True, 'empty': {}},
+    ],
+    'note': 'trailing member',
+}
+
+
+class JsonStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.body = json.dumps(PAYLOAD, ensure_ascii=False, indent=1).encode()
+        self.meta = {k: v for k, v in PAYLOAD.items() if k != 'articles'}
+
+    def test_any_chunk_size_gives_the_same_result(self):
+        for size in range(1, len(self.body) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(_parse(_split(self.body, size)), (PAYLOAD['articles'], self.meta))
+
+    def test_every_split_point(self):
+        # Two chunks split at every byte, including inside multibyte characters and numbers.
+        for cut in range(len(self.body) + 1):
+            with self.subTest(cut=cut):
+                chunks = [self.body[:cut], self.body[cut:]]
+                self.assertEqual(_parse(chunks), (PAYLOAD['articles'], self.meta))
+
+    def test_multibyte_characters_split_across_chunks(self):
+        title = '日本 — café 🚄'
+        body = json.dumps({'articles': [{'title': title}]}, ensure_ascii=False).encode()
+        start = body.index('🚄'.encode())
+        # Cut the 4-byte emoji after each of its first three bytes, and feed empty chunks too.
+        for cut in range(start + 1, start + 4):
+            with self.subTest(cut=cut):
+                chunks = [body[:cut], b'', body[cut:]]
+                self.assertEqual(_parse(chunks), ([{'title': title}], {}))
+
+    def test_numbers_cut_by_a_chunk_boundary(self):
+        body = b'{"totalResults": 12345, "score": 1.5e3, "articles": [7, 89]}'
+        for size in range(1, 8):
+            with self.subTest(size=size):
+                self.assertEqual(_parse(_split(body, size)), ([7, 89], {'totalResults': 12345, 'score': 1500.0}))
+
+    def test_members_without_the_array(self):
+        body = b'{"status": "error", "code": "apiKeyInvalid", "message": "Bad key"}'
+        self.assertEqual(_parse(_split(body, 3)), ([], {'status': 'error', 'code': 'apiKeyInvalid', 'message': 'Bad key'}))
+        self.assertEqual(_parse([b'{"articles": [ ]}']), ([], {}))
+        self.assertEqual(_parse([b' { } ']), ([], {}))
+
+    def test_articles_are_yielded_before_the_body_ends(self):
+        chunks = iter([b'{"status": "ok", "articles": [{"id": 1}, ', b'{"id": 2}'])
+        parser = iter_array_items(chunks, 'articles')
+        self.assertEqual(next(parser), {'id': 1})
+        # The second article is complete but the rest of the body never arrives.
+        self.assertEqual(next(parser), {'id': 2})
+        with self.assertRaises(ValueError):
+            next(parser)
+
+    def test_malformed_input_raises_value_error(self):
+        for body in (b'[1, 2]', b'{"articles": [1 2]}', b'{"a": 1 "b": 2}', b'{"articles": [{"id": 1}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ValueError):
+                    _parse(_split(body, 4))
+
+
+# Article ingestion
+#
+# The database tests use the in-process cache: saving a user touches the profile cache (see
+# news.profiles), and the configured cache may need a server.
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def _raw_articles(prefix, count, day=1):
+    return [
+        {
+            'title': f"{prefix} story number {i} about the harbour",
+            'description': f"{prefix} report {i} on shipping delays and port congestion in region {i}",
+            'url': f"https://example.com/{prefix}/{i}",
+            'publishedAt': f"2026-10-{day:02d}T{i % 24:02d}:00:00Z",
+            'source': {'name': 'Example'},
+        }
+        for i in range(count)
+    ]
+
+
+def _fail_batch(number):
+    """Patches `bulk_create` so that the `number`-th batch written fails like a locked database."""
+    real_bulk_create = NewsArticle.objects.bulk_create
+    calls = []
+
+    def bulk_create(objs, *args, **kwargs):
+        calls.append(len(objs))
+        if len(calls) == number:
+            raise RuntimeError("database is locked")
+        return real_bulk_create(objs, *args, **kwargs)
+
+    return mock.patch.object(NewsArticle.objects, 'bulk_create', side_effect=bulk_create)
+
+
+@override_settings(CACHES=LOCAL_CACHE, NEWS_INGEST_BATCH_SIZE=2, NEWS_DEDUPE_DROP_DUPLICATES=False)
+class IngestionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        self.search = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+
+    def titles(self, search=None):
+        return set((search or self.search).articles.values_list('title', flat=True))
+
+    def test_articles_with_overlong_urls_are_skipped(self):
+        articles = _raw_articles('link', 3)
+        articles[1]['url'] = 'https://example.com/' + 'a' * utils.MAX_URL_LENGTH
+        with self.assertLogs('news.utils', 'WARNING'):
+            self.assertEqual(utils.save_articles(self.search, articles), 2)
+        self.assertEqual(self.titles(), {articles[0]['title'], articles[2]['title']})
+
+    def test_failed_batch_keeps_previous_articles(self):
+        utils.replace_articles(self.search, _raw_articles('old', 3))
+        old = self.titles()
+
+        with _fail_batch(2):
+            with self.assertLogs('news.utils', 'ERROR'):
+                with self.assertRaises(utils.ArticleWriteError) as raised:
+                    utils.replace_articles(self.search, _raw_articles('new', 5))
+        self.assertEqual((raised.exception.saved, raised.exception.failed), (3, 2))
+        self.assertEqual(self.titles(), old)
+
+    def test_every_batch_failing_keeps_previous_articles(self):
+        utils.replace_articles(self.search, _raw_articles('old', 3))
+        old = self.titles()
+        with mock.patch.object(NewsArticle.objects, 'bulk_create', side_effect=RuntimeError("database is locked")):
+            with self.assertLogs('news.utils', 'ERROR'):
+                with self.assertRaises(utils.ArticleWriteError):
+                    utils.replace_articles(self.search, _raw_articles('new', 4))
+        self.assertEqual(self.titles(), old)
+
+    def test_articles_are_written_while_the_stream_is_read(self):
+        consumed = []
+        written_after = []
+
+        def stream():
+            for article in _raw_articles('live', 5):
+                consumed.append(article)
+                yield article
+
+        real_bulk_create = NewsArticle.objects.bulk_create
+
+        def bulk_create(objs, *args, **kwargs):
+            written_after.append(len(consumed))
+            return real_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(NewsArticle.objects, 'bulk_create', side_effect=bulk_create):
+            search, saved = utils.store_search(self.user, 'Rail', stream())
+        self.assertEqual(saved, 5)
+        # Batches of 2 go out as soon as they fill (the next article has not been read yet).
+        self.assertEqual(written_after, [2, 4, 5])
+        self.assertEqual(len(self.titles(search)), 5)
+
+    def test_skip_existing_only_adds_new_articles(self):
+        utils.save_articles(self.search, _raw_articles('wire', 3))
+        saved = utils.save_articles(self.search, _raw_articles('wire', 5), skip_existing=True)
+        self.assertEqual(saved, 2)
+        self.assertEqual(self.search.articles.count(), 5)
+
+    def test_replacing_drops_the_previous_articles(self):
+        utils.replace_articles(self.search, _raw_articles('old', 3))
+        self.assertEqual(utils.replace_articles(self.search, _raw_articles('new', 2)), 2)
+        self.assertEqual(self.titles(), {a['title'] for a in _raw_articles('new', 2)})
+
+    def test_error_response_creates_no_search(self):
+        def stream():
+            raise NewsAPIError("apiKeyInvalid")
+            yield
+
+        with self.assertRaises(NewsAPIError):
+            utils.store_search(self.user, 'rail', stream())
+        self.assertFalse(KeywordSearch.objects.filter(keyword='rail').exists())
+
+    def test_stream_failure_keeps_previous_results_and_search_time(self):
+        utils.replace_articles(self.search, _raw_articles('old', 3))
+        old, searched_at = self.titles(), self.search.searched_at
+
+        def stream():
+            yield from _raw_articles('new', 3)
+            raise NewsAPIError("connection reset")
+
+        with self.assertRaises(NewsAPIError):
+            utils.store_search(self.user, 'HARBOUR', stream())
+        self.search.refresh_from_db()
+        self.assertEqual(self.titles(), old)
+        self.assertEqual(self.search.searched_at, searched_at)
+
+    def test_stream_failure_removes_a_new_search(self):
+        def stream():
+            yield from _raw_articles('new', 3)
+            raise NewsAPIError("connection reset")
+
+        with self.assertRaises(NewsAPIError):
+            utils.store_search(self.user, 'rail', stream())
+        self.assertFalse(KeywordSearch.objects.filter(keyword='rail').exists())
+        self.assertEqual(NewsArticle.objects.filter(title__startswith='new').count(), 0)
+
+
+@override_settings(CACHES=LOCAL_CACHE, NEWS_DB_STICKY_SECONDS=10)
+class RefreshViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        self.search = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+        self.client.force_login(self.user)
+
+    def test_refresh_is_queued_without_waiting_and_pins_the_primary(self):
+        with mock.patch('news.views.get_redis', return_value=object()), \
+                mock.patch('news.tasks.refresh_keyword.apply_async') as apply_async, \
+                mock.patch.object(dbrouting, 'replica_configured', return_value=True):
+            response = self.client.get(f'/refresh/{self.search.pk}/')
+
+        apply_async.assert_called_once_with(args=[self.search.pk], retry=False)
+        apply_async.return_value.get.assert_not_called()
+        self.assertRedirects(response, '/history/', fetch_redirect_response=False)
+        self.assertGreater(float(response.cookies[dbrouting.STICKY_COOKIE].value), time.time())
+        messages = [str(m) for m in response.wsgi_request._messages]
+        self.assertEqual(messages, ["Refresh queued; new articles will appear in your history shortly."])
+
+
+@override_settings(
+    CACHES=LOCAL_CACHE, NEWS_RETENTION_MAX_AGE_DAYS=0, NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD=0,
+    NEWS_RETENTION_CHUNK_SIZE=3, NEWS_RETENTION_ARCHIVE_DIR=None,
+)
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        self.harbour = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+        self.rail = KeywordSearch.objects.create(user=self.user, keyword='rail')
+        now = timezone.now()
+        # 10 articles per search, one per day: "<keyword> 0" is today, "<keyword> 9" nine days old.
+        NewsArticle.objects.bulk_create(
+            NewsArticle(
+                keyword_search=search, title=f"{search.keyword} {age}", url=f"https://example.com/{search.keyword}/{age}",
+                published_at=now - timedelta(days=age, hours=1), source_name='Example', language='en',
+            )
+            for search in (self.harbour, self.rail) for age in range(10)
+        )
+        patcher = mock.patch.object(retention, '_remove_chunk', wraps=retention._remove_chunk)
+        self.remove_chunk = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def chunk_sizes(self):
+        return [len(call.args[0]) for call in self.remove_chunk.call_args_list]
+
+    def titles(self, search):
+        return sorted(search.articles.values_list('title', flat=True), key=lambda title: int(title.split()[1]))
+
+    def test_disabled_by_default(self):
+        self.assertEqual(retention.purge_old_articles()['deleted'], 0)
+        self.assertEqual(NewsArticle.objects.count(), 20)
+
+    @override_settings(NEWS_RETENTION_MAX_AGE_DAYS=5)
+    def test_age_limit_is_purged_in_chunks(self):
+        stats = retention.purge_old_articles()
+        self.assertEqual(stats['deleted'], 10)
+        for search in (self.harbour, self.rail):
+            self.assertEqual(self.titles(search), [f"{search.keyword} {age}" for age in range(5)])
+        self.assertTrue(self.chunk_sizes())
+        self.assertLessEqual(max(self.chunk_sizes()), 3)
+
+    @override_settings(NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD=4)
+    def test_per_keyword_cap_keeps_the_newest(self):
+        self.rail.articles.filter(title__in=["rail 7", "rail 8", "rail 9"]).delete()
+        stats = retention.purge_old_articles()
+        self.assertEqual(stats['deleted'], 6 + 3)
+        self.assertEqual(self.titles(self.harbour), ["harbour 0", "harbour 1", "harbour 2", "harbour 3"])
+        self.assertEqual(self.titles(self.rail), ["rail 0", "rail 1", "rail 2", "rail 3"])
+        self.assertEqual(self.chunk_sizes(), [3, 3, 3])
+
+    @override_settings(NEWS_RETENTION_MAX_AGE_DAYS=8, NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD=7)
+    def test_archive_holds_every_removed_row(self):
+        expected = {
+            row['id']: row for row in
+            NewsArticle.objects.filter(title__regex=r' [789]$').values(*retention.ARCHIVE_FIELDS)
+        }
+        with tempfile.TemporaryDirectory() as directory, override_settings(NEWS_RETENTION_ARCHIVE_DIR=directory):
+            stats = retention.purge_old_articles()
+            with gzip.open(stats['archive_path'], 'rt', encoding='utf-8') as fh:
+                archived = [json.loads(line) for line in fh]
+
+        self.assertEqual((stats['deleted'], stats['archived']), (6, 6))
+        self.assertEqual(sorted(row['id'] for row in archived), sorted(expected))
+        for row in archived:
+            original = expected[row['id']]
+            self.assertEqual(set(row), set(retention.ARCHIVE_FIELDS))
+            self.assertEqual(row['title'], original['title'])
+            self.assertEqual(row['keyword_search_id'], original['keyword_search_id'])
+            self.assertEqual(row['url'], original['url'])
+        self.assertFalse(NewsArticle.objects.filter(id__in=expected).exists())
+
+    @override_settings(NEWS_RETENTION_MAX_AGE_DAYS=30)
+    def test_nothing_to_remove_writes_no_archive(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(NEWS_RETENTION_ARCHIVE_DIR=directory):
+            stats = retention.purge_old_articles()
+        self.assertEqual((stats['deleted'], stats['archive_path']), (0, None))
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class StoredResultsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        other = User.objects.create_user('other', password='secret')
+        self.others = KeywordSearch.objects.create(user=other, keyword='Harbour')
+        utils.replace_articles(self.others, _raw_articles('private', 2))
+
+    def test_other_users_searches_are_not_used(self):
+        self.assertIsNone(utils.stored_search_for(self.user, 'harbour'))
+
+    def test_own_search_is_used(self):
+        own = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+        utils.replace_articles(own, _raw_articles('mine', 1))
+        self.assertEqual(utils.stored_search_for(self.user, 'HARBOUR'), own)
+
+    def test_without_own_results_only_the_notice_is_shown(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        response = render_stored_results(request, 'harbour', UNAVAILABLE_NOTICE)
+        self.assertContains(response, UNAVAILABLE_NOTICE)
+        self.assertNotContains(response, 'private story')
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RefreshAllKeywordsTests(_LocalStateMixin, TestCase):
+    modules = (locks,)
+
+    def test_each_keyword_is_fetched_once_regardless_of_case(self):
+        for username, keyword in (('ann', 'Harbour'), ('bob', 'harbour'), ('cat', 'HARBOUR'), ('ann2', 'Rail')):
+            KeywordSearch.objects.create(user=User.objects.create_user(username), keyword=keyword)
+        with mock.patch.object(tasks, 'fetch_and_store_news') as fetch:
+            tasks.refresh_all_keywords.apply()
+        self.assertEqual([call.args[0] for call in fetch.call_args_list], ['harbour', 'rail'])
+
+
+@override_settings(CACHES=LOCAL_CACHE, NEWS_INGEST_BATCH_SIZE=2, NEWS_DEDUPE_DROP_DUPLICATES=False)
+class BulkLoadCommandTests(TestCase):
+    """Failure reporting of the replay and backfill workers (run in-process here)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        self.search = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+
+    def test_replay_counts_articles_that_failed_to_write(self):
+        response = {'response': {'articles': _raw_articles('replay', 5)}}
+        with tempfile.NamedTemporaryFile() as segment, \
+                mock.patch.object(replay_raw_archive, 'read_record', return_value=response), \
+                _fail_batch(2), self.assertLogs('news.utils', 'ERROR'):
+            totals = replay_raw_archive._replay_keyword_group([('harbour', [(segment.name, 0, 1)])])
+        self.assertEqual((totals['saved'], totals['failed']), (3, 2))
+
+    def test_backfill_reports_write_failures_as_failed(self):
+        with mock.patch('news.utils.stream_pages', return_value=iter(_raw_articles('backfill', 5))), \
+                _fail_batch(2), self.assertLogs('news.utils', 'ERROR'):
+            result = backfill_keywords._backfill_keyword(self.user.pk, 'harbour', 1)
+        self.assertEqual((result['status'], result['saved']), ('failed', 3))
+        self.assertIsNone(KeywordSearch.objects.get(pk=self.search.pk).last_refreshed)
+
+
+@override_settings(CACHES=LOCAL_CACHE, NEWS_DEDUPE_DROP_DUPLICATES=False)
+class HistoryFilterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        search = KeywordSearch.objects.create(user=self.user, keyword='harbour')
+        utils.save_articles(search, _raw_articles('first', 2, day=1) + _raw_articles('second', 3, day=2))
+        self.client.force_login(self.user)
+
+    def articles(self, response):
+        return [article['title'] for search in response.json()['searches'] for article in search['articles']]
+
+    def test_api_filters_by_date(self):
+        response = self.client.get('/api/history/', {'date': '2026-10-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.articles(response)), 3)
+
+    def test_api_rejects_an_invalid_date(self):
+        for value in ('foo', '2026-02-30', '2026-10'):
+            with self.subTest(date=value):
+                with self.assertLogs('django.request', 'WARNING'):
+                    response = self.client.get('/api/history/', {'date': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('date', response.json()['errors'])
+
+    def test_history_page_ignores_an_invalid_date(self):
+        response = self.client.get('/history/', {'date': 'foo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['filters']['date'])
+        self.assertEqual(sum(len(search.filtered_articles) for search in response.context['searches']), 5)
+
+
+@override_settings(NEWS_DB_STICKY_SECONDS=10)
+class DatabaseRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = dbrouting.PrimaryReplicaRouter()
+        patcher = mock.patch.object(dbrouting, 'replica_configured', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, method='get', pinned_until=None):
+        request = getattr(RequestFactory(), method)('/')
+        if pinned_until is not None:
+            request.COOKIES[dbrouting.STICKY_COOKIE] = str(pinned_until)
+        return request
+
+    def test_reads_use_the_primary_outside_read_only_code(self):
+        self.assertIsNone(self.router.db_for_read(NewsArticle))
+        with dbrouting.use_replica():
+            self.assertEqual(self.router.db_for_read(NewsArticle), dbrouting.REPLICA)
+        self.assertIsNone(self.router.db_for_read(NewsArticle))
+
+    def test_without_a_replica_everything_uses_the_primary(self):
+        with mock.patch.object(dbrouting, 'replica_configured', return_value=False):
+            with dbrouting.use_replica():
+                self.assertIsNone(self.router.db_for_read(NewsArticle))
+            with self.assertRaises(MiddlewareNotUsed):
+                dbrouting.StickyPrimaryMiddleware(lambda request: HttpResponse())
+
+    def test_writes_and_migrations_stay_on_the_primary(self):
+        with dbrouting.use_replica():
+            self.assertEqual(self.router.db_for_write(NewsArticle), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'news'))
+        self.assertFalse(self.router.allow_migrate(dbrouting.REPLICA, 'news'))
+
+    def test_read_only_views_use_the_replica_unless_pinned(self):
+        view = dbrouting.read_only(lambda request: self.router.db_for_read(NewsArticle))
+        self.assertEqual(view(self.request()), dbrouting.REPLICA)
+        self.assertEqual(view(self.request(pinned_until=time.time() - 1)), dbrouting.REPLICA)
+        self.assertEqual(view(self.request(pinned_until='garbage')), dbrouting.REPLICA)
+        self.assertIsNone(view(self.request(pinned_until=time.time() + 5)))
+
+    def test_sticky_cookie_is_set_after_a_write(self):
+        def writing_view(request):
+            self.router.db_for_write(NewsArticle)
+            return HttpResponse()
+
+        response = dbrouting.StickyPrimaryMiddleware(writing_view)(self.request())
+        cookie = response.cookies[dbrouting.STICKY_COOKIE]
+        self.assertAlmostEqual(float(cookie.value), time.time() + 10, delta=2)
+        self.assertEqual(cookie['max-age'], 10)
+        # The next request from that browser is pinned to the primary.
+        self.assertTrue(dbrouting.primary_pinned(self.request(pinned_until=cookie.value)))
+
+    def test_no_sticky_cookie_without_a_tracked_write(self):
+        def reading_view(request):
+            self.router.db_for_write(Session)  # untracked, written on almost every request
+            return HttpResponse()
+
+        response = dbrouting.StickyPrimaryMiddleware(reading_view)(self.request())
+        self.assertNotIn(dbrouting.STICKY_COOKIE, response.cookies)
+
+    def test_posts_always_start_the_sticky_window(self):
+        response = dbrouting.StickyPrimaryMiddleware(lambda request: HttpResponse())(self.request('post'))
+        self.assertIn(dbrouting.STICKY_COOKIE, response.cookies)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reader', password='secret')
+        self.other = User.objects.create_user('other', password='secret')
+        for user in (self.user, self.other):
+            get_profile(user)  # warm the cache
+
+    def test_profile_is_served_from_the_cache(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(get_profile(self.user).is_blocked)
+
+    def test_saving_a_profile_invalidates_it(self):
+        profile = UserProfile.objects.get(user=self.user)
+        profile.keyword_quota = 42
+        profile.save()
+        self.assertEqual(get_profile(self.user).keyword_quota, 42)
+
+    def test_deleting_a_profile_invalidates_it(self):
+        UserProfile.objects.get(user=self.user).delete()
+        with self.assertRaises(UserProfile.DoesNotExist):
+            get_profile(self.user)
+
+    def run_admin_action(self, action, users, **data):
+        selected = UserProfile.objects.filter(user__in=users).values_list('pk', flat=True)
+        response = self.client.post(
+            reverse('admin:news_userprofile_changelist'),
+            {'action': action, '_selected_action': list(selected), **data},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_admin_bulk_actions_invalidate_the_affected_profiles(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        self.run_admin_action('block_users', [self.user])
+        self.assertTrue(get_profile(self.user).is_blocked)
+        self.assertFalse(get_profile(self.other).is_blocked)
+
+        self.run_admin_action('set_keyword_quota', [self.user, self.other], keyword_quota='7')
+        self.assertEqual([get_profile(u).keyword_quota for u in (self.user, self.other)], [7, 7])
+
+        self.run_admin_action('unblock_users', [self.user])
+        self.assertFalse(get_profile(self.user).is_blocked)
+
+
+class ApproximateCountTests(SimpleTestCase):
+    def test_estimate_uses_the_querysets_database(self):
+        replica = mock.MagicMock(vendor='postgresql')
+        replica.cursor.return_value.__enter__.return_value.fetchone.return_value = (250_000,)
+        with mock.patch.object(news_admin, 'connections', {dbrouting.REPLICA: replica}):
+            paginator = news_admin.ApproximateCountPaginator(NewsArticle.objects.using(dbrouting.REPLICA).all(), 100)
+            self.assertEqual(paginator.count, 250_000)
+        replica.cursor.return_value.__enter__.return_value.execute.assert_called_once()
@@ -6,27 +6,49 @@ It maps each URL path to the corresponding view function or class-based view.
 
 Routes:
     - '' (search_news): Homepage for searching news by keyword.
+    - 'search/batch/' (batch_search_news): Searches a list of keywords at once, streaming per-keyword progress.
     - 'history/' (search_history): Displays the user's search history and previously fetched articles.
+    - 'history/export.csv' (export_history_csv): Streams the user's stored articles as CSV, with the history filters.
+    - 'api/history/' (api_history_articles): The user's searches and articles as JSON, with the history filters.
     - 'refresh/<int:keyword_id>/' (refresh_news): Fetches and updates new articles for a specific keyword.
+    - 'refresh/all/' (refresh_all_news): Concurrently refreshes every eligible keyword of the user.
+    - 'api/budget/' (api_budget_status): News API budget consumption as JSON (staff only).
+    - 'api/warm-cache/' (api_warm_cache_stats): Warm cache hit rate and trending keywords as JSON (staff only).
 
 Authentication Routes:
     - 'login/' (custom_login_view): Handles user login.
     - 'register/' (register_view): Handles user registration.
     - 'logout/' (LogoutView): Logs out the user and redirects to the login page.
 
+When settings.NEWS_ASYNC_VIEWS is enabled, search and refresh are served by the async views in
+`news.async_views` instead.
+
 Each view is responsible for user-specific data and requires appropriate authentication where needed.
 
 """
 
+from django.conf import settings
 from django.urls import path
 from . import views
 from django.contrib.auth import views as auth_views
 
+if settings.NEWS_ASYNC_VIEWS:
+    from . import async_views
+    search_view, refresh_view = async_views.search_news, async_views.refresh_news
+else:
+    search_view, refresh_view = views.search_news, views.refresh_news
+
 
 urlpatterns = [
-    path('', views.search_news, name='search_news'),
+    path('', search_view, name='search_news'),
+    path('search/batch/', views.batch_search_news, name='batch_search_news'),
     path('history/', views.search_history, name='search_history'),
-    path('refresh/<int:keyword_id>/', views.refresh_news, name='refresh_news'),
+    path('history/export.csv', views.export_history_csv, name='export_history_csv'),
+    path('api/history/', views.api_history_articles, name='api_history_articles'),
+    path('refresh/<int:keyword_id>/', refresh_view, name='refresh_news'),
+    path('refresh/all/', views.refresh_all_news, name='refresh_all_news'),
+    path('api/budget/', views.api_budget_status, name='api_budget_status'),
+    path('api/warm-cache/', views.api_warm_cache_stats, name='api_warm_cache_stats'),
 
 
     # Auth Views
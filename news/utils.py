@@ -1,35 +1,401 @@
-import requests
-from .models import NewsArticle
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .dedupe import SimHashIndex, simhash
+from .models import KeywordSearch, NewsArticle
+from .budget import BACKGROUND, INTERACTIVE
+from .newsapi import BudgetExhaustedError, CircuitOpenError, NewsAPIError, open_article_stream
+from datetime import timedelta
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
 
-def fetch_and_store_news(keyword):
-    try:
-        api_key = 'c1988fa638df408f8c67c4543ae7d9c7'
-        url = f'https://newsapi.org/v2/everything?q={keyword}&apiKey={api_key}'
-        response = requests.get(url, timeout=10)
 
-        if response.status_code != 200:
-            logger.warning(f"News API error for '{keyword}': {response.status_code} {response.text}")
+class ArticleWriteError(Exception):
+    """
+    Raised by `ingest_articles` when one or more article batches could not be written.
+
+    Attributes:
+        saved (int): Articles written before and after the failed batches.
+        failed (int): Articles in the batches that failed.
+    """
+
+    def __init__(self, saved, failed):
+        super().__init__(f"{failed} articles could not be stored ({saved} saved)")
+        self.saved = saved
+        self.failed = failed
+
+
+# Ingestion pipeline
+#
+# Articles flow through generator stages, so only one batch of model instances exists at a time:
+#
+#     stream_pages (fetch + incremental JSON parse) -> normalize_articles -> ArticleSink (dedupe, batched write)
+#
+# Every stage pulls from the previous one. The next page is requested, and the response body read
+# from the socket, only when the writer needs more articles, so a slow database slows the download
+# instead of buffering it in memory.
+
+
+def stream_pages(keyword, from_date=None, kind=INTERACTIVE, max_pages=None, max_wait=None, **extra):
+    """
+    Fetch stage: yields raw articles for a keyword across up to `max_pages` News API pages.
+
+    The first request is sent immediately, so budget, circuit breaker and HTTP errors surface before
+    any article is written. Later pages are requested lazily; a plain API error on a later page (e.g.
+    the plan's result limit) ends the stream early instead of failing the whole ingest.
+
+    Args:
+        keyword (str): Search keyword.
+        from_date (datetime, optional): Only fetch articles published after this moment.
+        kind (str): Request budget share to use (INTERACTIVE or BACKGROUND).
+        max_pages (int, optional): Page limit; defaults to NEWS_INGEST_MAX_PAGES.
+        max_wait (float, optional): Seconds each request may wait for the rate limiter (see news.newsapi).
+        **extra: Additional NewsAPI parameters (e.g. sortBy).
+
+    Returns:
+        generator: Raw article dicts.
+
+    Raises:
+        BudgetExhaustedError, CircuitOpenError, NewsAPIError: From the first request.
+    """
+    page_size = settings.NEWS_INGEST_PAGE_SIZE
+    max_pages = max_pages or settings.NEWS_INGEST_MAX_PAGES
+    first = open_article_stream(keyword, from_date, kind, max_wait, pageSize=page_size, **extra)
+    return _iter_pages(first, keyword, from_date, kind, max_wait, max_pages, page_size, extra)
+
+
+def _iter_pages(stream, keyword, from_date, kind, max_wait, max_pages, page_size, extra):
+    page = 1
+    while True:
+        yield from stream
+        total = stream.meta.get('totalResults') or 0
+        if page >= max_pages or stream.count < page_size or page * page_size >= total:
+            return
+        page += 1
+        try:
+            stream = open_article_stream(keyword, from_date, kind, max_wait, page=page, pageSize=page_size, **extra)
+        except (BudgetExhaustedError, CircuitOpenError):
+            raise
+        except NewsAPIError as e:
+            logger.warning(f"Stopping at page {page} for '{keyword}': {e}")
+            return
+
+
+# Longer URLs do not fit `NewsArticle.url`; cutting them would store a broken link.
+MAX_URL_LENGTH = NewsArticle._meta.get_field('url').max_length
+
+
+def normalize_article(article):
+    """
+    Maps a raw NewsAPI article dict to `NewsArticle` field values.
+
+    Returns:
+        dict or None: Field values, or None if the article has no usable publish date or its URL is
+        longer than MAX_URL_LENGTH.
+    """
+    published_at = parse_datetime(article.get('publishedAt') or '')
+    if published_at is None:
+        logger.warning(f"Skipping article without publish date: {article.get('title')}")
+        return None
+    url = article.get('url') or ''
+    if len(url) > MAX_URL_LENGTH:
+        logger.warning(f"Skipping article with a {len(url)}-character URL: {article.get('title')}")
+        return None
+    return {
+        'title': (article.get('title') or '')[:500],
+        'description': article.get('description'),
+        'url': url,
+        'published_at': published_at,
+        'source_name': ((article.get('source') or {}).get('name') or 'Unknown')[:200],
+        'language': (article.get('language') or 'en')[:10],
+    }
+
+
+def normalize_articles(articles):
+    """
+    Normalize stage: yields `NewsArticle` field values with their SimHash for each usable raw article.
+    """
+    for article in articles:
+        fields = normalize_article(article)
+        if fields is None:
+            continue
+        fields['simhash'] = simhash(fields['title'], fields['description'])
+        yield fields
+
+
+def build_cluster_index(search):
+    """
+    Loads the SimHashes already stored for a keyword search into an LSH index.
+    """
+    index = SimHashIndex(settings.NEWS_DEDUPE_MAX_DISTANCE)
+    for value, cluster in search.articles.exclude(simhash=None).values_list('simhash', 'story_cluster'):
+        index.add(value, cluster)
+    return index
+
+
+class ArticleSink:
+    """
+    Dedupe and write stage for one keyword search.
+
+    Rows are checked against the (title, published_at) pairs and story clusters already stored
+    (unless `fresh`), assigned to a near-duplicate cluster (see news.dedupe) and written in batches
+    of NEWS_INGEST_BATCH_SIZE, each with one `bulk_create` in its own short transaction.
+
+    Args:
+        search (KeywordSearch): The search the articles belong to.
+        skip_existing (bool): Skip articles whose (title, published_at) is already stored.
+        fresh (bool): Ignore stored articles entirely (used when they are about to be replaced).
+    """
+
+    def __init__(self, search, skip_existing=False, fresh=False):
+        self.search = search
+        self.skip_existing = skip_existing
+        # Only hashes of the (title, published_at) keys are kept, so the per-article state stays small.
+        self.seen = set()
+        if skip_existing and not fresh:
+            self.seen.update(hash(key) for key in search.articles.values_list('title', 'published_at').iterator())
+        self.index = SimHashIndex(settings.NEWS_DEDUPE_MAX_DISTANCE) if fresh else build_cluster_index(search)
+        self.drop_duplicates = settings.NEWS_DEDUPE_DROP_DUPLICATES
+        self.batch = []
+        self.saved = 0
+        self.failed = 0
+
+    def add(self, fields):
+        key = hash((fields['title'], fields['published_at']))
+        if self.skip_existing and key in self.seen:
             return
+        self.seen.add(key)
+
+        fields = dict(fields)
+        if fields['simhash'] is not None:
+            cluster = self.index.find(fields['simhash'])
+            if cluster is not None and self.drop_duplicates:
+                return
+            fields['story_cluster'] = fields['simhash'] if cluster is None else cluster
+            self.index.add(fields['simhash'], fields['story_cluster'])
+
+        self.batch.append(NewsArticle(keyword_search=self.search, **fields))
+        if len(self.batch) >= settings.NEWS_INGEST_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            if _write_batch(self.batch):
+                self.saved += len(self.batch)
+            else:
+                self.failed += len(self.batch)
+            self.batch = []
+
+
+def ingest_articles(searches, articles, skip_existing=False, fresh=False):
+    """
+    Runs raw articles through the normalize and dedupe/write stages for one or more keyword searches.
+
+    Each article is normalized once and offered to every search, so one fetch can feed all users'
+    searches for the same keyword. Memory use is bounded by one batch per search. A batch that
+    fails to write does not stop the others; the failure is reported once all have been tried.
+
+    Args:
+        searches (list[KeywordSearch]): Searches receiving the articles.
+        articles (iterable): Raw article dicts, e.g. from `stream_pages`.
+        skip_existing (bool): Skip articles already stored for a search.
+        fresh (bool): Ignore stored articles (see `replace_articles`).
+
+    Returns:
+        int: Number of articles saved across all searches.
+
+    Raises:
+        ArticleWriteError: If any batch could not be written.
+    """
+    sinks = [ArticleSink(search, skip_existing=skip_existing, fresh=fresh) for search in searches]
+    for fields in normalize_articles(articles):
+        for sink in sinks:
+            sink.add(fields)
+    for sink in sinks:
+        sink.flush()
+    saved = sum(sink.saved for sink in sinks)
+    failed = sum(sink.failed for sink in sinks)
+    if failed:
+        raise ArticleWriteError(saved, failed)
+    return saved
+
+
+def save_articles(search, articles, skip_existing=False):
+    """
+    Stores raw NewsAPI articles for a keyword search in short batched transactions.
 
-        data = response.json()
-        articles = data.get('articles', [])
-
-        for article in articles:
-            try:
-                NewsArticle.objects.update_or_create(
-                    title=article['title'],
-                    keyword=keyword,
-                    defaults={
-                        'description': article.get('description', ''),
-                        'url': article.get('url'),
-                        'published_at': article.get('publishedAt'),
-                    }
-                )
-            except Exception as e:
-                logger.error(f"DB save error for article '{article.get('title')}': {str(e)}")
+    Every article is assigned to a near-duplicate story cluster (see news.dedupe); with
+    NEWS_DEDUPE_DROP_DUPLICATES enabled, only the first article of each cluster is stored.
+
+    Args:
+        search (KeywordSearch): The search the articles belong to.
+        articles (iterable): Raw article dicts as returned by the News API.
+        skip_existing (bool): Skip articles whose (title, published_at) is already stored for `search`.
+
+    Returns:
+        int: Number of articles saved.
+
+    Raises:
+        ArticleWriteError: If any batch could not be written.
+    """
+    return ingest_articles([search], articles, skip_existing=skip_existing)
+
+
+def _write_batch(batch):
+    try:
+        with transaction.atomic():
+            NewsArticle.objects.bulk_create(batch)
+        return True
+    except Exception as e:
+        logger.error(f"DB save error for batch of {len(batch)} articles: {str(e)}")
+        return False
+
+
+def replace_articles(search, articles):
+    """
+    Replaces all stored articles of a keyword search with a fresh set from the News API.
+
+    The new articles are written first and the old ones deleted only once the stream has been fully
+    consumed and every batch stored, so a fetch or write that fails halfway leaves the previous
+    results in place (and the new articles written so far are removed again).
+
+    Returns:
+        int: Number of articles saved.
+    """
+    previous_max = search.articles.aggregate(Max('pk'))['pk__max']
+    try:
+        saved = ingest_articles([search], articles, fresh=True)
+    except Exception:
+        new_articles = search.articles.all()
+        if previous_max is not None:
+            new_articles = new_articles.filter(pk__gt=previous_max)
+        new_articles.delete()
+        raise
+    if previous_max is not None:
+        with transaction.atomic():
+            search.articles.filter(pk__lte=previous_max).delete()
+    return saved
+
+
+def store_search(user, keyword, articles):
+    """
+    Records a user's keyword search and replaces its stored articles with `articles`.
+
+    The first article is read before anything is written, so an error response (e.g. a 200 whose
+    body has `status != "ok"`) raises without creating a KeywordSearch. If the stream fails later,
+    a search created here is deleted again and an existing one gets its previous `searched_at`
+    back (its previous articles are kept by `replace_articles`), so a failed fetch never counts
+    against the user's quota.
+
+    Args:
+        user (User): The searching user.
+        keyword (str): Search keyword; matched case-insensitively against earlier searches.
+        articles (iterable): Raw article dicts, e.g. from `stream_pages` or a warm cache entry.
+
+    Returns:
+        tuple: (KeywordSearch, number of articles saved).
+
+    Raises:
+        NewsAPIError: If the response is an error or fails while streaming.
+    """
+    articles = iter(articles)
+    first = next(articles, None)
+    if first is not None:
+        articles = itertools.chain([first], articles)
+
+    search, created = KeywordSearch.objects.get_or_create(
+        user=user,
+        keyword__iexact=keyword,
+        defaults={'keyword': keyword, 'searched_at': timezone.now()}
+    )
+    previous_searched_at = search.searched_at
+    if not created:
+        search.searched_at = timezone.now()
+        search.save(update_fields=['searched_at'])
+    try:
+        return search, replace_articles(search, articles)
+    except Exception:
+        if created:
+            search.delete()
+        else:
+            KeywordSearch.objects.filter(pk=search.pk).update(searched_at=previous_searched_at)
+        raise
+
+
+REFRESH_INTERVAL = timedelta(minutes=15)
+
+
+def refresh_due(search):
+    """
+    Returns True if the keyword search has not been refreshed within REFRESH_INTERVAL.
+    """
+    return not search.last_refreshed or timezone.now() - search.last_refreshed >= REFRESH_INTERVAL
+
+
+def refresh_keyword_search(search, kind=INTERACTIVE, max_wait=None):
+    """
+    Fetches articles newer than the latest stored one for a keyword search and saves the new ones.
+
+    Does not check the refresh throttle; callers decide with `refresh_due`.
+
+    Args:
+        search (KeywordSearch): The search to refresh.
+        kind (str): Request budget share to use (INTERACTIVE or BACKGROUND).
+        max_wait (float, optional): Seconds each request may wait for the rate limiter.
+
+    Returns:
+        int: Number of new articles saved.
+
+    Raises:
+        BudgetExhaustedError: If the shared request budget denies the call.
+        NewsAPIError: If the API cannot be reached or reports an error.
+        ArticleWriteError: If some new articles could not be stored; `last_refreshed` is left alone so
+            the next refresh fetches them again.
+    """
+    from_date = search.articles.order_by('-published_at').values_list('published_at', flat=True).first()
+
+    pages = stream_pages(search.keyword, from_date=from_date, kind=kind, max_wait=max_wait, sortBy='publishedAt')
+    saved = save_articles(search, pages, skip_existing=True)
+
+    search.last_refreshed = timezone.now()
+    search.save(update_fields=['last_refreshed'])
+    return saved
+
+
+def stored_search_for(user, keyword):
+    """
+    Finds the freshest stored results for a keyword without calling the News API.
+
+    Only the user's own searches are considered; search history is private to each user.
+
+    Returns:
+        KeywordSearch or None
+    """
+    return (
+        KeywordSearch.objects.filter(user=user, keyword__iexact=keyword, articles__isnull=False)
+        .distinct().order_by('-searched_at').first()
+    )
+
+
+def fetch_and_store_news(keyword):
+    """
+    Background refresh of every keyword search matching `keyword`, using the background budget share.
+
+    Raises:
+        BudgetExhaustedError: If the request budget is used up, so callers can stop the cycle.
+        CircuitOpenError: If the circuit breaker is open, for the same reason.
+    """
+    try:
+        searches = list(KeywordSearch.objects.filter(keyword__iexact=keyword))
+        if not searches:
+            return
+        ingest_articles(searches, stream_pages(keyword, kind=BACKGROUND), skip_existing=True)
 
+    except (BudgetExhaustedError, CircuitOpenError):
+        raise
     except Exception as e:
         logger.critical(f"Failed fetch/store for keyword '{keyword}': {str(e)}")
@@ -1,16 +1,46 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.contrib import messages
 from .models import KeywordSearch, NewsArticle, UserProfile
-from .forms import KeywordSearchForm
+from .dedupe import collapse_clusters
+from .dbrouting import pin_primary, read_only
+from .listings import EXPORT_FIELDS, article_rows, filter_articles, rows_by_search
+from .forms import BatchKeywordSearchForm, KeywordSearchForm
+from .budget import BACKGROUND, status as budget_status
+from .newsapi import BULK_RATE_LIMIT_WAIT, BudgetExhaustedError, CircuitOpenError, NewsAPIError
+from .profiles import get_profile
+from .redis_client import get_redis
+from .warming import get_warm, stats as warm_cache_stats
+from .utils import refresh_due, refresh_keyword_search, store_search, stored_search_for, stream_pages
+from django.db import connection, router
+from django.views.decorators.http import require_GET, require_POST
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse, StreamingHttpResponse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
-import requests
+import csv
+import itertools
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
-NEWS_API_KEY = settings.NEWS_API_KEY
+
+UNAVAILABLE_NOTICE = "The news service is not responding right now, so saved results are shown instead."
+
+# Shown when the request budget (news.budget) denies a News API call, by denial reason: the daily
+# allotment is nearly used up, or the per-second rate limiter is busy.
+BUDGET_NOTICES = {
+    'budget': "The daily News API budget is nearly used up, so saved results are shown instead.",
+    'rate': "The news service is busy right now, so saved results are shown instead. Please try again shortly.",
+}
+REFRESH_BUDGET_NOTICES = {
+    'budget': "The daily News API budget is nearly used up; showing your saved articles.",
+    'rate': "The news service is busy right now; please try refreshing again shortly.",
+}
 
 @login_required
 def search_news(request):
@@ -35,7 +65,7 @@ def search_news(request):
         # 1. Profile, quota, and block check
         if not (request.user.is_superuser or request.user.is_staff):
             try:
-                profile = request.user.userprofile
+                profile = get_profile(request.user)
             except UserProfile.DoesNotExist:
                 messages.error(request, "Your user profile was not found.")
                 return redirect('search_history')
@@ -65,7 +95,7 @@ def search_news(request):
                 ).first()
 
                 if recent and not force_refresh:
-                    articles = NewsArticle.objects.filter(keyword_search=recent)
+                    articles = list(article_rows(recent.articles.all()))
                     return render(request, 'news/confirm_refresh.html', {
                         'keyword': keyword,
                         'recent_search_time': recent.searched_at,
@@ -74,47 +104,23 @@ def search_news(request):
                         'remaining_quota': remaining_quota
                     })
 
-                #  3. Call News API
+                #  3. Use the pre-warmed response for trending keywords (unless the user asked for a
+                #     refresh), otherwise call News API (serve stored results if the budget is used up
+                #     or the API is down or returns an error)
+                #  4. Save the KeywordSearch once the response has been validated and stream the
+                #     articles into the database in short batched transactions
                 try:
-                    url = f"https://newsapi.org/v2/everything?q={keyword}&apiKey={NEWS_API_KEY}"
-                    response = requests.get(url)
-                    data = response.json()
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"News API request failed: {e}")
-                    messages.error(request, "News API request failed. Please try again later.")
-                    return render(request, 'news/search.html', {'form': form, 'remaining_quota': remaining_quota})
-
-                if data.get("status") != "ok":
-                    logger.error(f"News API error: {data}")
-                    messages.error(request, "News API returned an error.")
-                    return render(request, 'news/search.html', {'form': form, 'remaining_quota': remaining_quota})
-
-                #  4. Save KeywordSearch safely (prevent IntegrityError)
-                search, created = KeywordSearch.objects.get_or_create(
-                    user=request.user,
-                    keyword__iexact=keyword,
-                    defaults={'keyword': keyword, 'searched_at': timezone.now()}
-                )
-                if not created:
-                    # Update the timestamp and clear previous articles
-                    search.searched_at = timezone.now()
-                    search.save()
-                    NewsArticle.objects.filter(keyword_search=search).delete()
-
-                #  5. Save articles
-                for article in data.get('articles', []):
-                    try:
-                        NewsArticle.objects.create(
-                            keyword_search=search,
-                            title=article.get('title', ''),
-                            description=article.get('description', ''),
-                            url=article.get('url', ''),
-                            published_at=article.get('publishedAt'),
-                            source_name=article.get('source', {}).get('name', 'Unknown'),
-                            language=article.get('language', 'en')
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to save article: {e}")
+                    warm = None if force_refresh else get_warm(keyword)
+                    articles = warm['articles'] if warm else stream_pages(keyword, max_pages=1)
+                    store_search(request.user, keyword, articles)
+                except BudgetExhaustedError as e:
+                    logger.warning(f"Serving stored results for '{keyword}': {e}")
+                    return render_stored_results(
+                        request, keyword, BUDGET_NOTICES[e.reservation.reason], remaining_quota,
+                    )
+                except NewsAPIError as e:
+                    logger.error(f"News API request failed, serving stored results for '{keyword}': {e}")
+                    return render_stored_results(request, keyword, UNAVAILABLE_NOTICE, remaining_quota)
 
                 messages.success(request, "News articles fetched successfully.")
                 return redirect('search_history')
@@ -132,7 +138,30 @@ def search_news(request):
         return redirect('search_history')
 
 
+def render_stored_results(request, keyword, notice, remaining_quota=None):
+    """
+    Renders saved articles for a keyword instead of calling the News API.
+
+    Used when a live search is not possible (e.g. the request budget is used up or the circuit
+    breaker is open). Articles come from the user's own earlier search for the keyword; without
+    one, only the notice is shown.
+
+    Returns:
+        HttpResponse: The rendered 'news/stored_results.html' page.
+    """
+    stored = stored_search_for(request.user, keyword)
+    articles = collapse_clusters(article_rows(stored.articles.order_by('-published_at'))) if stored else []
+    return render(request, 'news/stored_results.html', {
+        'keyword': keyword,
+        'notice': notice,
+        'stored_at': stored.searched_at if stored else None,
+        'articles': articles,
+        'remaining_quota': remaining_quota,
+    })
+
+
 @login_required
+@read_only
 def search_history(request):
     """
     Displays the authenticated user's search history along with filtering capabilities.
@@ -141,6 +170,8 @@ def search_history(request):
     - Retrieves all previously searched keywords by the user.
     - Filters associated articles by optional parameters: publication date, source name, and language.
     - Groups filtered articles under their respective keyword searches.
+    - Collapses near-duplicate articles (same story cluster) into a single entry.
+    - Reads the articles of all searches with one query as compact rows (see news.listings).
     - Prepares distinct lists of sources and languages for use in the UI filter dropdowns.
     - Includes a "Refresh Results" button that fetches **new articles** from the News API for each previously searched keyword.
       This ensures the user can update their history with the **latest news data** without re-searching manually.
@@ -168,24 +199,14 @@ def search_history(request):
     """
     try:
         searches = KeywordSearch.objects.filter(user=request.user).order_by('-searched_at')
+        filters = _history_filters(request)
 
-        selected_date = request.GET.get('date')
-        selected_source = request.GET.get('source')
-        selected_language = request.GET.get('language')
-
+        # All articles in one query, as compact rows, one entry per near-duplicate story cluster
+        rows = rows_by_search(searches, **filters)
         filtered_searches = []
         for search in searches:
-            articles = NewsArticle.objects.filter(keyword_search=search)
-
-            if selected_date:
-                articles = articles.filter(published_at__date=selected_date)
-            if selected_source:
-                articles = articles.filter(source_name__icontains=selected_source)
-            if selected_language:
-                articles = articles.filter(language=selected_language)
-
-            if articles.exists():
-                search.filtered_articles = articles
+            if search.pk in rows:
+                search.filtered_articles = rows[search.pk]
                 filtered_searches.append(search)
 
         sources = NewsArticle.objects.filter(keyword_search__user=request.user).values_list('source_name', flat=True).distinct()
@@ -193,11 +214,7 @@ def search_history(request):
 
         return render(request, 'news/history.html', {
             'searches': filtered_searches,
-            'filters': {
-                'date': selected_date,
-                'source': selected_source,
-                'language': selected_language,
-            },
+            'filters': filters,
             'sources': sources,
             'languages': languages,
             'keyword_searches': searches,
@@ -209,6 +226,103 @@ def search_history(request):
         return redirect('search_news')
 
 
+def _history_filters(request):
+    """
+    Reads the history page filters (date, source, language) from the query string.
+
+    A date that is not a valid YYYY-MM-DD is dropped (None), so it filters nothing.
+    """
+    return {
+        'date': _valid_date(request.GET.get('date')),
+        'source': request.GET.get('source'),
+        'language': request.GET.get('language'),
+    }
+
+
+def _valid_date(value):
+    try:
+        return value if value and parse_date(value) else None
+    except ValueError:  # well formed but not a real date, e.g. 2025-02-30
+        return None
+
+
+class _Echo:
+    """File-like object whose `write` returns the line, so csv.writer can feed a streaming response."""
+
+    def write(self, value):
+        return value
+
+
+@login_required
+@require_GET
+@read_only
+def export_history_csv(request):
+    """
+    Exports the user's stored articles, with the history page filters applied, as CSV.
+
+    Rows are streamed from the database cursor in chunks and written as they are read, so large
+    histories are never held in memory. Near-duplicate articles are all included.
+
+    Args:
+        request (HttpRequest): Django request object with optional date/source/language parameters.
+
+    Returns:
+        StreamingHttpResponse: A `news-history.csv` attachment.
+    """
+    try:
+        keywords = dict(KeywordSearch.objects.filter(user=request.user).values_list('pk', 'keyword'))
+        # Rows are read while the response streams, after @read_only has returned, so pin the database now
+        articles = NewsArticle.objects.using(router.db_for_read(NewsArticle)).filter(
+            keyword_search__in=list(keywords),
+        ).order_by('keyword_search_id', 'pk')
+        rows = article_rows(filter_articles(articles, **_history_filters(request)), chunk_size=2000)
+
+        writer = csv.writer(_Echo())
+        lines = itertools.chain(
+            [writer.writerow(('keyword',) + EXPORT_FIELDS)],
+            (writer.writerow([keywords[row.keyword_search_id]] + [getattr(row, f) for f in EXPORT_FIELDS]) for row in rows),
+        )
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="news-history.csv"'
+        return response
+
+    except Exception as e:
+        logger.error(f"Error in export_history_csv: {e}")
+        messages.error(request, "Failed to export search history.")
+        return redirect('search_history')
+
+
+@login_required
+@require_GET
+@read_only
+def api_history_articles(request):
+    """
+    Returns the user's search history with its articles as JSON.
+
+    Accepts the same date/source/language filters as the history page and, like it, keeps one
+    article per near-duplicate story cluster (`cluster_size` counts the cluster).
+
+    Returns:
+        JsonResponse: `{"searches": [{"keyword", "searched_at", "articles": [...]}, ...]}`, or a 400
+        with `errors` if `date` is not a valid YYYY-MM-DD.
+    """
+    filters = _history_filters(request)
+    if request.GET.get('date') and filters['date'] is None:
+        return JsonResponse({'errors': {'date': ["Enter a valid date (YYYY-MM-DD)."]}}, status=400)
+    searches = KeywordSearch.objects.filter(user=request.user).order_by('-searched_at')
+    rows = rows_by_search(searches, **filters)
+    return JsonResponse({
+        'searches': [
+            {
+                'keyword': search.keyword,
+                'searched_at': search.searched_at.isoformat(),
+                'articles': [row.as_dict() for row in rows[search.pk]],
+            }
+            for search in searches if search.pk in rows
+        ],
+    })
+
+
 
 
 
@@ -236,59 +350,303 @@ def refresh_news(request, keyword_id):
 
         Steps:
         1. Prevent users from refreshing the same keyword within 15 minutes to avoid spamming the News API.
-        2. Identify the latest published article already stored for this keyword to fetch only newer articles.
-        3. Call the News API using the keyword and optional `from` date.
-        4. Filter out duplicate articles (based on title and published_at).
-        5. Save new articles to the database and update the last refreshed timestamp.
-        6. Notify the user whether the refresh was successful or not.
+        2. Send the refresh to the `interactive` Celery queue as a `refresh_keyword` task, so
+           user-triggered fetches never wait behind the hourly refresh cycle.
+        3. The task fetches articles newer than the latest stored one, saves the new ones and
+           updates the last refreshed timestamp.
+        4. Return at once, telling the user the refresh is queued, and start the sticky-primary
+           window (see news.dbrouting) so the history page reads the worker's writes from the primary.
 
         Notes:
         - Requires user to be logged in.
+        - If the broker is unreachable the task runs in the web process instead.
         - If an exception occurs (e.g., API error, DB error), the function logs it and displays a user-friendly error message.
         """
     try:
         search = get_object_or_404(KeywordSearch, pk=keyword_id, user=request.user)
 
         #  Step 1: Prevent refresh within 15 minutes
-        if search.last_refreshed and timezone.now() - search.last_refreshed < timedelta(minutes=15):
+        if not refresh_due(search):
             messages.warning(request, "Please wait 15 minutes before refreshing this keyword again.")
             return redirect('search_history')
 
-        #  Step 2: Get latest published article to avoid duplicates
-        latest_article = search.articles.order_by('-published_at').first()
-        from_date = latest_article.published_at if latest_article else None
+        #  Steps 2-4: Queue the refresh on the interactive queue and report its outcome
+        result = _run_refresh_task(search)
+        status = result['status']
+        if status == 'refreshed':
+            messages.success(request, "News refreshed successfully.")
+        elif status == 'queued':
+            messages.info(request, "Refresh queued; new articles will appear in your history shortly.")
+        elif status == 'skipped':
+            messages.info(request, "This keyword is already being refreshed.")
+        elif status in REFRESH_BUDGET_NOTICES:
+            messages.warning(request, REFRESH_BUDGET_NOTICES[status])
+        elif status == 'unavailable':
+            messages.warning(request, "The news service is not responding right now; saved results may be stale.")
+        else:
+            messages.error(request, "Failed to refresh articles.")
+        return pin_primary(redirect('search_history'))
 
-        # Step 3: Call News API
-        url = f"https://newsapi.org/v2/everything?q={search.keyword}&from={from_date}&sortBy=publishedAt&apiKey={NEWS_API_KEY}"
-        response = requests.get(url)
-        data = response.json()
+    except Exception as e:
+        logger.error(f"Error in refresh_news: {e}")
+        messages.error(request, "Failed to refresh articles.")
+        return redirect('search_history')
 
-        for article in data.get('articles', []):
-            published = article['publishedAt']
-            try:
-                if not search.articles.filter(title=article['title'], published_at=published).exists():
-                    NewsArticle.objects.create(
-                        keyword_search=search,
-                        title=article['title'],
-                        description=article.get('description'),
-                        url=article['url'],
-                        published_at=published,
-                        source_name=article['source']['name'],
-                        language=article.get('language', 'en')
-                    )
-            except Exception as e:
-                logger.warning(f"Error saving refreshed article: {e}")
 
-        #  Step 4: Update last refreshed timestamp
-        search.last_refreshed = timezone.now()
-        search.save()
+def _run_refresh_task(search):
+    """
+    Sends the `refresh_keyword` task for a keyword search to the `interactive` queue.
+
+    The view does not wait for the worker, so a slow News API never holds a web thread. When Redis (the broker and result backend) cannot be reached it is executed in this process
+    instead, so refreshing still works without it; the shared client in news.redis_client is checked
+    first because Celery itself retries an unreachable result backend for about 20 seconds.
+    Celery is imported here rather than at module level so web processes only load it once a
+    refresh is requested.
+
+    Returns:
+        dict: Status 'queued', or the task's result (see `news.tasks.refresh_keyword`) if it ran
+        in this process.
+    """
+    from .tasks import refresh_keyword
+
+    if get_redis() is None:
+        return refresh_keyword.apply(args=[search.pk]).get()
+    try:
+        refresh_keyword.apply_async(args=[search.pk], retry=False)
+    except Exception as e:
+        logger.warning(f"Could not queue refresh of '{search.keyword}', running it in the web process: {e}")
+        return refresh_keyword.apply(args=[search.pk]).get()
+    return {'keyword': search.keyword, 'status': 'queued', 'new_articles': 0}
+
+
+def _refresh_in_worker(search):
+    """
+    Runs `refresh_keyword_search` on a pool thread and returns a per-keyword result row.
+
+    Requests wait up to BULK_RATE_LIMIT_WAIT seconds for the shared rate limiter, so keywords beyond
+    the burst are queued rather than failed. Each pool thread opens its own database connection,
+    which is closed before returning.
+    """
+    try:
+        saved = refresh_keyword_search(search, max_wait=BULK_RATE_LIMIT_WAIT)
+        return {'keyword': search.keyword, 'status': 'refreshed', 'new_articles': saved}
+    except Exception as e:
+        logger.warning(f"Bulk refresh failed for '{search.keyword}': {e}")
+        return {'keyword': search.keyword, 'status': 'failed', 'error': str(e)}
+    finally:
+        connection.close()
+
+
+@login_required
+@require_POST
+def refresh_all_news(request):
+    """
+    Refreshes every eligible keyword of the authenticated user concurrently.
+
+    Keywords refreshed within the last 15 minutes are skipped. The rest are fetched on a thread pool
+    of NEWS_REFRESH_MAX_WORKERS threads, so the wall time is close to the slowest single fetch rather
+    than the sum of all of them. Beyond the rate limiter's burst, keywords are paced at
+    NEWS_API_RATE_PER_SECOND instead of failing.
+
+    Args:
+        request (HttpRequest): The POST request from the history page.
+
+    Returns:
+        HttpResponse: Renders 'news/refresh_results.html' with one result row per keyword.
+    """
+    try:
+        searches = list(KeywordSearch.objects.filter(user=request.user).order_by('keyword'))
+        due = [search for search in searches if refresh_due(search)]
+
+        results = {
+            search.pk: {'keyword': search.keyword, 'status': 'skipped'}
+            for search in searches if not refresh_due(search)
+        }
+        if due:
+            workers = min(settings.NEWS_REFRESH_MAX_WORKERS, len(due))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for search, result in zip(due, pool.map(_refresh_in_worker, due)):
+                    results[search.pk] = result
+
+        refreshed = sum(1 for r in results.values() if r['status'] == 'refreshed')
+        messages.success(request, f"Refreshed {refreshed} of {len(searches)} keywords.")
+        return render(request, 'news/refresh_results.html', {
+            'results': [results[search.pk] for search in searches],
+        })
 
-        messages.success(request, "News refreshed successfully.")
+    except Exception as e:
+        logger.error(f"Error in refresh_all_news: {e}")
+        messages.error(request, "Failed to refresh keywords.")
         return redirect('search_history')
 
+
+def _batch_search_in_worker(user, keyword, force_refresh):
+    """
+    Searches one keyword of a batch on a pool thread and returns its progress row.
+
+    Mirrors steps 2-4 of `search_news`. Keywords searched within the last 15 minutes are skipped,
+    and pre-warmed responses used, unless `force_refresh` is set. Each pool thread opens its own database connection, which is
+    closed before returning.
+    """
+    result = {'keyword': keyword, 'status': 'fetched', 'articles': 0, 'cached': False}
+    try:
+        recent = KeywordSearch.objects.filter(
+            user=user,
+            keyword__iexact=keyword,
+            searched_at__gte=timezone.now() - timedelta(minutes=15)
+        ).first()
+        if recent and not force_refresh:
+            result.update(status='skipped', articles=recent.articles.count())
+            return result
+
+        warm = None if force_refresh else get_warm(keyword)
+        articles = warm['articles'] if warm else stream_pages(keyword, kind=BACKGROUND, max_pages=1)
+        _, saved = store_search(user, keyword, articles)
+        result.update(articles=saved, cached=bool(warm))
+    except BudgetExhaustedError as e:
+        logger.warning(f"Batch search for '{keyword}' not possible: {e}")
+        if e.reservation.reason == 'rate':
+            result.update(status='busy', error="The news service is busy; try this keyword again shortly.")
+        else:
+            result.update(status='budget', error="The daily News API budget is nearly used up.")
+    except CircuitOpenError as e:
+        logger.warning(f"Batch search for '{keyword}' skipped: {e}")
+        result.update(status='unavailable', error="The news service is not responding right now.")
     except Exception as e:
-        logger.error(f"Error in refresh_news: {e}")
-        messages.error(request, "Failed to refresh articles.")
+        logger.error(f"Batch search failed for '{keyword}': {e}")
+        result.update(status='failed', error="News API request failed.")
+    finally:
+        connection.close()
+    return result
+
+
+def _run_batch_search(user, keywords, force_refresh):
+    """
+    Searches `keywords` concurrently and yields each progress row as soon as its keyword finishes.
+
+    Up to NEWS_BATCH_MAX_WORKERS keywords are fetched at once, so a batch takes about as long as
+    a few single searches. Closing the generator (e.g. when the client disconnects) cancels the
+    keywords that have not started yet.
+    """
+    workers = min(settings.NEWS_BATCH_MAX_WORKERS, len(keywords))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_batch_search_in_worker, user, keyword, force_refresh) for keyword in keywords]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _batch_search_events(user, keywords, force_refresh):
+    """
+    Formats the progress of a batch search as server-sent events: one `start` event, a `progress`
+    event per keyword and a closing `done` event with per-status totals and the elapsed time.
+    """
+    def event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    started = time.perf_counter()
+    totals = {}
+    yield event('start', {'total': len(keywords), 'keywords': keywords})
+    for completed, result in enumerate(_run_batch_search(user, keywords, force_refresh), start=1):
+        totals[result['status']] = totals.get(result['status'], 0) + 1
+        yield event('progress', {**result, 'completed': completed, 'total': len(keywords)})
+    yield event('done', {
+        'total': len(keywords),
+        'statuses': totals,
+        'elapsed': round(time.perf_counter() - started, 2),
+    })
+
+
+@login_required
+def batch_search_news(request):
+    """
+    Searches a list of keywords in one submission and reports progress per keyword.
+
+    Main Features:
+    - Checks the profile, block status and keyword quota once for the whole batch; only keywords
+      the user has not searched before count against the quota.
+    - Fetches the keywords concurrently with the background share of the request budget, so
+      a batch does not use up the requests reserved for single searches.
+    - Streams one server-sent event per finished keyword when the client accepts
+      `text/event-stream` (the batch page does); otherwise renders all results once the batch is done.
+
+    Args:
+        request (HttpRequest): Django request object.
+
+    Returns:
+        HttpResponse: The batch form, a StreamingHttpResponse of progress events, or the results page.
+    """
+    try:
+        streaming = 'text/event-stream' in request.headers.get('Accept', '')
+        remaining_quota = None
+        profile = None
+
+        # 1. Profile and block check
+        if not (request.user.is_superuser or request.user.is_staff):
+            try:
+                profile = get_profile(request.user)
+            except UserProfile.DoesNotExist:
+                messages.error(request, "Your user profile was not found.")
+                return redirect('search_history')
+
+            if profile.is_blocked:
+                messages.error(request, "You are currently blocked from searching.")
+                return redirect('search_history')
+
+            remaining_quota = profile.keyword_quota - KeywordSearch.objects.filter(user=request.user).count()
+
+        if request.method == 'POST':
+            form = BatchKeywordSearchForm(request.POST)
+            if form.is_valid():
+                keywords = form.cleaned_data['keywords']
+
+                # 2. Quota check for the whole batch
+                if remaining_quota is not None:
+                    known = {
+                        k.lower() for k in
+                        KeywordSearch.objects.filter(user=request.user).values_list('keyword', flat=True)
+                    }
+                    new_keywords = sum(1 for keyword in keywords if keyword.lower() not in known)
+                    if new_keywords > remaining_quota:
+                        form.add_error('keywords', (
+                            f"This batch adds {new_keywords} new keywords but only {max(remaining_quota, 0)} "
+                            f"of your quota ({profile.keyword_quota}) remain."
+                        ))
+
+            if form.is_valid():
+                force_refresh = form.cleaned_data['force_refresh']
+                if streaming:
+                    response = StreamingHttpResponse(
+                        _batch_search_events(request.user, keywords, force_refresh),
+                        content_type='text/event-stream',
+                    )
+                    response['Cache-Control'] = 'no-cache'
+                    response['X-Accel-Buffering'] = 'no'  # let nginx pass events through unbuffered
+                    return response
+
+                results = {r['keyword']: r for r in _run_batch_search(request.user, keywords, force_refresh)}
+                fetched = sum(1 for r in results.values() if r['status'] == 'fetched')
+                messages.success(request, f"Fetched {fetched} of {len(keywords)} keywords.")
+                return render(request, 'news/batch_results.html', {
+                    'results': [results[keyword] for keyword in keywords],
+                })
+
+            if streaming:
+                return JsonResponse({'errors': form.errors}, status=400)
+        else:
+            form = BatchKeywordSearchForm()
+
+        return render(request, 'news/batch_search.html', {
+            'form': form,
+            'remaining_quota': remaining_quota,
+            'max_keywords': settings.NEWS_BATCH_MAX_KEYWORDS,
+        })
+
+    except Exception as e:
+        logger.error(f"Unhandled exception in batch_search_news: {e}")
+        messages.error(request, "An unexpected error occurred.")
         return redirect('search_history')
 
 
@@ -354,8 +712,7 @@ def custom_login_view(request):
     If credentials are valid, the user is logged in and redirected to the homepage.
     Appropriate error messages are displayed if:
     - Required fields are missing
-    - User does not exist
-    - Authentication fails
+    - Authentication fails (unknown usernames are reported the same way, without an extra query)
 
     Args:
         request (HttpRequest): The HTTP request object containing login data.
@@ -363,7 +720,6 @@ def custom_login_view(request):
     Returns:
         HttpResponse:
             - Redirect to homepage ("/") if login is successful.
-            - Redirect to "register" if the user does not exist.
             - Redirect back to "login" with error messages on failure.
             - Renders the login template on GET request.
 
@@ -379,10 +735,6 @@ def custom_login_view(request):
                 messages.error(request, "Username and password are required.")
                 return redirect("login")
 
-            if not User.objects.filter(username=username).exists():
-                messages.warning(request, "User does not exist, please register.")
-                return redirect("register")
-
             user = authenticate(request, username=username, password=password)
             if user:
                 login(request, user)
@@ -402,3 +754,19 @@ def user_logout_view(request):
     return redirect('register')
 
 
+@staff_member_required
+@require_GET
+def api_budget_status(request):
+    """
+    Returns today's News API budget consumption and projected exhaustion time as JSON (staff only).
+    """
+    return JsonResponse(budget_status())
+
+
+@staff_member_required
+@require_GET
+def api_warm_cache_stats(request):
+    """
+    Returns today's warm cache hit rate, utilisation and current trending ranking as JSON (staff only).
+    """
+    return JsonResponse(warm_cache_stats())
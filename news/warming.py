@@ -0,0 +1,193 @@
+"""
+Predictive cache warming for trending keywords.
+
+`warm_trending_keywords` (run by Celery beat every NEWS_WARM_INTERVAL_MINUTES) ranks keywords by
+how often they were searched recently, with each search weighted by exponential decay
+(half-life NEWS_TRENDING_HALF_LIFE_HOURS). It fetches the top NEWS_WARM_TOP_N from the News API and
+stores the responses in the Django cache, so the next interactive search for one of them skips
+the API call.
+
+Hit and miss counters are kept per UTC day, with hits also counted by the rank the keyword had
+when it was warmed. A low hit count for the lowest ranks means NEWS_WARM_TOP_N can be reduced.
+"""
+
+import logging
+import math
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .budget import BACKGROUND
+from .dbrouting import read_only
+from .models import KeywordSearch
+from .newsapi import BudgetExhaustedError, CircuitOpenError, fetch_articles
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'news:warm:'
+STATS_TTL = 2 * 86400
+
+
+def _entry_key(keyword):
+    return f"{KEY_PREFIX}entry:{keyword.strip().lower()}"
+
+
+def _stat_key(name, day=None):
+    day = day or timezone.now().date()
+    return f"{KEY_PREFIX}stats:{day.isoformat()}:{name}"
+
+
+def _count(name, amount=1):
+    # Counters must never break a search, so cache errors are only logged.
+    try:
+        key = _stat_key(name)
+        cache.add(key, 0, STATS_TTL)
+        cache.incr(key, amount)
+    except Exception as e:
+        logger.warning(f"Could not update warm cache counter '{name}': {e}")
+
+
+def _mark_used(entry_key, entry):
+    # Counts each warmed entry once, on its first hit.
+    try:
+        if cache.add(f"{entry_key}:used:{entry['warmed_at']}", 1, settings.NEWS_WARM_TTL):
+            _count('used')
+    except Exception as e:
+        logger.warning(f"Could not mark warm entry {entry_key} as used: {e}")
+
+
+@read_only
+def rank_trending(limit=None, now=None):
+    """
+    Ranks keywords by decayed search frequency over the last NEWS_TRENDING_WINDOW_HOURS.
+
+    Each KeywordSearch contributes 0.5 ** (age / half-life), so a keyword searched by many users
+    in the last hour outranks one searched more often yesterday. Keywords are compared
+    case-insensitively. Reads from the replica when one is configured.
+
+    Args:
+        limit (int, optional): Number of keywords to return; defaults to NEWS_WARM_TOP_N.
+        now (datetime, optional): Reference time, mainly for benchmarks.
+
+    Returns:
+        list[tuple[str, float]]: (keyword, score) pairs, highest score first.
+    """
+    limit = settings.NEWS_WARM_TOP_N if limit is None else limit
+    now = now or timezone.now()
+    half_life = settings.NEWS_TRENDING_HALF_LIFE_HOURS * 3600
+    rows = KeywordSearch.objects.filter(
+        searched_at__gte=now - timedelta(hours=settings.NEWS_TRENDING_WINDOW_HOURS),
+    ).values_list('keyword', 'searched_at')
+
+    scores = defaultdict(float)
+    spelling = {}
+    for keyword, searched_at in rows.iterator():
+        key = keyword.strip().lower()
+        age = max(0.0, (now - searched_at).total_seconds())
+        scores[key] += math.pow(0.5, age / half_life)
+        spelling.setdefault(key, keyword.strip())
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(spelling[key], round(score, 4)) for key, score in ranked]
+
+
+def get_warm(keyword):
+    """
+    Returns the pre-fetched News API response for `keyword`, counting a hit or a miss.
+
+    Returns:
+        dict or None: The cached API payload, or None if the keyword is not warm.
+    """
+    key = _entry_key(keyword)
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Warm cache lookup failed for '{keyword}': {e}")
+        return None
+    if entry is None:
+        _count('misses')
+        return None
+    _count('hits')
+    _count(f"hits:rank{entry['rank']}")
+    _mark_used(key, entry)
+    return entry['data']
+
+
+def warm_trending_keywords():
+    """
+    Fetches the current top keywords with the background budget share and caches the responses.
+
+    Stops early when the background budget is used up or the circuit breaker is open.
+
+    Returns:
+        dict: `ranked` keywords, number `warmed` and number `failed`.
+    """
+    ranked = rank_trending()
+    warmed = failed = 0
+    for rank, (keyword, _score) in enumerate(ranked, start=1):
+        try:
+            data = fetch_articles(keyword, kind=BACKGROUND)
+        except BudgetExhaustedError as e:
+            if e.reservation.reason == 'budget':
+                logger.warning("Cache warming stopped: background API budget used up")
+                break
+            failed += 1
+            continue
+        except CircuitOpenError:
+            logger.warning("Cache warming stopped: News API circuit breaker is open")
+            break
+        except Exception as e:
+            logger.error(f"Cache warming failed for '{keyword}': {e}")
+            failed += 1
+            continue
+
+        if data.get('status') != 'ok':
+            logger.warning(f"News API error while warming '{keyword}': {data.get('message', data)}")
+            failed += 1
+            continue
+        try:
+            cache.set(_entry_key(keyword), {'data': data, 'rank': rank, 'warmed_at': time.time()}, settings.NEWS_WARM_TTL)
+            warmed += 1
+        except Exception as e:
+            logger.error(f"Could not cache warm entry for '{keyword}': {e}")
+            failed += 1
+    if warmed:
+        _count('warmed', warmed)
+    return {'ranked': [keyword for keyword, _score in ranked], 'warmed': warmed, 'failed': failed}
+
+
+def stats(day=None):
+    """
+    Summarizes warm cache effectiveness for one UTC day (today by default).
+
+    `hit_rate` is the share of interactive searches served from the cache. `utilisation` is the
+    share of warmed entries that were used at least once before expiring; together with
+    `hits_by_rank` it shows whether NEWS_WARM_TOP_N is too high or too low.
+
+    Returns:
+        dict: Counters, rates, hits per rank and the current ranking.
+    """
+    day = day or timezone.now().date()
+    names = ['hits', 'misses', 'warmed', 'used'] + [f"hits:rank{r}" for r in range(1, settings.NEWS_WARM_TOP_N + 1)]
+    try:
+        raw = cache.get_many([_stat_key(name, day) for name in names])
+    except Exception as e:
+        logger.warning(f"Could not read warm cache counters: {e}")
+        raw = {}
+    counts = {name: raw.get(_stat_key(name, day), 0) for name in names}
+    lookups = counts['hits'] + counts['misses']
+    return {
+        'date': day.isoformat(),
+        'top_n': settings.NEWS_WARM_TOP_N,
+        'hits': counts['hits'],
+        'misses': counts['misses'],
+        'hit_rate': round(counts['hits'] / lookups, 4) if lookups else None,
+        'warmed': counts['warmed'],
+        'utilisation': round(counts['used'] / counts['warmed'], 4) if counts['warmed'] else None,
+        'hits_by_rank': [counts[f"hits:rank{r}"] for r in range(1, settings.NEWS_WARM_TOP_N + 1)],
+        'trending': rank_trending(),
+    }
@@ -1,4 +1,12 @@
 from __future__ import absolute_import, unicode_literals
-from .celery import app as celery_app
 
 __all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    # The Celery app is loaded on first use rather than with Django, so web processes that never
+    # send tasks do not import celery and kombu at startup. news.tasks loads it before defining tasks.
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
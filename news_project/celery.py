@@ -1,6 +1,8 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import celeryd_init, task_postrun, task_prerun, worker_init
+from kombu import Exchange, Queue
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'news_project.settings')
 
@@ -10,12 +12,78 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+# Queues and routing: user-triggered work never waits behind the hourly refresh cycle or maintenance.
+# Run one worker per queue, e.g. `celery -A news_project worker -Q interactive -n interactive@%h`.
+app.conf.task_queues = tuple(
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ('interactive', 'scheduled-refresh', 'maintenance')
+)
+app.conf.task_default_queue = 'maintenance'
+app.conf.task_routes = {
+    'news.tasks.refresh_keyword': {'queue': 'interactive', 'priority': 0},
+    'news.tasks.queue_probe': {'queue': 'interactive', 'priority': 0},
+    'news.tasks.refresh_all_keywords': {'queue': 'scheduled-refresh', 'priority': 6},
+    'news.tasks.warm_trending_keywords': {'queue': 'scheduled-refresh', 'priority': 4},
+    'news.tasks.purge_old_articles': {'queue': 'maintenance', 'priority': 9},
+}
+# Redis emulates priorities with sub-queues; 0 is consumed first.
+app.conf.broker_transport_options = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+app.conf.task_default_priority = 5
+
+# Concurrency and prefetch for a worker dedicated to a single queue. Concurrency given with
+# --concurrency on the command line wins; prefetch always comes from the profile.
+WORKER_PROFILES = {
+    'interactive': {'concurrency': 8, 'prefetch_multiplier': 1},
+    'scheduled-refresh': {'concurrency': 2, 'prefetch_multiplier': 1},
+    'maintenance': {'concurrency': 1, 'prefetch_multiplier': 1},
+}
+
+
+def _worker_profile(queues):
+    if isinstance(queues, str):
+        queues = queues.split(',')
+    queues = list(queues or [])
+    return WORKER_PROFILES.get(queues[0]) if len(queues) == 1 else None
+
+
+@celeryd_init.connect
+def apply_worker_concurrency(sender=None, conf=None, options=None, **kwargs):
+    profile = _worker_profile((options or {}).get('queues'))
+    if profile and not (options or {}).get('concurrency'):
+        conf.worker_concurrency = profile['concurrency']
+
+
+@worker_init.connect
+def apply_worker_prefetch(sender=None, **kwargs):
+    profile = _worker_profile(sender.app.amqp.queues.consume_from)
+    if profile:
+        sender.prefetch_multiplier = profile['prefetch_multiplier']
+
+# Sampling profiler for tasks (news.profiling); a no-op unless NEWS_PROFILER_SAMPLE_RATE > 0
+from news.profiling import finish_task_sample, start_task_sample
+
+task_prerun.connect(start_task_sample)
+task_postrun.connect(finish_task_sample)
+
 # Celery Beat schedule
 from celery.schedules import crontab
+from django.conf import settings
 
 app.conf.beat_schedule = {
     'refresh-keywords-every-hour': {
         'task': 'news.tasks.refresh_all_keywords',
         'schedule': crontab(minute=0, hour='*/1'),  # every 1 hour
     },
+    'warm-trending-keywords': {
+        'task': 'news.tasks.warm_trending_keywords',
+        'schedule': settings.NEWS_WARM_INTERVAL_MINUTES * 60,  # seconds
+    },
+    'purge-old-articles-daily': {
+        'task': 'news.tasks.purge_old_articles',
+        'schedule': crontab(minute=30, hour=3),  # every day at 03:30
+    },
 }
@@ -17,11 +17,32 @@ import os
 
 
 
-from dotenv import load_dotenv
-load_dotenv()
+# Environment overrides from the project's .env file. The path is explicit so python-dotenv does not
+# search the directory tree, and it is only imported when the file exists.
+_ENV_FILE = Path(__file__).resolve().parent.parent / '.env'
+if _ENV_FILE.exists():
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-print("Loaded API KEY:", NEWS_API_KEY)
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+NEWS_API_TIMEOUT = float(os.getenv("NEWS_API_TIMEOUT", "10"))  # seconds
+NEWS_API_MAX_CONNECTIONS = int(os.getenv("NEWS_API_MAX_CONNECTIONS", "200"))  # per process
+
+# Shared NewsAPI request budget (news.budget)
+NEWS_API_DAILY_BUDGET = int(os.getenv("NEWS_API_DAILY_BUDGET", "1000"))  # requests per UTC day, 0 = no cap
+NEWS_API_INTERACTIVE_RESERVE = float(os.getenv("NEWS_API_INTERACTIVE_RESERVE", "0.2"))  # share background work may not use
+NEWS_API_DEGRADE_AT = float(os.getenv("NEWS_API_DEGRADE_AT", "0.98"))  # share after which searches serve stored results
+NEWS_API_RATE_PER_SECOND = float(os.getenv("NEWS_API_RATE_PER_SECOND", "5"))  # 0 = no rate limit
+NEWS_API_BURST = int(os.getenv("NEWS_API_BURST", "10"))
+
+# NewsAPI circuit breaker (news.circuit)
+NEWS_BREAKER_FAILURE_THRESHOLD = int(os.getenv("NEWS_BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures before opening
+NEWS_BREAKER_SLOW_SECONDS = float(os.getenv("NEWS_BREAKER_SLOW_SECONDS", "5"))  # slower responses count as failures
+NEWS_BREAKER_RESET_SECONDS = float(os.getenv("NEWS_BREAKER_RESET_SECONDS", "30"))  # open time before a trial request
+
+# Route search and refresh to the async views (news.async_views); use with an ASGI server
+NEWS_ASYNC_VIEWS = os.getenv("NEWS_ASYNC_VIEWS") == "1"
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
@@ -56,6 +77,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'news.profiling.ProfilerMiddleware',  # removes itself unless NEWS_PROFILER_SAMPLE_RATE > 0
+    'news.dbrouting.StickyPrimaryMiddleware',  # removes itself unless a replica is configured
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,10 +118,66 @@ WSGI_APPLICATION = 'news_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv("NEWS_DB_NAME", BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Set NEWS_DB_PROFILE=production to run SQLite with concurrent web and Celery writers:
+# WAL lets readers proceed during a write, IMMEDIATE transactions take the write lock up
+# front (so they wait on the busy timeout instead of failing mid-transaction), and
+# connections are reused across requests.
+NEWS_DB_PROFILE = os.getenv("NEWS_DB_PROFILE", "default")
+
+if NEWS_DB_PROFILE == "production":
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,  # busy timeout, seconds
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
+    })
+
+# Read replica (news.dbrouting): set NEWS_DB_REPLICA_NAME to the replica's database file. Views and
+# functions marked read-only read from it; writes stay on the primary. A browser that has just
+# written reads from the primary for NEWS_DB_STICKY_SECONDS, so it sees its own changes.
+NEWS_DB_REPLICA_NAME = os.getenv("NEWS_DB_REPLICA_NAME")
+NEWS_DB_STICKY_SECONDS = int(os.getenv("NEWS_DB_STICKY_SECONDS", "10"))
+
+if NEWS_DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': NEWS_DB_REPLICA_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['news.dbrouting.PrimaryReplicaRouter']
+
+# Near-duplicate story clustering at ingest (see news.dedupe)
+# SimHash bits; one-word headline edits or an extra sentence move a short article's hash by 3-8 bits,
+# while unrelated stories on the same keyword stay 15+ bits apart.
+NEWS_DEDUPE_MAX_DISTANCE = int(os.getenv("NEWS_DEDUPE_MAX_DISTANCE", "10"))
+NEWS_DEDUPE_DROP_DUPLICATES = os.getenv("NEWS_DEDUPE_DROP_DUPLICATES") == "1"  # store one article per story
+
+# Thread pool size for the "refresh all my keywords" view
+NEWS_REFRESH_MAX_WORKERS = int(os.getenv("NEWS_REFRESH_MAX_WORKERS", "8"))
+
+# Batch keyword search: keywords accepted per submission and concurrent fetches per batch
+NEWS_BATCH_MAX_KEYWORDS = int(os.getenv("NEWS_BATCH_MAX_KEYWORDS", "100"))
+NEWS_BATCH_MAX_WORKERS = int(os.getenv("NEWS_BATCH_MAX_WORKERS", "8"))
+
+# Ingestion pipeline (news.utils): articles written per transaction, articles per News API page,
+# and pages fetched per refresh (each page is one request against the budget)
+NEWS_INGEST_BATCH_SIZE = int(os.getenv("NEWS_INGEST_BATCH_SIZE", "100"))
+NEWS_INGEST_PAGE_SIZE = int(os.getenv("NEWS_INGEST_PAGE_SIZE", "100"))  # NewsAPI maximum is 100
+NEWS_INGEST_MAX_PAGES = int(os.getenv("NEWS_INGEST_MAX_PAGES", "1"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -142,9 +221,6 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-print("NEWS API KEY:", NEWS_API_KEY)
-
-
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 LOGIN_URL = '/login/'
@@ -176,9 +252,75 @@ LOGGING = {
         },
     },
 }
+
+# Article retention (enforced by news.tasks.purge_old_articles). Both limits are off (0) by default,
+# so nothing is deleted until a deployment opts in, e.g. 90 days and 500 articles per keyword.
+NEWS_RETENTION_MAX_AGE_DAYS = int(os.getenv("NEWS_RETENTION_MAX_AGE_DAYS", "0"))
+NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD = int(os.getenv("NEWS_RETENTION_MAX_ARTICLES_PER_KEYWORD", "0"))
+NEWS_RETENTION_CHUNK_SIZE = int(os.getenv("NEWS_RETENTION_CHUNK_SIZE", "1000"))
+NEWS_RETENTION_ARCHIVE_DIR = os.getenv("NEWS_RETENTION_ARCHIVE_DIR")  # unset = delete without archiving
+
+# Raw NewsAPI response archive (news.rawarchive), replayed with `manage.py replay_raw_archive`
+NEWS_RAW_ARCHIVE_DIR = os.getenv("NEWS_RAW_ARCHIVE_DIR")  # unset = responses are not archived
+NEWS_RAW_SEGMENT_MAX_MB = int(os.getenv("NEWS_RAW_SEGMENT_MAX_MB", "64"))
+NEWS_RAW_SEGMENT_MAX_MINUTES = int(os.getenv("NEWS_RAW_SEGMENT_MAX_MINUTES", "60"))
+
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers.DatabaseScheduler'
 
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_TASK_SERIALIZER = 'json'
+
+# Redis used for cross-worker coordination (news.redis_client)
+NEWS_REDIS_URL = os.getenv("NEWS_REDIS_URL", CELERY_BROKER_URL)
+# Connect and read timeout in seconds for Redis calls made while serving requests (coordination and cache),
+# so an unreachable Redis host degrades to the fallbacks instead of hanging request threads
+NEWS_REDIS_TIMEOUT = float(os.getenv("NEWS_REDIS_TIMEOUT", "2"))
+# Lease length in seconds for refresh locks; holders renew every third of it (news.locks)
+NEWS_LOCK_TTL = int(os.getenv("NEWS_LOCK_TTL", "300"))
+
+# Cache (warm NewsAPI responses, see news.warming; cached profiles, see news.profiles). Redis is used only
+# when NEWS_CACHE_URL or NEWS_REDIS_URL is set explicitly, so web and Celery processes share warmed
+# responses; otherwise each process keeps its own in-memory cache and warming only helps the worker.
+NEWS_CACHE_URL = os.getenv("NEWS_CACHE_URL") or os.getenv("NEWS_REDIS_URL")
+
+if NEWS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': NEWS_CACHE_URL,
+            'KEY_PREFIX': 'news_project',
+            'OPTIONS': {
+                'socket_connect_timeout': NEWS_REDIS_TIMEOUT,
+                'socket_timeout': NEWS_REDIS_TIMEOUT,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sampling profiler (news.profiling): share of requests and Celery tasks sampled (0 = off), SQL
+# statements slower than NEWS_PROFILER_SLOW_SQL_MS are stored with their query plan, and sampled
+# requests/tasks slower than NEWS_PROFILER_SLOW_MS get a cProfile summary. Samples show in the admin.
+NEWS_PROFILER_SAMPLE_RATE = float(os.getenv("NEWS_PROFILER_SAMPLE_RATE", "0"))
+NEWS_PROFILER_SLOW_SQL_MS = float(os.getenv("NEWS_PROFILER_SLOW_SQL_MS", "100"))
+NEWS_PROFILER_SLOW_MS = float(os.getenv("NEWS_PROFILER_SLOW_MS", "500"))
+
+# Seconds a user's profile (quota, block status) stays cached; saving a profile invalidates it (news.profiles)
+NEWS_PROFILE_CACHE_TTL = int(os.getenv("NEWS_PROFILE_CACHE_TTL", "300"))
+
+# Session storage: "db" (default), "cached_db" (read from the cache above, written through to the
+# database) or "cache" (cache only; sessions are lost if Redis is flushed)
+SESSION_ENGINE = f"django.contrib.sessions.backends.{os.getenv('NEWS_SESSION_ENGINE', 'db')}"
+
+# Predictive cache warming for trending keywords (news.warming)
+NEWS_WARM_TOP_N = int(os.getenv("NEWS_WARM_TOP_N", "5"))  # keywords pre-fetched per run, 0 = disabled
+NEWS_WARM_INTERVAL_MINUTES = int(os.getenv("NEWS_WARM_INTERVAL_MINUTES", "15"))
+NEWS_WARM_TTL = int(os.getenv("NEWS_WARM_TTL", "1200"))  # seconds a warmed response is served
+NEWS_TRENDING_HALF_LIFE_HOURS = float(os.getenv("NEWS_TRENDING_HALF_LIFE_HOURS", "6"))
+NEWS_TRENDING_WINDOW_HOURS = int(os.getenv("NEWS_TRENDING_WINDOW_HOURS", "48"))